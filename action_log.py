@@ -0,0 +1,273 @@
+# action_log.py - deterministic record of every state-changing action in a run, and a headless replayer
+#
+# A run is fully described by its RNG seed, an optional starting save (when it began from
+# a loaded autosave) and the ordered list of actions. Replaying re-executes the actions on
+# fresh Player objects without pygame, and compares state hashes written at each end of turn.
+#
+# Usage:
+#   python action_log.py last_game.dclog              # replay and verify every checkpoint
+#   python action_log.py last_game.dclog --repeat 50  # measure replay throughput
+#
+# File layout (little endian):
+#   header   "DCLG", version (B), seed (Q), start-state length (I), start state (save_state format)
+#   records  opcode (B) followed by that opcode's fixed-size arguments
+import argparse
+import hashlib
+import struct
+import sys
+import threading
+import time
+
+from config_service import atomic_write
+from player import Player
+from rng import RngStreams, new_master_seed
+from save_state import HUGO_CHOICES, encode_player, decode_game
+
+LOG_MAGIC = b"DCLG"
+# Version 2: the player draws from its own seeded stream instead of the global random module
+LOG_VERSION = 2
+LAST_GAME_FILE = "last_game.dclog"
+
+# Opcodes; never renumber these, old logs depend on them
+BUY_UNIT = 1
+BUY_AND_COMBINE = 2
+SELL_UNIT = 3
+SELL_BOARD_UNIT = 4
+MOVE_TO_BOARD = 5
+MOVE_TO_BENCH = 6
+SWAP_BENCH_BOARD = 7
+SWAP_BOARD = 8
+SWAP_BENCH = 9
+REFRESH_SHOP = 10
+BUY_XP = 11
+END_TURN = 12
+HUGO_CHOICE = 13
+DEV_GOLD = 14
+CHECKPOINT = 15
+
+# opcode -> (name, argument struct, how to apply it to a Player)
+ACTIONS = {
+    BUY_UNIT: ("buy_unit", struct.Struct("<B"), lambda p, i: p.buy_unit(i)),
+    BUY_AND_COMBINE: ("buy_and_combine", struct.Struct("<B"), lambda p, i: p.buy_and_combine(i)),
+    SELL_UNIT: ("sell_unit", struct.Struct("<B"), lambda p, i: p.sell_unit(i)),
+    SELL_BOARD_UNIT: ("sell_board_unit", struct.Struct("<BB"), lambda p, x, y: p.sell_board_unit(x, y)),
+    MOVE_TO_BOARD: ("move_unit_to_board", struct.Struct("<BBB"), lambda p, i, x, y: p.move_unit_to_board(i, x, y)),
+    MOVE_TO_BENCH: ("move_unit_to_bench", struct.Struct("<BBB"), lambda p, x, y, i: p.move_unit_to_bench(x, y, i)),
+    SWAP_BENCH_BOARD: ("swap_bench_and_board", struct.Struct("<BBB"),
+                       lambda p, i, x, y: p.swap_bench_and_board(i, x, y)),
+    SWAP_BOARD: ("swap_board_units", struct.Struct("<BBBB"),
+                 lambda p, x1, y1, x2, y2: p.swap_board_units(x1, y1, x2, y2)),
+    SWAP_BENCH: ("swap_bench_units", struct.Struct("<BB"), lambda p, i, j: p.swap_bench_units(i, j)),
+    REFRESH_SHOP: ("refresh_shop", struct.Struct("<"), lambda p: p.refresh_shop()),
+    BUY_XP: ("buy_xp", struct.Struct("<"), lambda p: p.buy_xp()),
+    END_TURN: ("end_turn", struct.Struct("<"), lambda p: p.end_turn()),
+    HUGO_CHOICE: ("choose_hugo_replacement", struct.Struct("<B"),
+                  lambda p, c: p.choose_hugo_replacement(HUGO_CHOICES[c])),
+    DEV_GOLD: ("dev_gold", struct.Struct("<H"), lambda p, amount: setattr(p, "gold", p.gold + amount)),
+}
+
+# What a remote player may ask for during planning; END_TURN and DEV_GOLD are not theirs to send
+CLIENT_ACTIONS = {BUY_UNIT, BUY_AND_COMBINE, SELL_UNIT, SELL_BOARD_UNIT, MOVE_TO_BOARD, MOVE_TO_BENCH,
+                  SWAP_BENCH_BOARD, SWAP_BOARD, SWAP_BENCH, REFRESH_SHOP, BUY_XP, HUGO_CHOICE}
+
+_HEADER = struct.Struct("<4sBQI")
+_CHECKPOINT = struct.Struct("<8s")
+
+
+def check_intent(op, args, allowed=CLIENT_ACTIONS):
+    """Reason an action received over the network is malformed, or None.
+
+    Only the shape is checked; whether the player can afford it etc. is Player's job.
+    """
+    if not isinstance(op, int) or op not in allowed:
+        return f"action {op!r} not allowed"
+    if not isinstance(args, list) or not all(isinstance(a, int) and not isinstance(a, bool) for a in args):
+        return "arguments must be integers"
+    try:
+        ACTIONS[op][1].pack(*args)
+    except struct.error:
+        return f"bad arguments for {ACTIONS[op][0]}"
+    if op == HUGO_CHOICE and args[0] >= len(HUGO_CHOICES):
+        return "unknown Hugo Strange choice"
+    return None
+
+
+def state_hash(player):
+    """8-byte digest of everything a save would keep about the player"""
+    return hashlib.blake2b(encode_player(player), digest_size=8).digest()
+
+
+class ActionLog:
+    """The action stream of one run.
+
+    Use start_game() for a new run; use perform() for every state change so the log and the
+    game can never disagree about what happened.
+    """
+
+    def __init__(self, seed, start_state=b""):
+        self.seed = seed
+        self.start_state = start_state
+        self.records = bytearray()
+        self.action_count = 0
+
+    def record(self, opcode, *args):
+        self.records.append(opcode)
+        self.records += ACTIONS[opcode][1].pack(*args)
+        self.action_count += 1
+
+    def checkpoint(self, player):
+        self.records.append(CHECKPOINT)
+        self.records += _CHECKPOINT.pack(state_hash(player))
+
+    def perform(self, player, opcode, *args):
+        """Apply an action to the player and record it; returns the action's result"""
+        result = ACTIONS[opcode][2](player, *args)
+        self.record(opcode, *args)
+        if opcode == END_TURN:
+            self.checkpoint(player)
+        return result
+
+    def to_bytes(self):
+        return (_HEADER.pack(LOG_MAGIC, LOG_VERSION, self.seed, len(self.start_state)) +
+                self.start_state + bytes(self.records))
+
+    @classmethod
+    def from_bytes(cls, data):
+        try:
+            magic, version, seed, start_length = _HEADER.unpack_from(data, 0)
+        except struct.error as e:
+            raise ValueError(f"truncated action log: {e}")
+        if magic != LOG_MAGIC:
+            raise ValueError("not a DC Auto Battler action log")
+        if version != LOG_VERSION:
+            raise ValueError(f"unsupported action log version {version}")
+        offset = _HEADER.size
+        log = cls(seed, bytes(data[offset:offset + start_length]))
+        log.records = bytearray(data[offset + start_length:])
+        return log
+
+    def save(self, path=LAST_GAME_FILE):
+        atomic_write(path, self.to_bytes())
+
+    def save_async(self, path=LAST_GAME_FILE):
+        data = self.to_bytes()
+
+        def write():
+            try:
+                atomic_write(path, data)
+            except OSError as e:
+                print(f"Saving action log to {path} failed: {e}")
+
+        thread = threading.Thread(target=write, name="action-log", daemon=True)
+        thread.start()
+        return thread
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+    def entries(self):
+        """Yield (opcode, args) for every record, checkpoints included"""
+        data = self.records
+        offset = 0
+        while offset < len(data):
+            opcode = data[offset]
+            offset += 1
+            if opcode == CHECKPOINT:
+                fmt = _CHECKPOINT
+            elif opcode in ACTIONS:
+                fmt = ACTIONS[opcode][1]
+            else:
+                raise ValueError(f"unknown opcode {opcode} at byte {offset - 1}")
+            try:
+                args = fmt.unpack_from(data, offset)
+            except struct.error as e:
+                raise ValueError(f"truncated record at byte {offset - 1}: {e}")
+            offset += fmt.size
+            yield opcode, args
+
+
+def start_game(seed=None, start_state=None):
+    """Create the player for a run with its own seeded stream; returns (player, opponent or None, log).
+
+    With start_state (save_state bytes) the run continues a loaded save.
+    """
+    if seed is None:
+        seed = new_master_seed()
+    player_rng = RngStreams(seed).python("player")
+    opponent = None
+    if start_state:
+        player, opponent = decode_game(start_state)
+        player.rng = player_rng
+    else:
+        player = Player(rng=player_rng)
+    return player, opponent, ActionLog(seed, start_state or b"")
+
+
+class ReplayDivergence(Exception):
+    """Raised when a replayed state stops matching the hash recorded during play"""
+
+
+def replay(log, verify=True):
+    """Re-execute a log headlessly; returns (player, actions replayed, checkpoints verified)"""
+    import unit
+    unit.LOAD_IMAGES = False
+
+    player, _, _ = start_game(log.seed, log.start_state)
+    actions = 0
+    checkpoints = 0
+    for opcode, args in log.entries():
+        if opcode == CHECKPOINT:
+            if verify:
+                actual = state_hash(player)
+                if actual != args[0]:
+                    raise ReplayDivergence(f"state differs at checkpoint {checkpoints + 1} (after action {actions}, "
+                                           f"round {player.round}): expected {args[0].hex()}, got {actual.hex()}")
+            checkpoints += 1
+            continue
+        ACTIONS[opcode][2](player, *args)
+        actions += 1
+    return player, actions, checkpoints
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a DC Auto Battler action log without rendering")
+    parser.add_argument("log", nargs="?", default=LAST_GAME_FILE)
+    parser.add_argument("--repeat", type=int, default=1, help="replay this many times to measure throughput")
+    parser.add_argument("--list", action="store_true", help="print every action instead of replaying")
+    args = parser.parse_args()
+
+    try:
+        log = ActionLog.load(args.log)
+    except (OSError, ValueError) as e:
+        print(f"Could not read {args.log}: {e}")
+        return 2
+
+    if args.list:
+        for opcode, op_args in log.entries():
+            name = "checkpoint" if opcode == CHECKPOINT else ACTIONS[opcode][0]
+            shown = op_args[0].hex() if opcode == CHECKPOINT else ", ".join(str(a) for a in op_args)
+            print(f"{name}({shown})")
+        return 0
+
+    start = time.perf_counter()
+    try:
+        for _ in range(args.repeat):
+            player, actions, checkpoints = replay(log)
+    except ReplayDivergence as e:
+        print(f"DIVERGED: {e}")
+        return 1
+    elapsed = time.perf_counter() - start
+
+    total = actions * args.repeat
+    print(f"Replayed {actions} actions, {checkpoints} checkpoints OK (seed {log.seed})")
+    print(f"Final state: round {player.round}, level {player.level}, gold {player.gold}, "
+          f"hash {state_hash(player).hex()}")
+    if elapsed > 0:
+        print(f"{total / elapsed:,.0f} actions/s over {args.repeat} run(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+# batch_economy.py - the gold / XP / level economy of many players at once, as NumPy arrays
+#
+# Usage:
+#   python batch_economy.py --players 1000000 --rounds 30    # policy sweep
+#   python batch_economy.py --check                           # cross-check against Player
+#
+# EconomyBatch holds one array per field (gold, level, xp, round) and advances every player
+# in lockstep: income and interest, the free XP each round, buying XP and rerolling are
+# whole-array operations with the same rules as Player.calculate_income, end_turn, buy_xp
+# and refresh_shop. Shops and units are not simulated - only the gold they cost.
+#
+# The sweep plays a family of simple policies - keep a gold floor, buy XP with the rest until
+# a level cap, then roll the gold above the floor - with every player drawing some extra
+# gold each round (selling units), and reports how each (floor, cap) pair does.
+import argparse
+import random
+import sys
+import time
+
+import numpy as np
+
+from economy_planner import LEVEL_START, LEVEL_OF, MAX_TOTAL_XP
+from player import (STARTING_GOLD, XP_COST, XP_PER_PURCHASE, XP_PER_ROUND, MAX_LEVEL, BASE_INCOME,
+                    MAX_INTEREST, Player)
+from rng import derive_seed
+
+REFRESH_COST = 2
+_LEVEL_START = np.array(LEVEL_START, dtype=np.int64)
+
+
+class EconomyBatch:
+    """gold, level, xp and round of `size` players, one int64 array each"""
+
+    def __init__(self, size, gold=STARTING_GOLD, level=1, xp=0, round_number=1, refresh_cost=REFRESH_COST):
+        self.gold = np.full(size, gold, dtype=np.int64)
+        self.level = np.full(size, level, dtype=np.int64)
+        self.xp = np.full(size, xp, dtype=np.int64)
+        self.round = np.full(size, round_number, dtype=np.int64)
+        self.refresh_cost = refresh_cost
+
+    @classmethod
+    def from_players(cls, players):
+        batch = cls(len(players))
+        batch.gold[:] = [p.gold for p in players]
+        batch.level[:] = [p.level for p in players]
+        batch.xp[:] = [p.xp for p in players]
+        batch.round[:] = [p.round for p in players]
+        return batch
+
+    def __len__(self):
+        return len(self.gold)
+
+    def total_xp(self):
+        """XP earned since level 1; gaining XP is adding to this, capped at level 10"""
+        return np.where(self.level >= MAX_LEVEL, MAX_TOTAL_XP, _LEVEL_START[np.minimum(self.level, MAX_LEVEL) - 1] + self.xp)
+
+    def set_total_xp(self, total):
+        total = np.minimum(total, MAX_TOTAL_XP)
+        self.level = LEVEL_OF[total].astype(np.int64)
+        self.xp = np.where(self.level >= MAX_LEVEL, 0, total - _LEVEL_START[self.level - 1])
+
+    def income(self):
+        return BASE_INCOME + np.minimum(self.gold // 10, MAX_INTEREST)
+
+    def buy_xp(self, times=1):
+        """Buy XP up to `times` times each (scalar or array), as repeated Player.buy_xp; returns purchases made"""
+        total = self.total_xp()
+        until_max = -(-(MAX_TOTAL_XP - total) // XP_PER_PURCHASE)
+        bought = np.maximum(np.minimum(np.minimum(times, self.gold // XP_COST), until_max), 0)
+        self.gold -= bought * XP_COST
+        self.set_total_xp(total + bought * XP_PER_PURCHASE)
+        return bought
+
+    def refresh(self, times=1):
+        """Pay for up to `times` rerolls each, as repeated Player.refresh_shop; returns rerolls made"""
+        rolled = np.maximum(np.minimum(times, self.gold // self.refresh_cost), 0)
+        self.gold -= rolled * self.refresh_cost
+        return rolled
+
+    def end_turn(self):
+        """Income on the gold held, next round, and the round's free XP - Player.end_turn for everyone"""
+        income = self.income()
+        self.gold += income
+        self.round += 1
+        self.set_total_xp(self.total_xp() + XP_PER_ROUND)
+        return income
+
+
+def buys_to_level(batch, cap):
+    """XP purchases each player still needs to reach level `cap` (scalar or array)"""
+    target = np.where(cap >= MAX_LEVEL, MAX_TOTAL_XP, _LEVEL_START[np.minimum(cap, MAX_LEVEL) - 1])
+    return np.maximum(-(-(target - batch.total_xp()) // XP_PER_PURCHASE), 0)
+
+
+def sweep(players, rounds, floors, caps, max_extra_gold, seed):
+    """Play the floor/cap policy for `rounds` rounds; players are split evenly over every (floor, cap) pair"""
+    grid = [(floor, cap) for floor in floors for cap in caps]
+    pair = np.arange(players) % len(grid)
+    floor = np.array([f for f, _ in grid], dtype=np.int64)[pair]
+    cap = np.array([c for _, c in grid], dtype=np.int64)[pair]
+    rng = np.random.default_rng(derive_seed(seed, "economy sweep"))
+
+    batch = EconomyBatch(players)
+    rolled = np.zeros(players, dtype=np.int64)
+    capped_round = np.full(players, -1, dtype=np.int64)
+    for _ in range(rounds):
+        batch.gold += rng.integers(0, max_extra_gold + 1, players)
+        batch.buy_xp(np.minimum((batch.gold - floor) // XP_COST, buys_to_level(batch, cap)))
+        at_cap = batch.level >= cap
+        capped_round[at_cap & (capped_round < 0)] = batch.round[at_cap & (capped_round < 0)]
+        rolled += batch.refresh(np.where(at_cap, (batch.gold - floor) // batch.refresh_cost, 0)) * batch.refresh_cost
+        batch.end_turn()
+
+    results = []
+    counts = np.bincount(pair, minlength=len(grid))
+    for field, values in (("level", batch.level), ("gold", batch.gold), ("rolled", rolled)):
+        means = np.bincount(pair, weights=values, minlength=len(grid)) / counts
+        for i, mean in enumerate(means):
+            if field == "level":
+                results.append({"floor": grid[i][0], "cap": grid[i][1], "players": int(counts[i])})
+            results[i][field] = round(float(mean), 2)
+    reached = np.bincount(pair, weights=capped_round >= 0, minlength=len(grid))
+    reached_round = np.bincount(pair, weights=np.where(capped_round >= 0, capped_round, 0), minlength=len(grid))
+    for i, row in enumerate(results):
+        row["reached_cap"] = round(float(reached[i] / counts[i]), 4)
+        row["cap_round"] = round(float(reached_round[i] / reached[i]), 2) if reached[i] else None
+    return results
+
+
+def cross_check(players=200, rounds=40, seed=1):
+    """Random buy/reroll/end-turn sequences through Player and EconomyBatch; returns the first mismatch or None"""
+    import unit
+    unit.LOAD_IMAGES = False
+    rng = random.Random(seed)
+    scalar = [Player(rng=random.Random(i)) for i in range(players)]
+    for player in scalar:
+        player.gold = rng.randint(0, 80)
+    batch = EconomyBatch.from_players(scalar)
+    for step in range(rounds):
+        buys = [rng.choice((0, 0, 1, 2, 5, 30)) for _ in range(players)]
+        rolls = [rng.choice((0, 0, 1, 3, 40)) for _ in range(players)]
+        for player, n_buys, n_rolls in zip(scalar, buys, rolls):
+            for _ in range(n_buys):
+                player.buy_xp()
+            for _ in range(n_rolls):
+                player.refresh_shop()
+            player.end_turn()
+        batch.buy_xp(np.array(buys))
+        batch.refresh(np.array(rolls))
+        batch.end_turn()
+        for i, player in enumerate(scalar):
+            expected = (player.gold, player.level, player.xp, player.round)
+            got = (int(batch.gold[i]), int(batch.level[i]), int(batch.xp[i]), int(batch.round[i]))
+            if expected != got:
+                return {"round": step, "player": i, "player_state": expected, "batch_state": got}
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized economy policy sweeps")
+    parser.add_argument("--players", type=int, default=1_000_000)
+    parser.add_argument("--rounds", type=int, default=30)
+    parser.add_argument("--floors", type=int, nargs="+", default=[0, 10, 20, 30, 40, 50])
+    parser.add_argument("--caps", type=int, nargs="+", default=[6, 7, 8, 9, 10])
+    parser.add_argument("--extra-gold", type=int, default=4, help="extra gold per round, uniform 0..N")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--check", action="store_true", help="cross-check against Player instead")
+    args = parser.parse_args()
+
+    if args.check:
+        mismatch = cross_check(seed=args.seed)
+        if mismatch is not None:
+            print(f"Mismatch: {mismatch}")
+            return 1
+        print("EconomyBatch matches Player")
+        return 0
+
+    start = time.perf_counter()
+    results = sweep(args.players, args.rounds, args.floors, args.caps, args.extra_gold, args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"{args.players:,} players x {args.rounds} rounds in {elapsed:.2f} s")
+    print(f"{'floor':>5}{'cap':>5}{'level':>8}{'gold':>8}{'rolled':>9}{'at cap':>8}{'by round':>10}")
+    for row in results:
+        cap_round = f"{row['cap_round']:.1f}" if row["cap_round"] is not None else "-"
+        print(f"{row['floor']:>5}{row['cap']:>5}{row['level']:>8.2f}{row['gold']:>8.1f}{row['rolled']:>9.1f}"
+              f"{row['reached_cap'] * 100:>7.1f}%{cap_round:>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
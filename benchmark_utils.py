@@ -0,0 +1,110 @@
+# benchmark_utils.py - shared helpers for the benchmark scripts
+import json
+import os
+import random
+
+from game_constants import GameConstants
+
+BASELINE_DIR = "benchmarks"
+
+
+def percentile(samples, pct):
+    """Return the pct-th percentile of samples using linear interpolation"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    position = (len(ordered) - 1) * pct / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    fraction = position - lower
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * fraction
+
+
+def summarize_frame_times(samples):
+    """Reduce a list of frame times (ms) to the stats we track"""
+    return {
+        "frames": len(samples),
+        "p50_ms": round(percentile(samples, 50), 4),
+        "p95_ms": round(percentile(samples, 95), 4),
+        "p99_ms": round(percentile(samples, 99), 4),
+        "max_ms": round(max(samples), 4) if samples else 0.0,
+    }
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Could not read baseline {path}: {e}")
+        return None
+
+
+def save_baseline(path, results):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=4, sort_keys=True)
+    print(f"Baseline written to {path}")
+
+
+def sample_units(player, count, level=10, seed=1234):
+    """Roll shops at the given level until we have `count` distinct champions.
+
+    Returns fresh unit instances so callers can place them without touching the shop.
+    """
+    saved_level = player.level
+    saved_shop = player.shop
+    saved_rng = player.rng
+    player.rng = random.Random(seed)
+    player.level = level
+
+    units = []
+    seen = set()
+    attempts = 0
+    while len(units) < count and attempts < 1000:
+        player.generate_shop()
+        for unit in player.shop:
+            if unit and unit.name not in seen and unit.name != "Hugo Strange":
+                seen.add(unit.name)
+                units.append(clone_unit(player, unit))
+                if len(units) == count:
+                    break
+        attempts += 1
+
+    player.rng = saved_rng
+    player.level = saved_level
+    player.shop = saved_shop
+    return units
+
+
+def clone_unit(player, unit, stars=1):
+    """Create a new 1-star copy of a unit (optionally starred up) sharing its PNG"""
+    new_unit = player.create_unit(unit.name, unit.cost, unit.traits.copy(), unit.health, unit.damage, [])
+    new_unit.png_name = unit.png_name
+    new_unit.png_surface = unit.png_surface
+    while new_unit.stars < stars:
+        new_unit.stars += 1
+        new_unit.health = int(new_unit.health * 1.8)
+        new_unit.damage = int(new_unit.damage * 1.8)
+        if new_unit.stars == 3:
+            new_unit.health = int(new_unit.health * 1.5)
+            new_unit.damage = int(new_unit.damage * 1.5)
+    return new_unit
+
+
+def fill_board_and_bench(player, board_units=10, bench_units=GameConstants.BENCH_SLOTS, seed=1234):
+    """Put a realistic late-game state on the player: a full board and a full bench"""
+    player.level = 10
+    units = sample_units(player, board_units + bench_units, seed=seed)
+    for i, unit in enumerate(units[:board_units]):
+        x = i % GameConstants.BOARD_WIDTH
+        y = i // GameConstants.BOARD_WIDTH
+        player.board[y][x] = unit
+    for i, unit in enumerate(units[board_units:board_units + bench_units]):
+        player.bench[i] = unit
+    player.calculate_traits()
+    return player
@@ -0,0 +1,264 @@
+# board_arrays.py - the boards and benches of many players as NumPy arrays
+#
+# Usage:
+#   python board_arrays.py --boards 100000     # time build + trait counts + power against the object loops
+#   python board_arrays.py --check             # cross-check against Player and board_stats
+#
+# BoardArrays holds one row per board and one column per slot - the board row by row, then
+# the bench - with the champion id, stars, health and damage of the unit there, plus the
+# trait modifiers (see trait_effects.py) over the board slots, and answers for every row at once:
+#
+#   trait counts  bincount of the board's champion ids @ INCIDENCE (champion x trait)
+#   power         one multiply-add and a sum over the board slots, as combat scores a board
+#
+# from_comps() builds boards of 1-star champions straight from names, with no Unit or Player
+# objects: boards reaching the same trait tiers share one champion x modifier table. That is
+# how comp_finder.py compares every way of filling its comps. Game logic works on one board
+# at a time and keeps its object loops; _from_players() copies Player boards in only for the
+# cross-check and the benchmark, which reports build + query time for each path.
+import argparse
+import random
+import sys
+import time
+from itertools import chain, repeat
+from operator import attrgetter, is_not
+
+import numpy as np
+
+from game_constants import GameConstants
+from roster import CHAMPIONS, CHAMPION_IDS, TRAIT_NAMES, TRAIT_IDS, TRAIT_INFO, TRAIT_EFFECTS
+from trait_effects import IDENTITY, unit_modifiers
+
+BOARD_SLOTS = GameConstants.BOARD_WIDTH * GameConstants.BOARD_HEIGHT
+SLOTS = BOARD_SLOTS + GameConstants.BENCH_SLOTS
+# Champion id of an empty slot: the all-zero last row of INCIDENCE
+EMPTY = len(CHAMPIONS)
+
+# INCIDENCE[champion, trait] = 1 if the champion has the trait; "N/A" never counts, as in calculate_traits
+INCIDENCE = np.zeros((len(CHAMPIONS) + 1, len(TRAIT_NAMES)), dtype=np.int64)
+for _champion, (_, _, _traits, _, _) in enumerate(CHAMPIONS):
+    for _trait in _traits:
+        if _trait != "N/A":
+            INCIDENCE[_champion, TRAIT_IDS[_trait]] = 1
+# 1-star health and damage per champion id, 0 for EMPTY
+BASE_HEALTH = np.array([entry[3] for entry in CHAMPIONS] + [0], dtype=np.int64)
+BASE_DAMAGE = np.array([entry[4] for entry in CHAMPIONS] + [0], dtype=np.int64)
+
+# Traits that change stats, in the order active_tiers() sorts them, with the tier each unit count
+# reaches: -1 for none or a tier without effects, the last tier past the last threshold
+_EFFECT_TRAITS = sorted(TRAIT_EFFECTS)
+_EFFECT_COLUMNS = [TRAIT_IDS[trait] for trait in _EFFECT_TRAITS]
+_TIER_LOOKUPS = []
+for _trait in _EFFECT_TRAITS:
+    _thresholds = TRAIT_INFO[_trait]["thresholds"]
+    _tiers = [sum(1 for threshold in _thresholds if count >= threshold) - 1 for count in range(_thresholds[-1] + 1)]
+    _TIER_LOOKUPS.append(np.array([tier if tier >= 0 and TRAIT_EFFECTS[_trait][tier] else -1 for tier in _tiers]))
+# Place values packing a board's tiers (each 0..len(tiers) after adding 1) into one int64
+_TIER_RADIX = np.cumprod([1] + [max(lookup) + 2 for lookup in _TIER_LOOKUPS[:-1]], dtype=np.int64)
+# active tiers -> (champion id, 4) array of unit_modifiers(), IDENTITY for EMPTY
+_MODIFIER_TABLES = {}
+
+
+def _modifier_table(active):
+    """Every champion's unit_modifiers() under these active tiers, IDENTITY for EMPTY"""
+    table = _MODIFIER_TABLES.get(active)
+    if table is None:
+        table = _MODIFIER_TABLES[active] = np.array(
+            [unit_modifiers(traits, active) for _, _, traits, _, _ in CHAMPIONS] + [IDENTITY])
+    return table
+
+class BoardArrays:
+    """champion id, stars, health and damage per slot of `size` players, plus their board trait modifiers"""
+
+    def __init__(self, size):
+        # (player, slot, field) with the fields below as views, so a player loads in one assignment
+        self.slots = np.zeros((size, SLOTS, 4), dtype=np.int64)
+        self.slots[:, :, 0] = EMPTY
+        self.champion, self.stars, self.health, self.damage = (self.slots[:, :, field] for field in range(4))
+        self.health_mult = np.ones((size, BOARD_SLOTS))
+        self.health_add = np.zeros((size, BOARD_SLOTS))
+        self.damage_mult = np.ones((size, BOARD_SLOTS))
+        self.damage_add = np.zeros((size, BOARD_SLOTS))
+
+    @classmethod
+    def _from_players(cls, players):
+        """Copy of the Players' boards and benches; for cross-checking and the benchmark, as game
+        logic works on one board at a time and keeps its object loops"""
+        arrays = cls(len(players))
+        units = list(chain.from_iterable(chain(*player.board, player.bench) for player in players))
+        # Most slots are empty: only the occupied ones are read, with C-level maps, and scattered into place
+        slots = np.flatnonzero(np.fromiter(map(is_not, units, repeat(None)), bool, len(units)))
+        occupied = [units[slot] for slot in slots.tolist()]
+        fields = arrays.slots.reshape(-1, 4)
+        names = map(attrgetter("name"), occupied)
+        fields[slots, 0] = np.fromiter(map(CHAMPION_IDS.__getitem__, names), np.int64, len(occupied))
+        for field, attribute in enumerate(("stars", "health", "damage"), start=1):
+            fields[slots, field] = np.fromiter(map(attrgetter(attribute), occupied), np.int64, len(occupied))
+        arrays._compile_modifiers()
+        return arrays
+
+    @classmethod
+    def from_comps(cls, comps):
+        """Boards of 1-star units straight from lists of champion names, placed row by row, benches empty"""
+        arrays = cls(len(comps))
+        sizes = np.fromiter(map(len, comps), np.int64, len(comps))
+        if len(comps) and sizes.max() > BOARD_SLOTS:
+            raise ValueError(f"a comp has more than {BOARD_SLOTS} units")
+        # Every name in one pass, then scattered to (comp, position in the comp)
+        rows = np.repeat(np.arange(len(comps)), sizes)
+        columns = np.arange(len(rows)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        arrays.champion[rows, columns] = np.fromiter(map(CHAMPION_IDS.__getitem__, chain.from_iterable(comps)),
+                                                     np.int64, len(rows))
+        arrays.stars[:, :BOARD_SLOTS] = np.where(arrays.champion[:, :BOARD_SLOTS] != EMPTY, 1, 0)
+        arrays.health[:] = BASE_HEALTH[arrays.champion]
+        arrays.damage[:] = BASE_DAMAGE[arrays.champion]
+        arrays._compile_modifiers()
+        return arrays
+
+    def _compile_modifiers(self):
+        """Trait modifiers of every board from its champions, as Player.calculate_traits() compiles them"""
+        if not len(self):
+            return
+        # Boards reaching the same trait tiers share one modifier table, gathered by champion id
+        counts = self.trait_counts()
+        tiers = np.stack([lookup[np.minimum(counts[:, column], len(lookup) - 1)]
+                          for column, lookup in zip(_EFFECT_COLUMNS, _TIER_LOOKUPS)], axis=1)
+        # One number per board's tiers, so finding the distinct ones is a 1-D unique
+        _, first, groups = np.unique((tiers + 1) @ _TIER_RADIX, return_index=True, return_inverse=True)
+        distinct = tiers[first]
+        tables = np.stack([_modifier_table(tuple((trait, int(tier)) for trait, tier in zip(_EFFECT_TRAITS, row)
+                                                 if tier >= 0)) for row in distinct])
+        modifiers = tables[groups.reshape(-1, 1), self.champion[:, :BOARD_SLOTS]]
+        self.health_mult[:], self.health_add[:] = modifiers[:, :, 0], modifiers[:, :, 1]
+        self.damage_mult[:], self.damage_add[:] = modifiers[:, :, 2], modifiers[:, :, 3]
+
+    def __len__(self):
+        return len(self.slots)
+
+    def board_counts(self):
+        return np.count_nonzero(self.champion[:, :BOARD_SLOTS] != EMPTY, axis=1)
+
+    def bench_counts(self):
+        return np.count_nonzero(self.champion[:, BOARD_SLOTS:] != EMPTY, axis=1)
+
+    def trait_counts(self):
+        """(players, traits) matrix of board units per trait - Player.traits for every player"""
+        size = len(self)
+        # Each player's champion counts side by side in one bincount, then a single matmul
+        offsets = (np.arange(size) * (EMPTY + 1))[:, None]
+        champion_counts = np.bincount((self.champion[:, :BOARD_SLOTS] + offsets).ravel(), minlength=size * (EMPTY + 1))
+        return champion_counts.reshape(size, EMPTY + 1) @ INCIDENCE
+
+    def traits(self, index):
+        """Player.traits of one row, as a dict of the traits with at least one unit"""
+        counts = self.trait_counts()[index]
+        return {TRAIT_NAMES[trait]: int(counts[trait]) for trait in np.flatnonzero(counts)}
+
+    def board_stats(self):
+        """(health, damage) arrays over the players' living board units with trait modifiers, as board_stats()"""
+        alive = self.health[:, :BOARD_SLOTS] > 0
+        health = np.where(alive, self.health[:, :BOARD_SLOTS] * self.health_mult + self.health_add, 0.0)
+        damage = np.where(alive, self.damage[:, :BOARD_SLOTS] * self.damage_mult + self.damage_add, 0.0)
+        # cumsum adds slot by slot like board_stats does, so the rounded totals match it exactly
+        return (np.round(np.cumsum(health, axis=1)[:, -1]).astype(np.int64),
+                np.round(np.cumsum(damage, axis=1)[:, -1]).astype(np.int64))
+
+    def power(self):
+        """Combined health + damage, the number CombatManager.start_combat compares"""
+        health, damage = self.board_stats()
+        return health + damage
+
+
+def random_players(count, seed=1):
+    """Players with random boards and benches of shop champions, traits calculated"""
+    import unit
+    unit.LOAD_IMAGES = False
+    from player import Player, UNIT_ROSTER
+    rng = random.Random(seed)
+    players = []
+    for i in range(count):
+        player = Player(fill_shop=False, rng=random.Random(i))
+        slots = [(x, y) for y in range(GameConstants.BOARD_HEIGHT) for x in range(GameConstants.BOARD_WIDTH)]
+        for x, y in rng.sample(slots, rng.randint(0, 10)):
+            name, cost, traits, health, damage = rng.choice(UNIT_ROSTER)
+            player.board[y][x] = player.create_unit(name, cost, list(traits), health, damage, [])
+            player.board[y][x].stars = rng.choice((1, 1, 2, 3))
+        for slot in rng.sample(range(GameConstants.BENCH_SLOTS), rng.randint(0, 5)):
+            name, cost, traits, health, damage = rng.choice(UNIT_ROSTER)
+            player.bench[slot] = player.create_unit(name, cost, list(traits), health, damage, [])
+        player.calculate_traits()
+        players.append(player)
+    return players
+
+
+def cross_check(count=2000, seed=1):
+    """Compare counts, traits and stats with the object code; returns the first mismatch or None"""
+    from trait_effects import board_stats
+    players = random_players(count, seed)
+    arrays = BoardArrays._from_players(players)
+    board_counts, bench_counts, trait_counts = arrays.board_counts(), arrays.bench_counts(), arrays.trait_counts()
+    health, damage = arrays.board_stats()
+    for i, player in enumerate(players):
+        expected = (sum(1 for row in player.board for unit in row if unit is not None),
+                    sum(1 for unit in player.bench if unit is not None), player.traits,
+                    board_stats(player.board, player.trait_modifiers))
+        counts = trait_counts[i]
+        got = (int(board_counts[i]), int(bench_counts[i]),
+               {TRAIT_NAMES[t]: int(counts[t]) for t in np.flatnonzero(counts)}, (int(health[i]), int(damage[i])))
+        if expected != got:
+            return {"player": i, "objects": expected, "arrays": got}
+    # from_comps() builds the same boards without Player; stars don't change a unit's stats
+    comps = [[unit.name for row in player.board for unit in row if unit is not None] for player in players]
+    built = BoardArrays.from_comps(comps).board_stats()
+    for i in np.flatnonzero((built[0] != health) | (built[1] != damage)):
+        return {"comp": comps[i], "players": (int(health[i]), int(damage[i])),
+                "from_comps": (int(built[0][i]), int(built[1][i]))}
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Array-backed board queries")
+    parser.add_argument("--boards", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--check", action="store_true", help="cross-check against Player instead")
+    args = parser.parse_args()
+
+    if args.check:
+        mismatch = cross_check(seed=args.seed)
+        if mismatch is not None:
+            print(f"Mismatch: {mismatch}")
+            return 1
+        print("BoardArrays matches Player")
+        return 0
+
+    from trait_effects import board_stats
+    players = random_players(args.boards, args.seed)
+    comps = [[unit.name for row in player.board for unit in row if unit is not None] for player in players]
+    # random_players() already warmed calculate_traits()' modifier cache; warm the arrays' tables too
+    BoardArrays.from_comps(comps)
+    start = time.perf_counter()
+    for player in players:
+        player.calculate_traits()
+        board_stats(player.board, player.trait_modifiers)
+    objects = time.perf_counter()
+    arrays = BoardArrays._from_players(players)
+    loaded = time.perf_counter()
+    arrays.trait_counts()
+    arrays.power()
+    copied = time.perf_counter()
+    arrays = BoardArrays.from_comps(comps)
+    built = time.perf_counter()
+    arrays.trait_counts()
+    arrays.power()
+    direct = time.perf_counter()
+    print(f"{args.boards:,} boards, trait counts + power:")
+    print(f"  objects          {(objects - start) * 1000:7.0f} ms  calculate_traits + board_stats")
+    print(f"  _from_players()  {(copied - objects) * 1000:7.0f} ms  load {(loaded - objects) * 1000:.0f} + "
+          f"queries {(copied - loaded) * 1000:.0f}")
+    print(f"  from_comps()     {(direct - copied) * 1000:7.0f} ms  build {(built - copied) * 1000:.0f} + "
+          f"queries {(direct - built) * 1000:.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+# bot.py - heuristic AI that plays a Player through the same API the UI uses
+#
+# Every decision is a few passes over the 5 shop slots, 9 bench slots and the board,
+# so a whole planning phase costs well under a millisecond per action.
+import random
+
+from game_constants import GameConstants
+from player import HUGO_REPLACEMENTS
+from roster import TRAIT_INFO
+
+# The UI only shows and accepts drops on the first 3 board rows
+BOARD_ROWS = 3
+STAR_VALUE = {1: 1.0, 2: 3.0, 3: 9.0}
+# Keep at least this much gold after buying so interest keeps growing (by round)
+ECON_FLOORS = [(1, 0), (4, 10), (8, 30), (14, 20), (20, 0)]
+INTEREST_CAP_GOLD = 50
+# Safety net: a planning phase never takes more actions than this
+MAX_ACTIONS_PER_TURN = 60
+# Extra value of a unit in the comp the bot is building towards (see comp_finder.py)
+COMP_BONUS = 3.0
+
+
+def target_level(round_number):
+    """Level the bot tries to be at by this round"""
+    return min(10, 3 + round_number // 3)
+
+
+def econ_floor(round_number):
+    floor = 0
+    for start_round, gold in ECON_FLOORS:
+        if round_number >= start_round:
+            floor = gold
+    return floor
+
+
+def trait_synergy(traits, trait_counts):
+    """How much adding a unit with these traits helps the board's trait thresholds"""
+    score = 0.0
+    for trait in traits:
+        thresholds = TRAIT_INFO.get(trait, {}).get("thresholds", [])
+        count = trait_counts.get(trait, 0) + 1
+        if count in thresholds:
+            score += 2.0
+        elif any(0 < threshold - count <= 1 for threshold in thresholds):
+            score += 1.0
+        score += 0.25 * min(count, 6)
+    return score
+
+
+class HeuristicBot:
+    """Plays one Player's planning phase: level, buy, roll, position.
+
+    Decisions weigh a unit's cost and star level against how close it brings the board's
+    traits to their next threshold, plus a bonus for units of the comp it was given.
+    """
+
+    def __init__(self, player, rng=None, front_row=BOARD_ROWS - 1, comp=None):
+        self.player = player
+        self.rng = rng if rng is not None else random.Random()
+        # Row nearest the enemy; tanky units go there
+        self.front_row = front_row
+        # Champion names of a comp library entry to favour; empty plays by traits alone
+        self.comp = frozenset(comp or ())
+        self.actions_taken = 0
+
+    # --- evaluation ---
+
+    def unit_value(self, unit, on_board=False):
+        trait_counts = dict(self.player.traits) if hasattr(self.player, 'traits') else {}
+        if on_board:
+            # Judge a board unit by what it contributes, not by what it adds on top of itself
+            for trait in unit.traits:
+                trait_counts[trait] = trait_counts.get(trait, 1) - 1
+        value = unit.cost * STAR_VALUE.get(unit.stars, 1.0)
+        value += trait_synergy(unit.traits, trait_counts)
+        if unit.name in self.comp:
+            value += COMP_BONUS
+        copies = self.copies_owned(unit.name, unit.stars)
+        if unit.stars < 3 and copies:
+            # Holding pairs is how units star up
+            value += unit.cost * 1.5 * min(copies, 2)
+        return value
+
+    def copies_owned(self, name, stars):
+        count = 0
+        for unit in self.player.bench:
+            if unit and unit.name == name and unit.stars == stars:
+                count += 1
+        for row in self.player.board:
+            for unit in row:
+                if unit and unit.name == name and unit.stars == stars:
+                    count += 1
+        return count
+
+    def board_units(self):
+        return [(x, y, self.player.board[y][x]) for y in range(BOARD_ROWS)
+                for x in range(GameConstants.BOARD_WIDTH) if self.player.board[y][x]]
+
+    def board_capacity(self):
+        return GameConstants.MAX_BOARD_UNITS[self.player.level - 1]
+
+    # --- decisions (each returns True when it performed an action) ---
+
+    def try_level(self):
+        p = self.player
+        if (p.level < 10 and p.level < target_level(p.round) and
+                p.gold - 4 >= econ_floor(p.round)):
+            return p.buy_xp()
+        return False
+
+    def try_buy(self):
+        p = self.player
+        floor = econ_floor(p.round)
+        best_index, best_value = None, 0.0
+        for i, unit in enumerate(p.shop):
+            if unit is None or unit.cost > p.gold:
+                continue
+            completes_upgrade = p.can_combine_anywhere(unit)
+            if not completes_upgrade and p.gold - unit.cost < floor:
+                continue
+            value = self.unit_value(unit) + (10.0 if completes_upgrade else 0.0)
+            if value > best_value:
+                best_index, best_value = i, value
+        if best_index is None:
+            return False
+
+        unit = p.shop[best_index]
+        if p.can_combine_anywhere(unit):
+            if None in p.bench or self.make_bench_room(best_value):
+                return p.buy_and_combine(best_index)
+            return False
+        if None not in p.bench and not self.make_bench_room(best_value):
+            return False
+        return p.buy_unit(best_index)
+
+    def make_bench_room(self, incoming_value):
+        """Sell the weakest bench unit if it is worth less than what we want to buy"""
+        p = self.player
+        worst_index, worst_value = None, incoming_value
+        for i, unit in enumerate(p.bench):
+            if unit is None:
+                return True
+            value = self.unit_value(unit)
+            if value < worst_value:
+                worst_index, worst_value = i, value
+        if worst_index is None:
+            return False
+        return p.sell_unit(worst_index)
+
+    def try_roll(self):
+        p = self.player
+        # Only roll with gold above the interest cap, or once the board is at its final level
+        spare = p.gold - max(INTEREST_CAP_GOLD if p.level < 8 else econ_floor(p.round), p.refresh_cost)
+        if spare >= p.refresh_cost and p.round >= 3:
+            return p.refresh_shop()
+        return False
+
+    def try_place(self):
+        """Move the best bench unit onto the board, swapping out a weaker one if the board is full"""
+        p = self.player
+        best_index, best_value = None, None
+        for i, unit in enumerate(p.bench):
+            if unit is None:
+                continue
+            value = self.unit_value(unit)
+            if best_value is None or value > best_value:
+                best_index, best_value = i, value
+        if best_index is None:
+            return False
+
+        placed = self.board_units()
+        if len(placed) < self.board_capacity():
+            x, y = self.free_slot(p.bench[best_index])
+            if x is not None:
+                return p.move_unit_to_board(best_index, x, y)
+            return False
+
+        weakest = None
+        for x, y, unit in placed:
+            value = self.unit_value(unit, on_board=True)
+            if weakest is None or value < weakest[0]:
+                weakest = (value, x, y)
+        # Require a clear improvement so two similar units don't swap back and forth
+        if weakest and best_value > weakest[0] + 0.5:
+            return p.swap_bench_and_board(best_index, weakest[1], weakest[2])
+        return False
+
+    def free_slot(self, unit):
+        """Empty board slot for a unit: tanks fill from the front row, damage dealers from the back"""
+        tanky = unit.health >= unit.damage * 10
+        rows = list(range(BOARD_ROWS))
+        if self.front_row == 0:
+            rows.reverse()
+        if tanky:
+            rows.reverse()
+        for y in rows:
+            for x in range(GameConstants.BOARD_WIDTH):
+                if self.player.board[y][x] is None:
+                    return x, y
+        return None, None
+
+    def try_hugo(self):
+        p = self.player
+        if p.hugo_choice_pending:
+            return p.choose_hugo_replacement(self.rng.choice(sorted(HUGO_REPLACEMENTS)))
+        return False
+
+    # --- driver ---
+
+    def take_turn(self):
+        """Play one planning phase; returns how many actions were taken"""
+        self.actions_taken = 0
+        steps = [self.try_hugo, self.try_level, self.try_buy, self.try_place, self.try_roll]
+        while self.actions_taken < MAX_ACTIONS_PER_TURN:
+            for step in steps:
+                if step():
+                    self.actions_taken += 1
+                    break
+            else:
+                break
+        return self.actions_taken
+
+    def play_round(self):
+        """End the current round (income, XP, free shop) and play the next planning phase"""
+        self.player.end_turn()
+        return self.take_turn()
@@ -0,0 +1,152 @@
+# client.py - asyncio client for server.py
+#
+#   client = await GameClient.connect("127.0.0.1", 8765, name="Luke")
+#   await client.join()
+#   await client.wait_for_phase("planning")
+#   ack = await client.action(BUY_UNIT, 0)
+#   await client.ready()
+import asyncio
+
+from state_sync import StateMirror, ACK
+
+from net_protocol import (PROTOCOL_VERSION, DEFAULT_HOST, DEFAULT_PORT, encode_frame, decode_json, read_frame,
+                          MSG_HELLO, MSG_JOIN, MSG_ACTION, MSG_READY, MSG_PING, MSG_STATE_ACK, MSG_WELCOME, MSG_JOINED, MSG_ACK,
+                          MSG_STATE, MSG_PHASE, MSG_COMBAT, MSG_GAME_OVER, MSG_ERROR, MSG_PONG)
+
+
+class GameClient:
+    """One connection to the server; keeps the latest state, phase and combat results"""
+
+    def __init__(self, reader, writer, name):
+        self.reader = reader
+        self.writer = writer
+        self.name = name
+        self.client_id = None
+        self.lobby = None
+        self.seat = None
+        self.state = None
+        self.mirror = StateMirror()
+        self.phase = None
+        self.round = 0
+        self.last_combat = None
+        self.placement = None
+        self.errors = []
+        self.next_seq = 1
+        self.pending = {}       # seq -> future resolved by the matching ACK
+        self.waiters = []       # (predicate, future) pairs checked after every message
+        self.reader_task = None
+
+    @classmethod
+    async def connect(cls, host=DEFAULT_HOST, port=DEFAULT_PORT, name="Player"):
+        reader, writer = await asyncio.open_connection(host, port)
+        client = cls(reader, writer, name)
+        client.reader_task = asyncio.create_task(client.read_loop())
+        welcome = client.wait_for(lambda c, t, b: t == MSG_WELCOME)
+        client.send(MSG_HELLO, {"name": name, "version": PROTOCOL_VERSION})
+        await welcome
+        return client
+
+    def send(self, msg_type, body=None):
+        self.writer.write(encode_frame(msg_type, {} if body is None else body))
+
+    async def read_loop(self):
+        try:
+            while True:
+                msg_type, body = await read_frame(self.reader)
+                self.handle(msg_type, body if msg_type == MSG_STATE else decode_json(body))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for future in list(self.pending.values()) + [f for _, f in self.waiters]:
+                if not future.done():
+                    future.set_exception(ConnectionError("server closed the connection"))
+            self.pending.clear()
+            self.waiters.clear()
+
+    def handle(self, msg_type, body):
+        if msg_type == MSG_ACK:
+            future = self.pending.pop(body.get("seq"), None)
+            if future is not None and not future.done():
+                future.set_result(body)
+        elif msg_type == MSG_STATE:
+            version = self.mirror.apply(body)
+            if version is None:
+                self.send(MSG_STATE_ACK, ACK.pack(0))
+            else:
+                self.state = self.mirror.view()
+                self.send(MSG_STATE_ACK, ACK.pack(version))
+        elif msg_type == MSG_PHASE:
+            self.phase = body["phase"]
+            self.round = body["round"]
+        elif msg_type == MSG_COMBAT:
+            self.last_combat = body
+        elif msg_type == MSG_GAME_OVER:
+            self.placement = body["placement"]
+            self.phase = "finished"
+            self.lobby = None
+            self.seat = None
+        elif msg_type == MSG_WELCOME:
+            self.client_id = body["client_id"]
+        elif msg_type == MSG_JOINED:
+            self.lobby = body["lobby"]
+            self.seat = body["seat"]
+            self.placement = None
+            self.phase = "waiting"
+            self.mirror = StateMirror()
+        elif msg_type == MSG_ERROR:
+            self.errors.append(body.get("error"))
+
+        still_waiting = []
+        for predicate, future in self.waiters:
+            if future.done():
+                continue
+            if predicate(self, msg_type, body):
+                future.set_result(body)
+            else:
+                still_waiting.append((predicate, future))
+        self.waiters = still_waiting
+
+    def wait_for(self, predicate):
+        """Future resolved with the body of the first message for which predicate(client, type, body) is true"""
+        future = asyncio.get_running_loop().create_future()
+        self.waiters.append((predicate, future))
+        return future
+
+    async def join(self):
+        joined = self.wait_for(lambda c, t, b: t == MSG_JOINED)
+        self.send(MSG_JOIN)
+        return await joined
+
+    async def wait_for_phase(self, phase):
+        if self.phase == phase:
+            return
+        await self.wait_for(lambda c, t, b: c.phase == phase)
+
+    async def action(self, op, *args):
+        """Send one action and wait for the server's verdict: {"seq", "ok", "result" | "error"}"""
+        seq = self.next_seq
+        self.next_seq += 1
+        future = asyncio.get_running_loop().create_future()
+        self.pending[seq] = future
+        self.send(MSG_ACTION, {"seq": seq, "op": op, "args": list(args)})
+        return await future
+
+    async def ready(self):
+        self.send(MSG_READY)
+
+    async def ping(self):
+        loop = asyncio.get_running_loop()
+        pong = self.wait_for(lambda c, t, b: t == MSG_PONG)
+        start = loop.time()
+        self.send(MSG_PING, {"t": start})
+        await pong
+        return loop.time() - start
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+        if self.reader_task is not None:
+            await asyncio.gather(self.reader_task, return_exceptions=True)
@@ -2,43 +2,55 @@
 import pygame
 import random
 
+from trait_effects import board_stats
+
 
 class CombatManager:
-    def __init__(self):
+    def __init__(self, rng=None, verbose=True):
         self.combat_active = False
+        # Headless simulations turn this off; printing dominates the cost of a fight
+        self.verbose = verbose
+        # Any randomness in combat must come from here so fights replay identically (see rng.py)
+        self.rng = rng if rng is not None else random.Random()
+
+    def start_combat(self, player_board, opponent_board, player_modifiers=None, opponent_modifiers=None):
+        """Start combat between player and opponent boards.
 
-    def start_combat(self, player_board, opponent_board):
-        """Start combat between player and opponent boards"""
+        The modifiers are each board's compiled trait bonuses (Player.trait_modifiers, see
+        trait_effects.py); None fights with the units' own stats.
+        """
         self.combat_active = True
 
         # Calculate total stats for each team
-        player_health = sum(unit.health for row in player_board for unit in row if unit and unit.health > 0)
-        player_damage = sum(unit.damage for row in player_board for unit in row if unit and unit.health > 0)
-
-        opponent_health = sum(unit.health for row in opponent_board for unit in row if unit and unit.health > 0)
-        opponent_damage = sum(unit.damage for row in opponent_board for unit in row if unit and unit.health > 0)
+        player_health, player_damage = board_stats(player_board, player_modifiers)
+        opponent_health, opponent_damage = board_stats(opponent_board, opponent_modifiers)
 
-        print(
-            f"Combat: Player {player_health}HP/{player_damage}DMG vs Opponent {opponent_health}HP/{opponent_damage}DMG")
+        if self.verbose:
+            print(
+                f"Combat: Player {player_health}HP/{player_damage}DMG vs Opponent {opponent_health}HP/{opponent_damage}DMG")
 
         # Determine winner based on combined health + damage
         player_power = player_health + player_damage
         opponent_power = opponent_health + opponent_damage
 
         if player_power > opponent_power:
-            print("Player wins combat!")
+            if self.verbose:
+                print("Player wins combat!")
             return True  # Player wins
         else:
-            print("Opponent wins combat!")
+            if self.verbose:
+                print("Opponent wins combat!")
             return False  # Opponent wins
 
     def strengthen_opponent(self, opponent_board, round_number):
-        """Make opponent board stronger each round"""
-        for y, row in enumerate(opponent_board):
-            for x, unit in enumerate(row):
+        """Set opponent units to their stats for this round.
+
+        Stats come from the champion's base stats scaled once for the round (see
+        opponent_generator.py), so calling this every round doesn't compound.
+        """
+        from opponent_generator import round_scaled_stats
+        for row in opponent_board:
+            for unit in row:
                 if unit:
-                    # Increase stats based on round
-                    stat_increase = round_number * 0.1  # 10% increase per round
-                    unit.health = int(unit.health * (1 + stat_increase))
-                    unit.damage = int(unit.damage * (1 + stat_increase))
+                    unit.health, unit.damage = round_scaled_stats(unit.name, unit.stars, round_number)
                     unit.max_health = unit.health
\ No newline at end of file
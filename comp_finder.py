@@ -0,0 +1,344 @@
+# comp_finder.py - team compositions that activate the most trait thresholds
+#
+# Usage:
+#   python comp_finder.py --level 8                          # best 8-unit comps at level 8
+#   python comp_finder.py --level 7 --owned Batman Robin     # best comps keeping these units
+#   python comp_finder.py --level 8 9 10 --export data/comp_library.json
+#
+# A level's board size comes from GameConstants.MAX_BOARD_UNITS and its shop odds decide
+# which costs can show up. Every trait is a bit, every champion the bitmask of its traits.
+# Champions with the same mask are interchangeable for traits, so the search runs over mask
+# groups - how many of each group to field - depth first, strongest groups first. A branch
+# is cut when an upper bound on what its open slots could still add can't beat the results
+# kept so far, and trait-count states already searched from the same point are skipped.
+#
+# A group choice can be filled by different champions of each group. Every way of filling
+# the comps found (up to MAX_VARIANTS each) is built straight into BoardArrays and the one
+# with the most 1-star power - health + damage with trait effects, as combat compares - wins;
+# it also orders comps of equal score.
+#
+# Objectives, each counting only traits needing 2+ units unless --unique-traits is given:
+#   "traits"  the most active traits, then the most thresholds reached
+#   "depth"   the most thresholds reached (Justice League at 6 counts 3), then the most traits
+#
+# --export writes a comp library: bots can be given a comp to build towards (see
+# HeuristicBot's comp argument and lobby.py --comps) and OpponentGenerator can field it.
+import argparse
+import heapq
+import itertools
+import json
+import os
+import sys
+import time
+
+from board_arrays import BoardArrays
+from config_service import atomic_write
+from game_constants import GameConstants
+from player import SHOP_ODDS
+from roster import DATA_DIR, UNIT_ROSTER, HUGO_STRANGE, TRAIT_INFO
+
+OBJECTIVES = ("traits", "depth")
+COMP_LIBRARY_FILE = os.path.join(DATA_DIR, "comp_library.json")
+LIBRARY_VERSION = 1
+# The secondary part of a score; more than any board can total (33 traits x 4 thresholds)
+TIE = 1000
+# Most ways of picking a comp's champions compared for power
+MAX_VARIANTS = 5000
+
+# Champions a shop can offer: the roster plus Hugo Strange
+SHOP_CHAMPIONS = {entry[0]: entry for entry in UNIT_ROSTER + [HUGO_STRANGE]}
+
+
+def trait_scores(objective, unique_traits=False):
+    """trait -> score at each unit count up to the trait's last threshold, for the traits that count"""
+    if objective not in OBJECTIVES:
+        raise ValueError(f"unknown objective {objective!r}")
+    scores = {}
+    for trait, info in TRAIT_INFO.items():
+        thresholds = info["thresholds"]
+        if not thresholds or (thresholds[0] < 2 and not unique_traits):
+            continue
+        row = []
+        for count in range(thresholds[-1] + 1):
+            tier = sum(1 for threshold in thresholds if count >= threshold)
+            if tier == 0:
+                row.append(0)
+            elif objective == "traits":
+                row.append(TIE + tier)
+            else:
+                row.append(tier * TIE + 1)
+        scores[trait] = row
+    return scores
+
+
+def level_costs(level):
+    """Unit costs a shop can offer at this level"""
+    return {cost for cost, chance in enumerate(SHOP_ODDS[max(1, min(level, 10))], start=1) if chance > 0}
+
+
+class CompSearch:
+    """Branch and bound for the best `results` comps of `slots` champions, owned ones always included"""
+
+    def __init__(self, champions, slots, objective="traits", unique_traits=False, owned=(), results=5):
+        self.scores = trait_scores(objective, unique_traits)
+        self.trait_names = sorted(self.scores)
+        trait_bits = {trait: bit for bit, trait in enumerate(self.trait_names)}
+        self.rows = [self.scores[trait] for trait in self.trait_names]
+        self.caps = [len(row) - 1 for row in self.rows]
+        self.results = results
+
+        owned = list(dict.fromkeys(owned))
+        if len(owned) > slots:
+            raise ValueError(f"{len(owned)} owned units don't fit on a {slots}-unit board")
+        self.owned = owned
+        self.slots = slots - len(owned)
+        self.start_counts = [0] * len(self.trait_names)
+        for name in owned:
+            for trait in SHOP_CHAMPIONS[name][2]:
+                if trait in trait_bits:
+                    self.start_counts[trait_bits[trait]] += 1
+
+        # Champions grouped by trait mask; a mask of 0 adds nothing and is left out
+        groups = {}
+        for name, (_, cost, traits, _, _) in champions.items():
+            if name in owned:
+                continue
+            mask = 0
+            for trait in traits:
+                if trait in trait_bits:
+                    mask |= 1 << trait_bits[trait]
+            if mask:
+                groups.setdefault(mask, []).append((-cost, name))
+        ordered = sorted(groups.items(), key=lambda item: (-bin(item[0]).count("1"), -len(item[1]), item[0]))
+        self.group_names = [[name for _, name in sorted(members)] for _, members in ordered]
+        self.group_bits = [[bit for bit in range(len(self.trait_names)) if mask >> bit & 1] for mask, _ in ordered]
+
+        # Per group index: units of each trait left from there on, and the most traits one of them has
+        self.suffix = [[0] * len(self.trait_names) for _ in range(len(ordered) + 1)]
+        self.most_bits = [0] * (len(ordered) + 1)
+        for i in range(len(ordered) - 1, -1, -1):
+            self.suffix[i] = list(self.suffix[i + 1])
+            for bit in self.group_bits[i]:
+                self.suffix[i][bit] += len(self.group_names[i])
+            self.most_bits[i] = max(self.most_bits[i + 1], len(self.group_bits[i]))
+        self.live = [[bit for bit, left in enumerate(row) if left] for row in self.suffix]
+        # (trait, count, units more) -> envelope segments of the score gained adding units, see _gain
+        self.gains = [[[self._gain(row, count, more) for more in range(len(row))] for count in range(len(row))]
+                      for row in self.rows]
+
+        self.kept = []      # min-heap of (score, counts, choice)
+        self.seen = set()
+        self.nodes = 0
+
+    @staticmethod
+    def _gain(row, count, more):
+        """(ratio, gain) segments of the concave envelope of the score gained adding up to `more` units,
+        best ratio first: no d units can gain more than the segments' first d units"""
+        more = min(more, len(row) - 1 - count)
+        segments = []
+        start = 0
+        while start < more:
+            ratio, end = max(((row[count + d] - row[count + start]) / (d - start), d)
+                             for d in range(start + 1, more + 1))
+            if ratio <= 0:
+                break
+            segments.append((ratio, row[count + end] - row[count + start]))
+            start = end
+        return segments
+
+    def score(self, counts):
+        return sum(row[min(count, len(row) - 1)] for row, count in zip(self.rows, counts))
+
+    def bound(self, index, open_slots, counts):
+        """Most the open slots could add. Each trait gains at most ratio * units added (its best
+        score per unit), so both of these bound it:
+          by trait  no trait gains more than its units left allow, and open_slots units add at
+                    most open_slots * most_bits trait counts in all
+          by unit   the open_slots units whose traits' ratios add up to the most"""
+        ratios = [0.0] * len(self.rows)
+        items = []
+        for bit in self.live[index]:
+            count = min(counts[bit], self.caps[bit])
+            segments = self.gains[bit][count][min(open_slots, self.suffix[index][bit], self.caps[bit])]
+            if segments:
+                items += segments
+                ratios[bit] = segments[0][0]
+        items.sort(reverse=True)
+        budget = open_slots * self.most_bits[index]
+        by_trait = 0
+        for ratio, gain in items:
+            if gain <= ratio * budget:
+                by_trait += gain
+                budget -= gain / ratio
+            else:
+                by_trait += ratio * budget
+                break
+        units = sorted(((sum(ratios[bit] for bit in self.group_bits[group]), len(self.group_names[group]))
+                        for group in range(index, len(self.group_names))), reverse=True)
+        by_unit, left = 0, open_slots
+        for per_unit, size in units:
+            take = min(size, left)
+            by_unit += per_unit * take
+            left -= take
+            if not left:
+                break
+        return min(by_trait, by_unit)
+
+    def run(self):
+        counts = list(self.start_counts)
+        self._search(0, self.slots, counts, self.score(counts), [])
+        kept = sorted(self.kept, reverse=True)
+        # Every way of filling each comp's groups, scored for power in one batch
+        variants, owners = [], []
+        for comp, (_, _, choice) in enumerate(kept):
+            picks = itertools.product(*(itertools.combinations(self.group_names[group], take)
+                                        for group, take in choice))
+            for pick in itertools.islice(picks, MAX_VARIANTS):
+                variants.append(self.owned + [name for names in pick for name in names])
+                owners.append(comp)
+        power = BoardArrays.from_comps(variants).power()
+        best = {}
+        for variant, comp in enumerate(owners):
+            if comp not in best or power[variant] > power[best[comp]]:
+                best[comp] = variant
+        found = [self.describe(variants[best[comp]], score, int(power[best[comp]]))
+                 for comp, (score, _, _) in enumerate(kept)]
+        return sorted(found, key=lambda comp: (comp["score"], comp["power"]), reverse=True)
+
+    def _keep(self, score, counts, choice):
+        entry = (score, bytes(counts), tuple(choice))
+        if len(self.kept) < self.results:
+            heapq.heappush(self.kept, entry)
+        elif entry > self.kept[0]:
+            heapq.heapreplace(self.kept, entry)
+
+    def _search(self, index, open_slots, counts, score, choice):
+        self.nodes += 1
+        if open_slots == 0 or index == len(self.group_names):
+            self._keep(score, counts, choice)
+            return
+        # Seen first: a state pruned once stays pruned, as the results kept only get better
+        key = (index, open_slots, bytes(counts))
+        if key in self.seen:
+            return
+        self.seen.add(key)
+        # Scores are whole numbers, so the fractional part of the bound can't matter
+        if len(self.kept) == self.results and score + int(self.bound(index, open_slots, counts)) <= self.kept[0][0]:
+            return
+
+        bits, rows = self.group_bits[index], self.rows
+        for take in range(min(open_slots, len(self.group_names[index])), -1, -1):
+            gained = 0
+            for bit in bits:
+                row, count = rows[bit], counts[bit]
+                cap = len(row) - 1
+                gained += row[min(count + take, cap)] - row[min(count, cap)]
+                counts[bit] = count + take
+            if take:
+                choice.append((index, take))
+            self._search(index + 1, open_slots - take, counts, score + gained, choice)
+            if take:
+                choice.pop()
+            for bit in bits:
+                counts[bit] -= take
+
+    def describe(self, units, score, power):
+        """{"units", "score", "power", "traits": {trait: count}} of the active traits, cheapest units first
+        (the order a comp comes together in, and the order OpponentGenerator fields units)"""
+        counts = {}
+        for name in units:
+            for trait in SHOP_CHAMPIONS[name][2]:
+                if trait in self.scores:
+                    counts[trait] = counts.get(trait, 0) + 1
+        active = {trait: count for trait, count in counts.items()
+                  if count >= TRAIT_INFO[trait]["thresholds"][0]}
+        units = sorted(units, key=lambda name: (SHOP_CHAMPIONS[name][1], name))
+        return {"units": units, "score": score, "power": power,
+                "traits": dict(sorted(active.items(), key=lambda item: (-item[1], item[0])))}
+
+
+def find_comps(level, objective="traits", owned=(), results=5, unique_traits=False, any_cost=False):
+    """The best `results` comps for a level's board size, best first; see CompSearch.describe for the format.
+
+    owned champions are always in the comp; unless any_cost, the others are champions the
+    level's shop can offer. Raises ValueError for an unknown champion or too many owned.
+    """
+    for name in owned:
+        if name not in SHOP_CHAMPIONS:
+            raise ValueError(f"unknown champion {name!r}")
+    slots = GameConstants.MAX_BOARD_UNITS[max(1, min(level, len(GameConstants.MAX_BOARD_UNITS))) - 1]
+    costs = level_costs(level)
+    champions = {name: entry for name, entry in SHOP_CHAMPIONS.items() if any_cost or entry[1] in costs}
+    return CompSearch(champions, slots, objective, unique_traits, owned, results).run()
+
+
+def comp_name(comp):
+    """"Justice League 6 / Sorcerer 4" from the comp's two biggest traits"""
+    return " / ".join(f"{trait} {count}" for trait, count in list(comp["traits"].items())[:2]) or "No traits"
+
+
+def export_library(path, comps_by_level, objective):
+    """Write {level: [comps]} as a comp library file"""
+    comps = [{"name": comp_name(comp), "level": level, "units": comp["units"], "traits": comp["traits"]}
+             for level, comps in sorted(comps_by_level.items()) for comp in comps]
+    data = {"version": LIBRARY_VERSION, "objective": objective, "comps": comps}
+    atomic_write(path, (json.dumps(data, indent=1) + "\n").encode("utf-8"))
+
+
+def load_library(path=COMP_LIBRARY_FILE, min_units=0, with_levels=False):
+    """[(name, units)] from a comp library file, keeping comps of at least min_units; raises ValueError if invalid.
+
+    with_levels adds each comp's level: [(name, units, level)].
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or data.get("version") != LIBRARY_VERSION or not isinstance(data.get("comps"), list):
+        raise ValueError(f"{path}: not a version {LIBRARY_VERSION} comp library")
+    library = []
+    for comp in data["comps"]:
+        units = comp.get("units") if isinstance(comp, dict) else None
+        if not isinstance(units, list) or not all(name in SHOP_CHAMPIONS for name in units):
+            raise ValueError(f"{path}: bad comp {comp!r}")
+        level = comp.get("level")
+        if with_levels and (not isinstance(level, int) or isinstance(level, bool) or not 1 <= level <= 10):
+            raise ValueError(f"{path}: bad level in comp {comp!r}")
+        if len(units) >= min_units:
+            library.append((comp.get("name") or "Comp", units, level) if with_levels else
+                           (comp.get("name") or "Comp", units))
+    return library
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find trait-maximizing team compositions")
+    parser.add_argument("--level", type=int, nargs="+", dest="levels", default=[8])
+    parser.add_argument("--objective", choices=OBJECTIVES, default="traits")
+    parser.add_argument("--owned", nargs="+", default=[], help="champions the comp must keep")
+    parser.add_argument("--results", type=int, default=5, help="comps to keep per level")
+    parser.add_argument("--unique-traits", action="store_true", help="count single-unit traits too")
+    parser.add_argument("--any-cost", action="store_true", help="ignore which costs the level's shop offers")
+    parser.add_argument("--export", metavar="FILE", help="write the comps found as a comp library")
+    args = parser.parse_args()
+
+    comps_by_level = {}
+    for level in args.levels:
+        start = time.perf_counter()
+        try:
+            comps = find_comps(level, args.objective, args.owned, args.results, args.unique_traits, args.any_cost)
+        except ValueError as e:
+            print(e)
+            return 1
+        elapsed = time.perf_counter() - start
+        comps_by_level[level] = comps
+        print(f"Level {level} ({elapsed:.2f} s):")
+        for comp in comps:
+            traits = ", ".join(f"{trait} {count}" for trait, count in comp["traits"].items())
+            print(f"  {comp['score']:>6}  {', '.join(comp['units'])}")
+            print(f"          {traits}; power {comp['power']}")
+    if args.export:
+        export_library(args.export, comps_by_level, args.objective)
+        print(f"Wrote {sum(len(comps) for comps in comps_by_level.values())} comps to {args.export}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
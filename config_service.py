@@ -0,0 +1,215 @@
+# config_service.py - single owner of game_config.json
+import json
+import os
+import tempfile
+import threading
+import time
+
+from quality_governor import QUALITY_TIERS
+
+CONFIG_FILE = "game_config.json"
+# Fraction of the window resolution the game is drawn at; DisplayManager cycles through these
+RENDER_SCALES = [1.0, 0.75, 0.5]
+
+
+def _is_bool(value):
+    return isinstance(value, bool)
+
+
+def _int_between(low, high):
+    def check(value):
+        return isinstance(value, int) and not isinstance(value, bool) and low <= value <= high
+    return check
+
+
+def _number_between(low, high):
+    def check(value):
+        return isinstance(value, (int, float)) and not isinstance(value, bool) and low <= value <= high
+    return check
+
+
+def _number_in(values):
+    def check(value):
+        return isinstance(value, (int, float)) and not isinstance(value, bool) and value in values
+    return check
+
+
+def _is_resolution(value):
+    return (isinstance(value, (list, tuple)) and len(value) == 2 and
+            all(isinstance(v, int) and not isinstance(v, bool) and v > 0 for v in value))
+
+
+# key -> (default, validator). This is the only place config defaults live.
+CONFIG_SCHEMA = {
+    "resolution": ([1920, 1080], _is_resolution),
+    "fullscreen": (False, _is_bool),
+    "borderless": (False, _is_bool),
+    "render_scale": (1.0, _number_in(RENDER_SCALES)),
+    "dynamic_quality": (True, _is_bool),
+    "quality_tier": (0, _int_between(0, len(QUALITY_TIERS) - 1)),
+    "target_fps": (60, _int_between(15, 240)),
+    "show_profiler": (False, _is_bool),
+    "fast_start": (False, _is_bool),
+    "economy_hint": (False, _is_bool),
+    "music_volume": (0.7, _number_between(0.0, 1.0)),
+    "sfx_volume": (0.8, _number_between(0.0, 1.0)),
+}
+
+
+def default_config():
+    return {key: (list(default) if isinstance(default, list) else default)
+            for key, (default, _) in CONFIG_SCHEMA.items()}
+
+
+def atomic_write(path, data):
+    """Write bytes to path so readers only ever see the old or the new file, never half of one"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class ConfigService:
+    """Loads the config once and writes it back on a background thread.
+
+    set() only updates memory and marks the config dirty. The writer waits until no change
+    has arrived for `debounce` seconds, then writes one snapshot atomically, so cycling
+    through every resolution costs a single write. Call flush() before exiting.
+    """
+
+    def __init__(self, path=CONFIG_FILE, debounce=0.5):
+        self.path = path
+        self.debounce = debounce
+        self._values = default_config()
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._dirty = False
+        self._deadline = 0.0
+        self._closed = False
+        self._writer = None
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            self._values = default_config()
+            self._schedule_save()
+            return
+
+        try:
+            with open(self.path, 'r') as f:
+                loaded = json.load(f)
+            if not isinstance(loaded, dict):
+                raise ValueError("top level is not an object")
+        except (OSError, ValueError) as e:
+            # Keep the broken file around for inspection instead of silently overwriting it
+            backup = self.path + ".corrupt"
+            print(f"Config {self.path} is unreadable ({e}); using defaults, old file kept as {backup}")
+            try:
+                os.replace(self.path, backup)
+            except OSError:
+                pass
+            self._values = default_config()
+            self._schedule_save()
+            return
+
+        values = default_config()
+        needs_save = False
+        for key, value in loaded.items():
+            if key not in CONFIG_SCHEMA:
+                values[key] = value  # keep keys newer versions may have written
+                continue
+            default, is_valid = CONFIG_SCHEMA[key]
+            if is_valid(value):
+                values[key] = value
+            else:
+                print(f"Config value {key}={value!r} is invalid, using default {default!r}")
+                needs_save = True
+        needs_save = needs_save or any(key not in loaded for key in CONFIG_SCHEMA)
+        self._values = values
+        if needs_save:
+            self._schedule_save()
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._values.get(key, default)
+
+    def set(self, key, value):
+        if key in CONFIG_SCHEMA:
+            if isinstance(value, tuple):
+                value = list(value)
+            if not CONFIG_SCHEMA[key][1](value):
+                raise ValueError(f"Invalid value for config key {key}: {value!r}")
+        with self._lock:
+            if self._values.get(key) == value:
+                return
+            self._values[key] = value
+        self._schedule_save()
+
+    def __getitem__(self, key):
+        with self._lock:
+            return self._values[key]
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._values)
+
+    def _schedule_save(self):
+        with self._lock:
+            self._dirty = True
+            self._deadline = time.monotonic() + self.debounce
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._writer_loop, name="config-writer", daemon=True)
+                self._writer.start()
+            self._wake.notify()
+
+    def _writer_loop(self):
+        while True:
+            with self._lock:
+                while True:
+                    if self._closed:
+                        return
+                    if self._dirty:
+                        remaining = self._deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._wake.wait(remaining)
+                    else:
+                        self._wake.wait()
+                data = self._serialize()
+                self._dirty = False
+            self._write(data)
+
+    def _serialize(self):
+        return json.dumps(self._values, indent=4).encode("utf-8")
+
+    def _write(self, data):
+        try:
+            atomic_write(self.path, data)
+        except OSError as e:
+            print(f"Failed to save config {self.path}: {e}")
+
+    def flush(self):
+        """Write any pending change now and stop the background writer"""
+        with self._lock:
+            self._closed = True
+            self._wake.notify()
+            data = self._serialize() if self._dirty else None
+            self._dirty = False
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+        with self._lock:
+            self._closed = False
+        if data is not None:
+            self._write(data)
@@ -1,54 +1,33 @@
+# Imported first so the startup trace covers every other import
+from startup_trace import TRACE
+
 import pygame
 import sys
-import json
 import os
 import random
 import math
+import time
+
+TRACE.mark("import pygame")
 
 # Import game modules
 from game_constants import GameConstants, Colors, GameState, DragState
 from display_manager import DisplayManager
+from config_service import ConfigService
 from unit import Unit
 from player import Player
 from ui_elements import Button
-
-# Initialize Pygame
-pygame.init()
-
-# Configuration
-CONFIG_FILE = "game_config.json"
-
-
-def load_config():
-    if os.path.exists(CONFIG_FILE):
-        try:
-            with open(CONFIG_FILE, 'r') as f:
-                return json.load(f)
-        except:
-            return {
-                "resolution": [1920, 1080],
-                "fullscreen": False,
-                "borderless": False,
-                "music_volume": 0.7,
-                "sfx_volume": 0.8
-            }
-    else:
-        with open(CONFIG_FILE, 'w') as f:
-            default_config = {
-                "resolution": [1920, 1080],
-                "fullscreen": False,
-                "borderless": False,
-                "music_volume": 0.7,
-                "sfx_volume": 0.8
-            }
-            json.dump(default_config, f, indent=4)
-        return default_config
-
-
-def save_config(config):
-    with open(CONFIG_FILE, 'w') as f:
-        json.dump(config, f, indent=4)
-
+from quality_governor import QualityGovernor, QUALITY_TIERS
+from roster import TRAIT_INFO
+from bot import HeuristicBot
+from rng import RngStreams
+from rolldown import shop_card_odds
+from save_state import AUTOSAVE_FILE, HUGO_CHOICES, save_game_async
+from action_log import (start_game, LAST_GAME_FILE, BUY_UNIT, BUY_AND_COMBINE, SELL_UNIT, SELL_BOARD_UNIT,
+                        MOVE_TO_BOARD, MOVE_TO_BENCH, SWAP_BENCH_BOARD, SWAP_BOARD, SWAP_BENCH, REFRESH_SHOP,
+                        BUY_XP, END_TURN, HUGO_CHOICE, DEV_GOLD)
+
+TRACE.mark("import game modules")
 
 # Small height increase to close the gap between boards
 UNIT_WIDTH = 180    # Keep the same width
@@ -57,177 +36,13 @@ LARGE_SHOP_UNIT_SIZE = 200
 card_gap = 20
 LARGE_BENCH_UNIT_SIZE = 200
 
-# Define trait thresholds and descriptions
-TRAIT_INFO = {
-    "Bat Family": {
-        "thresholds": [3, 4, 5],
-        "description": "Bat Family units gain bonus attack damage and critical strike chance",
-        "bonuses": ["3: +10% Attack Damage for every 3 star bat family member", "4: +10% Crit Chance per 3 star", "5: +10% damage amp per 3 star"]
-    },
-    "Justice League": {
-        "thresholds": [2, 4, 6, 8],
-        "description": "Justice League members protect each other with shields and bonus stats",
-        "bonuses": ["2: +100 Health to all JL", "4: +200 Health & Shield", "6: +300 Health & Attack Speed",
-                    "8: +500 Health & Teamwide Buff"]
-    },
-    "Rogues Gallery": {
-        "thresholds": [3, 5, 7],
-        "description": "Rogues gain power from losing streaks and chaos effects",
-        "bonuses": ["3: +2 Gold after losing streak", "5: +5 Gold & Bonus Damage", "7: +8 Gold & Chaos Auras"]
-    },
-    "Teen Titans": {
-        "thresholds": [2, 4, 6],
-        "description": "Teen Titans work together with combo attacks and synergy bonuses",
-        "bonuses": ["2: Whole team gets 10% damage amp", "4: 20% damage amp to whole board", "6: Teen titans gain a bonus ability and 30% damage amp to whole board"]
-    },
-    "Threat": {
-        "thresholds": [1],
-        "description": "Darkseid invades the battlefield",
-        "bonuses": ["1: Massive solo power boost to Darkseid"]
-    },
-    "Mind Games": {
-        "thresholds": [1],
-        "description": "Hugo Strange manipulates the enemy team and creates unique opportunities",
-        "bonuses": ["1: Choose a special unit to appear in shop"]
-    },
-    "Suicide Squad": {
-        "thresholds": [2, 4],
-        "description": "Suicide Squad members have explosive attacks",
-        "bonuses": ["2: Abilities now deal explosive aoe damage", "4: Bonus damage to all suicide squad members"]
-    },
-    "Legion of Doom": {
-        "thresholds": [2, 4, 6],
-        "description": "Legion of Doom members grow stronger together with dark powers",
-        "bonuses": ["2: +10% Damage", "4: +25% Damage & Health", "6: +40% damage and health"]
-    },
-    "Kryptonians": {
-        "thresholds": [3, 4, 5],
-        "description": "Kryptonians draw power from the sun, gaining massive stat bonuses",
-        "bonuses": ["3: +30% Health", "4: and 10% damage amp", "5: and 30 protections"]
-    },
-    "League of Assassins": {
-        "thresholds": [2, 4],
-        "description": "Assassins strike from the shadows with lethal precision",
-        "bonuses": ["2: Assassins execute enemies under 10%", "4: Execute under 15% + 10% damage amp to all assassins"]
-    },
-    "Bruiser": {
-        "thresholds": [2, 4, 6],
-        "description": "Bruisers are tough frontliners who gain bonus health and damage reduction",
-        "bonuses": ["2: +200 Health", "4: +500 Health & 20% Damage Reduction", "6: +1000 Health & 40% Damage Reduction"]
-    },
-    "Snipers": {
-        "thresholds": [2, 4, 6],
-        "description": "Snipers attack from range with increased damage and critical strikes",
-        "bonuses": ["2: +2 Range & 25% Damage", "4: +3 Range & 50% Damage", "6: Global Range & 100% Damage"]
-    },
-    "Robots": {
-        "thresholds": [2, 4, 6],
-        "description": "Robots evolve during combat, gaining permanent stat improvements",
-        "bonuses": ["2: Evolve each round", "4: +10% Damage for all robots", "6: Ultimate evolution unlocked"]
-    },
-    "Animals": {
-        "thresholds": [2, 4, 6],
-        "description": "Animal units hunt together with pack tactics and ferocious attacks",
-        "bonuses": ["2: Pack hunting bonus", "4: Alpha predator buff", "6: Primal fury unleashed"]
-    },
-    "Sorcerer": {
-        "thresholds": [2, 4, 6, 8],
-        "description": "Sorcerers wield magical powers that manipulate the battlefield and give attack power",
-        "bonuses": ["2: 15%", "4: 25%", "6: 35%", "8: 50% + 1 Mana Regeneration"]
-    },
-    "Justice League Dark": {
-        "thresholds": [2, 4],
-        "description": "Justice League Dark deals with supernatural threats using dark magic",
-        "bonuses": ["2: Dark magic attacks", "4: Supernatural mastery"]
-    },
-    "Duelists": {
-        "thresholds": [2, 4, 6],
-        "description": "Duelists gain attack speed with each attack, becoming faster as combat continues",
-        "bonuses": ["2: 5% stacking attack speed on hi", "4: 10% stacking attack speed on hit", "+25% damage amp"]
-    },
-    "Fastest Man Alive": {
-        "thresholds": [1],
-        "description": "The Flash moves and attacks at impossible speeds",
-        "bonuses": ["1: Infinite attack speed scaling and +3% attack speed per auto attack"]
-    },
-    "Lets Put You On Ice": {
-        "thresholds": [1],
-        "description": "Captain Cold freezes over the entire battlefield",
-        "bonuses": ["1: All enemies slowed by 15%"]
-    },
-    "Resurrection": {
-        "thresholds": [1],
-        "description": "Solomon Grundy refuses to stay dead, returning to fight again",
-        "bonuses": ["1: Revive once per combat"]
-    },
-    "Lurking In The Waters": {
-        "thresholds": [1],
-        "description": "King Shark ambushes enemies from below with devastating attacks",
-        "bonuses": ["1: Ambush from any water tile"]
-    },
-    "I Have A Question": {
-        "thresholds": [1],
-        "description": "The Question uncovers secrets that give strategic advantages",
-        "bonuses": ["1: Reveal enemy team secrets"]
-    },
-    "Clown Prince of Crime": {
-        "thresholds": [1],
-        "description": "Joker creates chaos and mayhem with unpredictable effects",
-        "bonuses": ["1: Random chaos effects"]
-    },
-    "ADC": {
-        "thresholds": [1],
-        "description": "Attack Damage Carries focus on pure damage output",
-        "bonuses": ["1: Massive damage scaling"]
-    },
-    "Mage": {
-        "thresholds": [1],
-        "description": "Mages wield powerful area-of-effect spells",
-        "bonuses": ["1: Area damage spells"]
-    },
-    "N/A": {
-        "thresholds": [],
-        "description": "No additional trait",
-        "bonuses": []
-    },
-    "Nabu's Chosen": {
-        "thresholds": [1],
-        "description": "While your team has more members Dr. Fate heals, if you have more Dr. Fate deals massive damage",
-        "bonuses": ["1: Either heal or deal damage depending on board state"]
-    },
-    "Familial Bond": {
-        "thresholds": [2],
-        "description": "Increasing familial bond gives your team significantly more damage",
-        "bonuses": "2: When you play both ghul's on your board, give your team +30% damage"
-
-    },
-    "Mad Love": {
-        "thresholds": [2],
-        "description": "The Crime loving duo of destruction give each other boosts",
-        "bonuses": ["2: Harley heals joker for damage done, and joker gives harley a percentage of his protections"]
-    },
-    "Tech": {
-        "thresholds": [2, 4],
-        "description": "Tech",
-        "bonuses": ["something"]
-    },
-    "Monsters": {
-        "thresholds": [2, 3, 4],
-        "description": "Monsters gain health and attack damage for every monster on board",
-        "bonuses": ["2: 20% health and AD", "3: 25% health and AD", "4: 30% health and AD"]
-    },
-    "Rivals": {
-        "thresholds": [2],
-        "description": "Rivals of the ocean motivate each other to improve",
-        "bonuses": ["2: Every round both are placed, give each other +10 AD and AP"]
-    },
-    "Fortune": {
-        "thresholds": [2, 4, 6],
-        "description": "Every kill gotten has a chance to give gold and damage amp",
-        "bonuses": ["2: 15% for 1 gold and 1% damage amp", "4: 25%", "6: 40%"]
-    }
-}
-
+# Active quality settings (see quality_governor.QUALITY_TIERS); main() updates these when the tier changes
+RENDER_QUALITY = dict(QUALITY_TIERS[0])
+# Rendered copies of the non-interactive panels: key -> (surface, rect, frame it was drawn on)
+PANEL_CACHE = {}
+FRAME_COUNTER = [0]
+# Optional info panel extras, set from the config in main()
+INFO_PANEL = {"economy_hint": False}
 
 
 def get_trait_display(trait_name, current_count):
@@ -314,6 +129,27 @@ def draw_trait_tooltip(surface, trait_name, mouse_pos, screen_width, screen_heig
         surface.blit(bonus_text, (tooltip_x + 10, tooltip_y + 65 + i * 15))
 
 
+def scale_surface(surface, size):
+    """Scale an image, dropping to the cheaper nearest-neighbour scale on low quality tiers"""
+    if RENDER_QUALITY["smooth_scaling"]:
+        return pygame.transform.smoothscale(surface, size)
+    return pygame.transform.scale(surface, size)
+
+
+def draw_cached_panel(screen, key, rect, draw_function):
+    """Draw a non-interactive panel, reusing the last render for panel_interval frames"""
+    interval = RENDER_QUALITY["panel_interval"]
+    rect = rect.clip(screen.get_rect())
+    cached = PANEL_CACHE.get(key)
+    if interval > 1 and cached and cached[1] == rect and FRAME_COUNTER[0] - cached[2] < interval:
+        screen.blit(cached[0], rect)
+        return
+
+    draw_function()
+    if interval > 1 and rect.width > 0 and rect.height > 0:
+        PANEL_CACHE[key] = (screen.subsurface(rect).copy(), rect, FRAME_COUNTER[0])
+
+
 def get_unit_border_color(cost):
     """Return border color based on unit cost"""
     if cost == 1:
@@ -349,7 +185,7 @@ def draw_unit_card(surface, unit, rect, show_details=False, is_shop_unit=False):
             png_rect = unit.png_surface.get_rect()
             scale_factor = min(image_area.width / png_rect.width, image_area.height / png_rect.height) * 0.8
             new_size = (int(png_rect.width * scale_factor), int(png_rect.height * scale_factor))
-            scaled_png = pygame.transform.smoothscale(unit.png_surface, new_size)
+            scaled_png = scale_surface(unit.png_surface, new_size)
             png_pos = (rect.centerx - new_size[0] // 2, rect.centery - new_size[1] // 2)
             surface.blit(scaled_png, png_pos)
         except Exception as e:
@@ -370,23 +206,26 @@ def draw_unit_card(surface, unit, rect, show_details=False, is_shop_unit=False):
         font_medium = pygame.font.SysFont('arial', 12, bold=True)
         font_small = pygame.font.SysFont('arial', 10)
 
+    # Text outlines are the first thing dropped when the frame budget is exceeded
+    outlines = RENDER_QUALITY["text_outlines"]
+
     # Draw unit name at the bottom (on top of PNG)
     name_text = font_large.render(unit.name, True, Colors.BUTTON_TEXT)
-    # Add black outline for readability over PNG
-    name_outline = font_large.render(unit.name, True, (0, 0, 0))
     name_rect = name_text.get_rect(centerx=rect.centerx, bottom=rect.bottom - 8)
-    # Draw outline
-    for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, -1), (1, -1), (-1, 1)]:
-        surface.blit(name_outline, (name_rect.x + dx, name_rect.y + dy))
+    if outlines:
+        # Add black outline for readability over PNG
+        name_outline = font_large.render(unit.name, True, (0, 0, 0))
+        for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, -1), (1, -1), (-1, 1)]:
+            surface.blit(name_outline, (name_rect.x + dx, name_rect.y + dy))
     surface.blit(name_text, name_rect)
 
     # Draw cost in top-right corner (on top of PNG)
     cost_text = font_large.render(f"{unit.cost}g", True, Colors.GOLD_COLOR)
-    cost_outline = font_large.render(f"{unit.cost}g", True, (0, 0, 0))
     cost_rect = cost_text.get_rect(topright=(rect.right - 8, rect.y + 8))
-    # Draw outline
-    for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, -1), (1, -1), (-1, 1)]:
-        surface.blit(cost_outline, (cost_rect.x + dx, cost_rect.y + dy))
+    if outlines:
+        cost_outline = font_large.render(f"{unit.cost}g", True, (0, 0, 0))
+        for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, -1), (1, -1), (-1, 1)]:
+            surface.blit(cost_outline, (cost_rect.x + dx, cost_rect.y + dy))
     surface.blit(cost_text, cost_rect)
 
     # Draw stars in top-left corner (on top of PNG) - much more visible
@@ -416,11 +255,12 @@ def draw_unit_card(surface, unit, rect, show_details=False, is_shop_unit=False):
         for i, trait in enumerate(unit.traits[:3]):  # Show up to 3 traits
             if trait != "N/A":  # Skip N/A traits
                 trait_text = font_small.render(trait, True, Colors.BUTTON_TEXT)
-                trait_outline = font_small.render(trait, True, (0, 0, 0))
                 trait_pos = (trait_x, trait_y + i * 14)
-                # Draw outline for readability over PNG
-                for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
-                    surface.blit(trait_outline, (trait_pos[0] + dx, trait_pos[1] + dy))
+                if outlines:
+                    # Draw outline for readability over PNG
+                    trait_outline = font_small.render(trait, True, (0, 0, 0))
+                    for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
+                        surface.blit(trait_outline, (trait_pos[0] + dx, trait_pos[1] + dy))
                 surface.blit(trait_text, trait_pos)
 
 
@@ -520,7 +360,7 @@ def draw_hugo_strange_choice(screen, choices, buttons, mouse_pos, screen_width,
                 png_rect = png_image.get_rect()
                 scale_factor = min((card_width - 20) / png_rect.width, (card_height - 80) / png_rect.height)
                 new_size = (int(png_rect.width * scale_factor), int(png_rect.height * scale_factor))
-                scaled_png = pygame.transform.smoothscale(png_image, new_size)
+                scaled_png = scale_surface(png_image, new_size)
                 png_pos = (card_x + (card_width - new_size[0]) // 2, cards_y + 10)
                 screen.blit(scaled_png, png_pos)
             else:
@@ -568,63 +408,11 @@ def draw_hugo_strange_choice(screen, choices, buttons, mouse_pos, screen_width,
     screen.blit(flavor_text, flavor_rect)
 
 
-def replace_hugo_strange_units(player, replacement_name):
-    from unit import Unit
-    import os
-
-    png_files = []
-    if os.path.exists("assets"):
-        png_files = os.listdir("assets")
-
-    for y in range(GameConstants.BOARD_HEIGHT):
-        for x in range(GameConstants.BOARD_WIDTH):
-            if player.board[y][x] and player.board[y][x].name == "Hugo Strange":
-                old_unit = player.board[y][x]
-                new_unit = Unit(
-                    replacement_name,
-                    3,  # Always 3 cost
-                    ["Mind Games"],
-                    old_unit.health,
-                    old_unit.damage,
-                    get_replacement_png_name(replacement_name, png_files)
-                )
-                new_unit.stars = old_unit.stars
-                player.board[y][x] = new_unit
-
-    for i in range(len(player.bench)):
-        if player.bench[i] and player.bench[i].name == "Hugo Strange":
-            old_unit = player.bench[i]
-            new_unit = Unit(
-                replacement_name,
-                3,  # Always 3 cost
-                ["Mind Games"],
-                old_unit.health,
-                old_unit.damage,
-                get_replacement_png_name(replacement_name, png_files)
-            )
-            new_unit.stars = old_unit.stars
-            player.bench[i] = new_unit
-
-    player.calculate_traits()
-
-
 def get_replacement_traits(name):
     # All replacements now just have Mind Games
     return ["Mind Games"]
 
 
-def get_replacement_png_name(name, png_files):
-    name_mapping = {
-        "Mr. Freeze": "Mr._Freeze.png",
-        "Poison Ivy": "Poison_Ivy.png",
-        "Two Face": "Two_Face.png"
-    }
-    png_name = name_mapping.get(name)
-    if png_name and png_name in png_files:
-        return png_name
-    return None
-
-
 # [Keep all your existing drawing functions like draw_main_menu, draw_play_menu, etc.]
 # Drawing functions (these remain the same as before)
 def draw_main_menu(screen, buttons, mouse_pos, fonts, screen_width, screen_height):
@@ -669,11 +457,39 @@ def draw_options_menu(screen, buttons, back_button, mouse_pos, fonts, screen_wid
     res_rect = res_text.get_rect(center=(screen_width // 2, screen_height // 3))
     screen.blit(res_text, res_rect)
 
+    scale_text = fonts['button'].render(f"Render scale: {display_manager.get_render_scale_name()}", True,
+                                        Colors.BUTTON_TEXT)
+    scale_rect = scale_text.get_rect(center=(screen_width // 2, screen_height // 3 + res_rect.height))
+    screen.blit(scale_text, scale_rect)
+
     for button in buttons:
         button.check_hover(mouse_pos)
         button.draw(screen)
 
 
+def draw_profiler_overlay(screen, clock, governor):
+    """Small frame-time readout in the top-left corner (toggle with F3)"""
+    font = pygame.font.SysFont('arial', 14, bold=True)
+    lines = [
+        f"FPS: {clock.get_fps():.0f}",
+        f"Frame: {governor.average_frame_ms():.1f} / {governor.budget_ms:.1f} ms",
+        f"Quality: {governor.settings['name']}{' (auto)' if governor.dynamic else ''}",
+    ]
+    panel = pygame.Surface((220, 8 + 18 * len(lines)), pygame.SRCALPHA)
+    panel.fill((0, 0, 0, 170))
+    for i, line in enumerate(lines):
+        panel.blit(font.render(line, True, (120, 255, 120)), (8, 4 + i * 18))
+    screen.blit(panel, (120, 30))
+
+
+def create_fonts(screen_height):
+    base_size = screen_height / 15
+    return {
+        'title': pygame.font.SysFont('arial', int(base_size * 1.6), bold=True),
+        'button': pygame.font.SysFont('arial', int(base_size * 0.8))
+    }
+
+
 def draw_coming_soon(screen, back_button, mouse_pos, screen_name, fonts, screen_width, screen_height):
     screen.fill(Colors.BACKGROUND)
 
@@ -710,7 +526,9 @@ def draw_single_player_game(screen, player, opponent, buttons, mouse_pos, fonts,
     screen.fill(Colors.BACKGROUND)
 
     # Draw opponent's hex board at the top
-    draw_opponent_square_board(screen, opponent, screen_width, screen_height)
+    opponent_rect = pygame.Rect((screen_width - 7 * UNIT_WIDTH) // 2, 90, 7 * UNIT_WIDTH, 3 * UNIT_HEIGHT)
+    draw_cached_panel(screen, "opponent_board", opponent_rect,
+                      lambda: draw_opponent_square_board(screen, opponent, screen_width, screen_height))
 
     # Draw sell zone ONLY when dragging a unit (but not from shop)
     is_dragging_to_sell = (drag_state != DragState.NONE and
@@ -723,10 +541,14 @@ def draw_single_player_game(screen, player, opponent, buttons, mouse_pos, fonts,
     # Draw game layout with hex board
     draw_board(screen, player, screen_width, screen_height, drag_state, drag_unit, drag_pos, mouse_pos)
     draw_bench(screen, player, screen_width, screen_height, drag_state, drag_unit, drag_pos, mouse_pos)
-    draw_shop(screen, player, screen_width, screen_height, drag_state, drag_source_type, mouse_pos)
+    hovered_shop_unit = draw_shop(screen, player, screen_width, screen_height, drag_state, drag_source_type, mouse_pos)
     draw_ui_elements(screen, player, buttons, mouse_pos, fonts, screen_width, screen_height)
     draw_traits_panel(screen, player, screen_width, screen_height, fonts, mouse_pos)
-    draw_info_panel(screen, player, screen_width, screen_height, fonts)
+    info_rect = pygame.Rect(screen_width - 290, 180, 280, int(screen_height * 0.75))
+    draw_cached_panel(screen, "info_panel", info_rect,
+                      lambda: draw_info_panel(screen, player, screen_width, screen_height, fonts))
+    if hovered_shop_unit is not None:
+        draw_rolldown_tooltip(screen, player, hovered_shop_unit, mouse_pos, screen_width, screen_height)
 
     # Draw drag unit if dragging
     if drag_state != DragState.NONE and drag_unit:
@@ -862,6 +684,8 @@ def draw_bench(screen, player, screen_width, screen_height, drag_state, drag_uni
 
 
 def draw_shop(screen, player, screen_width, screen_height, drag_state, drag_source_type, mouse_pos):
+    """Draw the shop; returns the shop unit under the mouse, if any"""
+    hovered_unit = None
     shop_slots = GameConstants.SHOP_SLOTS
     shop_card_size = LARGE_SHOP_UNIT_SIZE
     card_gap = 20
@@ -895,6 +719,34 @@ def draw_shop(screen, player, screen_width, screen_height, drag_state, drag_sour
         if i < len(player.shop) and player.shop[i]:
             unit = player.shop[i]
             draw_unit_card(screen, unit, rect, show_details=True, is_shop_unit=True)
+            if is_highlighted:
+                hovered_unit = unit
+
+    return hovered_unit
+
+
+def draw_rolldown_tooltip(surface, player, unit, mouse_pos, screen_width, screen_height):
+    """Odds of starring up a hovered shop unit by buying it and rolling the rest of the gold"""
+    odds = shop_card_odds(player, unit)
+    if odds is None:
+        return
+
+    font_title = pygame.font.SysFont('arial', 14, bold=True)
+    font_odds = pygame.font.SysFont('arial', 12)
+    title_text = font_title.render(f"Buy + roll {player.gold - unit.cost} gold", True, Colors.BUTTON_TEXT)
+    odds_text = font_odds.render(f"2-star {odds['two_star'] * 100:.0f}%   3-star {odds['three_star'] * 100:.1f}%",
+                                 True, Colors.GOLD_COLOR)
+
+    tooltip_width = max(title_text.get_width(), odds_text.get_width()) + 20
+    tooltip_height = 50
+    tooltip_x = min(mouse_pos[0] + 15, screen_width - tooltip_width - 5)
+    tooltip_y = mouse_pos[1] - tooltip_height - 10
+
+    tooltip_rect = pygame.Rect(tooltip_x, tooltip_y, tooltip_width, tooltip_height)
+    pygame.draw.rect(surface, (60, 60, 80), tooltip_rect, border_radius=8)
+    pygame.draw.rect(surface, Colors.BUTTON_TEXT, tooltip_rect, 2, border_radius=8)
+    surface.blit(title_text, (tooltip_x + 10, tooltip_y + 8))
+    surface.blit(odds_text, (tooltip_x + 10, tooltip_y + 28))
 
 
 def draw_ui_elements(screen, player, buttons, mouse_pos, fonts, screen_width, screen_height):
@@ -1013,6 +865,10 @@ def draw_info_panel(screen, player, screen_width, screen_height, fonts):
         f"Gold: {player.gold}",
         f"XP: {player.xp}/{player.xp_to_level[player.level - 1] if player.level < 10 else 'MAX'}"
     ]
+    if INFO_PANEL["economy_hint"]:
+        # Imported on first use so the planner (and NumPy) only load for players who turn it on
+        from economy_planner import economy_hint
+        info_lines.extend(economy_hint(player))
 
     y_offset = 50
     for line in info_lines:
@@ -1021,19 +877,52 @@ def draw_info_panel(screen, player, screen_width, screen_height, fonts):
         y_offset += 30
 
 
+def create_opponent(seed=None):
+    """Single player opponent and the bot that plays it; the bot has already played round 1"""
+    streams = RngStreams(seed)
+    opponent = Player(rng=streams.python("opponent"))
+    opponent.name = "Opponent"
+    opponent_bot = HeuristicBot(opponent, streams.python("opponent bot"))
+    opponent_bot.take_turn()
+    return opponent, opponent_bot
+
+
+TRACE.mark("module body (draw functions)")
+
+
 def main():
-    display_manager = DisplayManager()
+    with TRACE.span("pygame.init"):
+        pygame.init()
+
+    # The one config load; everything else reads and writes through this service
+    with TRACE.span("config load"):
+        config = ConfigService()
+    # Fast start shows the menu first and only builds players (and loads unit art) for a game
+    fast_start = config["fast_start"] or "--fast-start" in sys.argv
+
+    with TRACE.span("DisplayManager (set_mode)"):
+        display_manager = DisplayManager(config)
     clock = pygame.time.Clock()
-    game_state = GameState.MAIN_MENU
 
-    # Initialize player for single player game
-    player = Player()
+    # Quality governor: steps effects down when frames run over budget and back up with headroom
+    governor = QualityGovernor(target_fps=config["target_fps"],
+                               tier=config["quality_tier"],
+                               dynamic=config["dynamic_quality"])
+    RENDER_QUALITY.update(governor.settings)
+    display_manager.set_quality_render_scale(governor.settings["render_scale"])
+    show_profiler = config["show_profiler"]
+    INFO_PANEL["economy_hint"] = config["economy_hint"]
+    game_state = GameState.MAIN_MENU
 
-    # Create opponent (temporary placeholder)
-    opponent = Player()
-    opponent.name = "Opponent"
-    # Initialize empty board for opponent
-    opponent.board = [[None for _ in range(GameConstants.BOARD_WIDTH)] for _ in range(GameConstants.BOARD_HEIGHT)]
+    player = None
+    opponent = None
+    opponent_bot = None
+    game_log = None  # every state change of the current run, see action_log.py
+    if not fast_start:
+        with TRACE.span("Player x2 (shops + unit images)"):
+            # Initialize player for single player game
+            player = Player()
+            opponent, opponent_bot = create_opponent()
 
     # Drag state
     drag_state = DragState.NONE
@@ -1051,12 +940,9 @@ def main():
     hugo_strange_selected_option = None
 
     # Initial UI setup with larger fonts
-    screen_width, screen_height = display_manager.current_resolution
+    screen_width, screen_height = display_manager.render_resolution
     base_size = screen_height / 15
-    fonts = {
-        'title': pygame.font.SysFont('arial', int(base_size * 1.6), bold=True),
-        'button': pygame.font.SysFont('arial', int(base_size * 0.8))
-    }
+    fonts = create_fonts(screen_height)
 
     # Create menu buttons with smaller menu font
     menu_font = pygame.font.SysFont('arial', int(base_size * 0.6))
@@ -1077,7 +963,8 @@ def main():
     resolution_button = Button(center_x - 150, center_y - 50, 300, 60, "CHANGE RESOLUTION", menu_font)
     fullscreen_button = Button(center_x - 150, center_y + 30, 300, 60, "TOGGLE FULLSCREEN", menu_font)
     borderless_button = Button(center_x - 150, center_y + 110, 300, 60, "TOGGLE BORDERLESS", menu_font)
-    options_buttons = [resolution_button, fullscreen_button, borderless_button]
+    render_scale_button = Button(center_x - 150, center_y + 190, 300, 60, "RENDER SCALE", menu_font)
+    options_buttons = [resolution_button, fullscreen_button, borderless_button, render_scale_button]
 
     # Smaller back and end turn buttons
     back_button = Button(30, 30, 80, 30, "BACK", menu_font)
@@ -1088,10 +975,12 @@ def main():
     dev_gold_button = Button(250, screen_height - 60, 120, 35, "DEV: +10 Gold", dev_font)
 
     game_buttons = [end_turn_button, back_button]
+    TRACE.mark("fonts + buttons")
 
     running = True
     while running:
-        mouse_pos = pygame.mouse.get_pos()
+        frame_start = time.perf_counter()
+        mouse_pos = display_manager.get_mouse_pos()
         mouse_clicked = False
         mouse_released = False
 
@@ -1200,9 +1089,9 @@ def main():
                             unit_to_buy = player.shop[drag_source_index]
                             if unit_to_buy and player.gold >= unit_to_buy.cost:
                                 if player.can_combine_anywhere(unit_to_buy):
-                                    player.buy_and_combine(drag_source_index)
+                                    game_log.perform(player, BUY_AND_COMBINE, drag_source_index)
                                 else:
-                                    player.buy_unit(drag_source_index)
+                                    game_log.perform(player, BUY_UNIT, drag_source_index)
                         else:
                             # This was a drag - only purchase if dragged outside shop area
                             shop_slots = GameConstants.SHOP_SLOTS
@@ -1219,18 +1108,18 @@ def main():
                             if not shop_area.collidepoint(mouse_pos):
                                 # Try to purchase the unit
                                 if player.can_combine_anywhere(drag_unit):
-                                    player.buy_and_combine(drag_source_index)
+                                    game_log.perform(player, BUY_AND_COMBINE, drag_source_index)
                                 else:
-                                    player.buy_unit(drag_source_index)
+                                    game_log.perform(player, BUY_UNIT, drag_source_index)
 
                     # Check if dropped in sell zone (bottom of screen) - only for bench/board units
                     elif drag_source_type != 'shop' and mouse_pos[1] > screen_height - 100:
                         # Sell the unit
                         if drag_source_type == 'bench':
-                            player.sell_unit(drag_source_index)
+                            game_log.perform(player, SELL_UNIT, drag_source_index)
                         elif drag_source_type == 'board':
                             x, y = drag_source_index
-                            player.sell_board_unit(x, y)
+                            game_log.perform(player, SELL_BOARD_UNIT, x, y)
 
                     else:
                         # Handle normal drag drop for bench/board units
@@ -1266,43 +1155,14 @@ def main():
                                             target_unit = player.board[y][x]
                                             if target_unit is None:
                                                 # Empty spot - just move
-                                                if player.move_unit_to_board(drag_source_index, x, y):
-                                                    player.bench[drag_source_index] = None
-                                                    # Auto-trigger Hugo UI if Hugo Strange was just placed
-                                                    if (player.board[y][x] and player.board[y][x].name == "Hugo Strange"
-                                                            and not hugo_strange_choice_active
-                                                            and not hasattr(player, 'hugo_strange_activated')):
-                                                        hugo_strange_choice_active = True
-                                                        # Clear any old buttons - new ones will be created in draw_hugo_strange_choice
-                                                        hugo_strange_choice_buttons.clear()
+                                                game_log.perform(player, MOVE_TO_BOARD, drag_source_index, x, y)
                                             else:
                                                 # Swap bench unit with board unit
-                                                player.board[y][x] = drag_unit
-                                                player.bench[drag_source_index] = target_unit
-                                                player.calculate_traits()
-                                                # Auto-trigger Hugo UI if Hugo Strange was just placed
-                                                if (player.board[y][x] and player.board[y][x].name == "Hugo Strange"
-                                                        and not hugo_strange_choice_active
-                                                        and not hasattr(player, 'hugo_strange_activated')):
-                                                    hugo_strange_choice_active = True
-                                                    # Clear any old buttons - new ones will be created in draw_hugo_strange_choice
-                                                    hugo_strange_choice_buttons.clear()
+                                                game_log.perform(player, SWAP_BENCH_BOARD, drag_source_index, x, y)
                                         elif drag_source_type == 'board':
                                             # Move from board to different board position (swap)
                                             source_x, source_y = drag_source_index
-                                            target_unit = player.board[y][x]
-
-                                            # Swap the units
-                                            player.board[y][x] = drag_unit
-                                            player.board[source_y][source_x] = target_unit
-                                            player.calculate_traits()
-                                            # Auto-trigger Hugo UI if Hugo Strange was just placed
-                                            if (player.board[y][x] and player.board[y][x].name == "Hugo Strange"
-                                                    and not hugo_strange_choice_active
-                                                    and not hasattr(player, 'hugo_strange_activated')):
-                                                hugo_strange_choice_active = True
-                                                # Clear any old buttons - new ones will be created in draw_hugo_strange_choice
-                                                hugo_strange_choice_buttons.clear()
+                                            game_log.perform(player, SWAP_BOARD, source_x, source_y, x, y)
                                         board_dropped = True
                                         break
                                 if board_dropped:
@@ -1324,19 +1184,13 @@ def main():
                                             target_unit = player.bench[i]
                                             if target_unit is None:
                                                 # Empty spot - just move
-                                                if player.move_unit_to_bench(x, y, i):
-                                                    player.board[y][x] = None
+                                                game_log.perform(player, MOVE_TO_BENCH, x, y, i)
                                             else:
                                                 # Swap board unit with bench unit
-                                                player.bench[i] = drag_unit
-                                                player.board[y][x] = target_unit
-                                                player.calculate_traits()
+                                                game_log.perform(player, SWAP_BENCH_BOARD, i, x, y)
                                         elif drag_source_type == 'bench':
                                             # Swap bench positions
-                                            source_unit = player.bench[drag_source_index]
-                                            target_unit = player.bench[i]
-                                            player.bench[i] = source_unit
-                                            player.bench[drag_source_index] = target_unit
+                                            game_log.perform(player, SWAP_BENCH, drag_source_index, i)
                                         break
 
                     # Reset drag state
@@ -1352,12 +1206,28 @@ def main():
                         game_state = GameState.PLAY_MENU
                     elif game_state == GameState.PLAY_MENU or game_state == GameState.OPTIONS_SCREEN:
                         game_state = GameState.MAIN_MENU
+                elif event.key == pygame.K_F3:
+                    show_profiler = not show_profiler
+                elif (event.key == pygame.K_F9 and game_state == GameState.SINGLE_PLAYER
+                      and drag_state == DragState.NONE):
+                    # Load the autosave written at the start of the last round
+                    if os.path.exists(AUTOSAVE_FILE):
+                        try:
+                            with open(AUTOSAVE_FILE, 'rb') as f:
+                                # The log of the loaded run starts from the save itself
+                                player, opponent, game_log = start_game(start_state=f.read())
+                            opponent_bot = HeuristicBot(opponent, RngStreams(game_log.seed).python("opponent bot"))
+                            hugo_strange_choice_active = False
+                            hugo_strange_choice_buttons.clear()
+                            print(f"Loaded autosave: round {player.round}")
+                        except (OSError, ValueError) as e:
+                            print(f"Could not load {AUTOSAVE_FILE}: {e}")
                 elif event.key == pygame.K_f and game_state == GameState.SINGLE_PLAYER:
                     if not hugo_strange_choice_active:  # Add this check
-                        player.buy_xp()
+                        game_log.perform(player, BUY_XP)
                 elif event.key == pygame.K_d and game_state == GameState.SINGLE_PLAYER:
                     if not hugo_strange_choice_active:  # Add this check
-                        player.refresh_shop()
+                        game_log.perform(player, REFRESH_SHOP)
                 elif event.key == pygame.K_s and game_state == GameState.SINGLE_PLAYER and drag_state == DragState.NONE:
                     # Sell unit under mouse (bench only for now)
                     bench_slots = GameConstants.BENCH_SLOTS
@@ -1378,13 +1248,20 @@ def main():
                             bench_card_size
                         )
                         if bench_rect.collidepoint(mouse_pos) and player.bench[i]:
-                            player.sell_unit(i)
+                            game_log.perform(player, SELL_UNIT, i)
                             break
 
         # Update drag position
         if drag_state != DragState.NONE:
             drag_pos = mouse_pos
 
+        # Hugo Strange's unit hooks flag the choice once he is bought (see unit_hooks.py)
+        if (game_state == GameState.SINGLE_PLAYER and drag_state == DragState.NONE
+                and player.hugo_choice_pending and not hugo_strange_choice_active):
+            hugo_strange_choice_active = True
+            # Clear any old buttons - new ones will be created in draw_hugo_strange_choice
+            hugo_strange_choice_buttons.clear()
+
         # Handle button clicks (including Buy XP and Reroll buttons)
         if mouse_clicked and drag_state == DragState.NONE:
             if game_state == GameState.MAIN_MENU:
@@ -1398,7 +1275,8 @@ def main():
             elif game_state == GameState.PLAY_MENU:
                 if single_player_button.is_clicked(mouse_pos, True):
                     game_state = GameState.SINGLE_PLAYER
-                    player = Player()  # Reset player for new game
+                    player, _, game_log = start_game()  # Reset player for new game
+                    opponent, opponent_bot = create_opponent(RngStreams(game_log.seed).seed("opponent"))
                     # Reset Hugo Strange state for new game
                     hugo_strange_choice_active = False
                     hugo_strange_choice_buttons.clear()
@@ -1412,25 +1290,25 @@ def main():
                 if resolution_button.is_clicked(mouse_pos, True):
                     new_index = (display_manager.current_res_index + 1) % len(display_manager.resolutions)
                     if display_manager.set_resolution(new_index):
-                        screen_width, screen_height = display_manager.current_resolution
-                        base_size = screen_height / 15
-                        fonts = {
-                            'title': pygame.font.SysFont('arial', int(base_size * 1.6), bold=True),
-                            'button': pygame.font.SysFont('arial', int(base_size * 0.8))
-                        }
+                        screen_width, screen_height = display_manager.render_resolution
+                        fonts = create_fonts(screen_height)
                 elif fullscreen_button.is_clicked(mouse_pos, True):
                     display_manager.toggle_fullscreen()
-                    screen_width, screen_height = display_manager.current_resolution
+                    screen_width, screen_height = display_manager.render_resolution
                 elif borderless_button.is_clicked(mouse_pos, True):
                     display_manager.toggle_borderless()
-                    screen_width, screen_height = display_manager.current_resolution
+                    screen_width, screen_height = display_manager.render_resolution
+                elif render_scale_button.is_clicked(mouse_pos, True):
+                    display_manager.cycle_render_scale()
+                    screen_width, screen_height = display_manager.render_resolution
+                    fonts = create_fonts(screen_height)
                 elif back_button.is_clicked(mouse_pos, True):
                     game_state = GameState.MAIN_MENU
 
             elif game_state == GameState.SINGLE_PLAYER:
                 # Check developer button FIRST
                 if dev_gold_button.is_clicked(mouse_pos, True):
-                    player.gold += 10
+                    game_log.perform(player, DEV_GOLD, 10)
                     print(f"DEV: Added 10 gold. Total: {player.gold}")
                 elif hugo_strange_choice_active:
                     # Handle Hugo Strange choice UI - check if any character card was clicked
@@ -1439,9 +1317,7 @@ def main():
                             hugo_strange_selected_option = hugo_strange_choices[i]
                             print(f"Hugo Strange selected: {hugo_strange_selected_option}")
 
-                            replace_hugo_strange_units(player, hugo_strange_selected_option)
-                            player.hugo_strange_activated = True
-                            player.hugo_replacement_choice = hugo_strange_selected_option
+                            game_log.perform(player, HUGO_CHOICE, HUGO_CHOICES.index(hugo_strange_selected_option))
                             hugo_strange_choice_active = False
                             hugo_strange_choice_buttons.clear()
                             break
@@ -1467,37 +1343,12 @@ def main():
                             unit_to_buy = player.shop[i]
                             if unit_to_buy and player.gold >= unit_to_buy.cost:
                                 if player.can_combine_anywhere(unit_to_buy):
-                                    player.buy_and_combine(i)
+                                    game_log.perform(player, BUY_AND_COMBINE, i)
                                 else:
-                                    player.buy_unit(i)
+                                    game_log.perform(player, BUY_UNIT, i)
                             shop_clicked = True
                             break
 
-                    # Check for Hugo Strange placement (only if not already activated)
-                    if not shop_clicked and not hasattr(player, 'hugo_strange_activated'):
-                        hugo_placed = False
-                        # Check board for Hugo Strange
-                        for y in range(GameConstants.BOARD_HEIGHT):
-                            for x in range(GameConstants.BOARD_WIDTH):
-                                if player.board[y][x] and player.board[y][x].name == "Hugo Strange":
-                                    hugo_placed = True
-                                    break
-                            if hugo_placed:
-                                break
-
-                        # Check bench for Hugo Strange
-                        if not hugo_placed:
-                            for unit in player.bench:
-                                if unit and unit.name == "Hugo Strange":
-                                    hugo_placed = True
-                                    break
-
-                        if hugo_placed and not hugo_strange_choice_active:
-                            # Activate Hugo Strange choice
-                            hugo_strange_choice_active = True
-                            # Clear any old buttons - new ones will be created in draw_hugo_strange_choice
-                            hugo_strange_choice_buttons.clear()
-
                     # Only check other buttons if no shop unit was clicked AND Hugo UI is not active
                     if not shop_clicked and not hugo_strange_choice_active:
                         # Create temporary buttons for Buy XP and Reroll
@@ -1505,12 +1356,15 @@ def main():
                         reroll_button = Button(140, screen_height - 60, 100, 35, "Reroll (D)", fonts['button'])
 
                         if buy_xp_button.is_clicked(mouse_pos, True):
-                            player.buy_xp()
+                            game_log.perform(player, BUY_XP)
                         elif reroll_button.is_clicked(mouse_pos, True):
-                            player.refresh_shop()
+                            game_log.perform(player, REFRESH_SHOP)
                         elif end_turn_button.is_clicked(mouse_pos, True):
-                            income = player.end_turn()
+                            income = game_log.perform(player, END_TURN)
                             print(f"Round {player.round} started! Received {income} gold.")
+                            opponent_bot.play_round()
+                            save_game_async(AUTOSAVE_FILE, player, opponent)
+                            game_log.save_async(LAST_GAME_FILE)
                         elif back_button.is_clicked(mouse_pos, True):
                             game_state = GameState.PLAY_MENU
 
@@ -1543,9 +1397,27 @@ def main():
         elif game_state == GameState.MULTIPLAYER_SCREEN:
             draw_coming_soon(screen, back_button, mouse_pos, "Multiplayer", fonts, screen_width, screen_height)
 
-        pygame.display.flip()
-        clock.tick(60)
-
+        if show_profiler:
+            draw_profiler_overlay(screen, clock, governor)
+
+        display_manager.present()
+        TRACE.finish()
+
+        # Judge the frame on the work done, not on the time clock.tick() sleeps
+        FRAME_COUNTER[0] += 1
+        if governor.record_frame((time.perf_counter() - frame_start) * 1000.0):
+            print(f"Quality tier -> {governor.settings['name']}")
+            RENDER_QUALITY.update(governor.settings)
+            PANEL_CACHE.clear()
+            config["quality_tier"] = governor.tier
+            if display_manager.set_quality_render_scale(governor.settings["render_scale"]):
+                screen_width, screen_height = display_manager.render_resolution
+                fonts = create_fonts(screen_height)
+        clock.tick(governor.target_fps)
+
+    if game_log is not None and game_log.action_count:
+        game_log.save(LAST_GAME_FILE)
+    config.flush()
     pygame.quit()
     sys.exit()
 
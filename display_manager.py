@@ -1,19 +1,24 @@
 import pygame
-import json
-import os
+
+from config_service import ConfigService, RENDER_SCALES
 
 
 class DisplayManager:
-    def __init__(self):
-        self.config = self.load_config()
+    resolutions = [
+        {"name": "1280x720 (720p)", "size": (1280, 720)},
+        {"name": "1920x1080 (1080p)", "size": (1920, 1080)},
+        {"name": "2048x1080 (2K Cinema)", "size": (2048, 1080)},
+        {"name": "2560x1440 (2K QHD)", "size": (2560, 1440)},
+        {"name": "3840x2160 (4K UHD)", "size": (3840, 2160)}
+    ]
+
+    # Fraction of the window resolution the game is drawn at before being scaled up to the window
+    render_scales = RENDER_SCALES
+    # The UI layout is fixed-pixel; anything below 720 lines high no longer fits
+    MIN_RENDER_HEIGHT = 720
 
-        self.resolutions = [
-            {"name": "1280x720 (720p)", "size": (1280, 720)},
-            {"name": "1920x1080 (1080p)", "size": (1920, 1080)},
-            {"name": "2048x1080 (2K Cinema)", "size": (2048, 1080)},
-            {"name": "2560x1440 (2K QHD)", "size": (2560, 1440)},
-            {"name": "3840x2160 (4K UHD)", "size": (3840, 2160)}
-        ]
+    def __init__(self, config=None):
+        self.config = config if config is not None else ConfigService()
 
         self.current_res_index = 1
         current_res = tuple(self.config["resolution"])
@@ -25,47 +30,80 @@ class DisplayManager:
         self.current_resolution = self.resolutions[self.current_res_index]["size"]
         self.fullscreen = self.config["fullscreen"]
         self.borderless = self.config["borderless"]
+        self.render_scale = self.config["render_scale"]
+        if self.render_scale not in self.render_scales:
+            self.render_scale = 1.0
+        # Runtime cap on the render scale set by the quality governor; never saved to the config
+        self.quality_render_scale = 1.0
         self.setup_display()
 
-    def load_config(self):
-        CONFIG_FILE = "game_config.json"
-        if os.path.exists(CONFIG_FILE):
-            try:
-                with open(CONFIG_FILE, 'r') as f:
-                    return json.load(f)
-            except:
-                return {
-                    "resolution": [1920, 1080],
-                    "fullscreen": False,
-                    "borderless": False,
-                    "music_volume": 0.7,
-                    "sfx_volume": 0.8
-                }
-        else:
-            default_config = {
-                "resolution": [1920, 1080],
-                "fullscreen": False,
-                "borderless": False,
-                "music_volume": 0.7,
-                "sfx_volume": 0.8
-            }
-            self.save_config(default_config)
-            return default_config
-
-    def save_config(self, config):
-        CONFIG_FILE = "game_config.json"
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(config, f, indent=4)
+    @classmethod
+    def scaled_resolution(cls, size, render_scale):
+        """Resolution the game is drawn at for a window size and render scale"""
+        width, height = size
+        scale = max(render_scale, min(1.0, cls.MIN_RENDER_HEIGHT / height))
+        return (int(width * scale), int(height * scale))
+
+    def get_render_resolution(self):
+        return self.scaled_resolution(self.current_resolution, min(self.render_scale, self.quality_render_scale))
+
+    def set_quality_render_scale(self, scale):
+        """Cap the render scale for performance; returns True if the render resolution changed"""
+        self.quality_render_scale = scale
+        if self.get_render_resolution() == self.render_resolution:
+            return False
+        self.setup_display()
+        return True
 
     def setup_display(self):
+        """Open the window and the surface the game draws into.
+
+        When the render scale is below 1.0 the game draws into a smaller surface which is
+        scaled to the window once per frame in present(). In fullscreen we let SDL do that
+        scale (pygame.SCALED) so it happens on the GPU and mouse positions come back already
+        in render coordinates.
+        """
+        self.render_resolution = self.get_render_resolution()
+        scaled = self.render_resolution != self.current_resolution
+
+        if scaled and self.fullscreen and not self.borderless and hasattr(pygame, "SCALED"):
+            try:
+                self.window = pygame.display.set_mode(self.render_resolution, pygame.FULLSCREEN | pygame.SCALED)
+                self.screen = self.window
+                pygame.display.set_caption("DC Auto Battler")
+                return
+            except pygame.error as e:
+                # No hardware renderer available; fall back to scaling in software
+                print(f"SCALED display mode unavailable ({e}), scaling in software")
+
         if self.borderless:
-            self.screen = pygame.display.set_mode(self.current_resolution, pygame.NOFRAME)
+            self.window = pygame.display.set_mode(self.current_resolution, pygame.NOFRAME)
         elif self.fullscreen:
-            self.screen = pygame.display.set_mode(self.current_resolution, pygame.FULLSCREEN)
+            self.window = pygame.display.set_mode(self.current_resolution, pygame.FULLSCREEN)
         else:
-            self.screen = pygame.display.set_mode(self.current_resolution, pygame.RESIZABLE)
+            self.window = pygame.display.set_mode(self.current_resolution, pygame.RESIZABLE)
+
+        if scaled:
+            self.screen = pygame.Surface(self.render_resolution).convert()
+        else:
+            self.screen = self.window
         pygame.display.set_caption("DC Auto Battler")
 
+    def present(self):
+        """Show the finished frame, scaling the render surface up to the window if needed"""
+        if self.screen is not self.window:
+            pygame.transform.scale(self.screen, self.window.get_size(), self.window)
+        pygame.display.flip()
+
+    def get_mouse_pos(self):
+        """Mouse position in render-surface coordinates, for hit-testing"""
+        x, y = pygame.mouse.get_pos()
+        if self.screen is self.window:
+            return x, y
+        window_width, window_height = self.window.get_size()
+        render_width, render_height = self.render_resolution
+        return (x * render_width // window_width, y * render_height // window_height)
+
     def set_resolution(self, index):
         if 0 <= index < len(self.resolutions):
             self.current_res_index = index
@@ -73,7 +111,6 @@ class DisplayManager:
             self.current_resolution = new_res
             self.config["resolution"] = list(new_res)
             self.setup_display()
-            self.save_config(self.config)
             return True
         return False
 
@@ -81,13 +118,22 @@ class DisplayManager:
         self.fullscreen = not self.fullscreen
         self.config["fullscreen"] = self.fullscreen
         self.setup_display()
-        self.save_config(self.config)
 
     def toggle_borderless(self):
         self.borderless = not self.borderless
         self.config["borderless"] = self.borderless
         self.setup_display()
-        self.save_config(self.config)
+
+    def cycle_render_scale(self):
+        index = self.render_scales.index(self.render_scale) if self.render_scale in self.render_scales else 0
+        self.render_scale = self.render_scales[(index + 1) % len(self.render_scales)]
+        self.config["render_scale"] = self.render_scale
+        self.setup_display()
 
     def get_current_resolution_name(self):
-        return self.resolutions[self.current_res_index]["name"]
\ No newline at end of file
+        return self.resolutions[self.current_res_index]["name"]
+
+    def get_render_scale_name(self):
+        # The scale actually drawn at: scaled_resolution() clamps small windows and the quality cap lowers it
+        width, height = self.render_resolution
+        return f"{round(height * 100 / self.current_resolution[1])}% ({width}x{height})"
\ No newline at end of file
@@ -0,0 +1,265 @@
+# economy_planner.py - best leveling and rolling schedules from the economy rules alone
+#
+#   plan(round_number=2, gold=10, level=1, xp=0, last_round=20, objective="econ", target_level=7)
+#   python economy_planner.py --round 2 --gold 10 --last-round 20 --objective rolldown --target-level 8
+#
+# income_for(), gain_xp() and the XP price in player.py fully define the economy, so the best
+# schedule is a dynamic program over (round, gold, level, xp). Each round the player buys XP
+# some number of times, may roll some gold away, then the round ends: income on what is left,
+# +2 XP, next round. Values are memoized per objective and last round, so later queries -
+# the info panel asks again after every purchase - reuse most of the states earlier ones solved.
+#
+# Objectives:
+#   "level"     highest level by last_round, then the most gold
+#   "econ"      the most gold at last_round while reaching target_level by then
+#   "rolldown"  the most gold spent on rerolls once at target_level, up to and including last_round
+#
+# With "economy_hint" on in game_config.json the info panel shows economy_hint(): the XP to
+# buy now to reach the next LEVEL_CURVE milestone in reach with the most gold left.
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from player import XP_TO_LEVEL, XP_COST, XP_PER_PURCHASE, XP_PER_ROUND, MAX_LEVEL, income_for
+
+OBJECTIVES = ("level", "econ", "rolldown")
+REFRESH_COST = 2
+# Typical pace for the hint: be this level by this round
+LEVEL_CURVE = [(4, 5), (5, 8), (6, 11), (7, 15), (8, 19), (9, 24), (10, 30)]
+# Income is at most 5 + 5 a round, which bounds the gold any state can hold
+MAX_INCOME = income_for(10 ** 6)
+UNREACHABLE = -10 ** 9
+
+# Level and XP as one number: total XP earned since level 1. Gaining XP is then just
+# min(total + amount, MAX_TOTAL_XP), which is what gain_xp() does level-up by level-up.
+LEVEL_START = [0]
+for _needed in XP_TO_LEVEL:
+    LEVEL_START.append(LEVEL_START[-1] + _needed)
+MAX_TOTAL_XP = LEVEL_START[-1]
+LEVEL_OF = np.searchsorted(LEVEL_START, np.arange(MAX_TOTAL_XP + 1), side="right")
+
+_PLANNERS = {}
+
+
+def total_xp(level, xp):
+    return MAX_TOTAL_XP if level >= MAX_LEVEL else LEVEL_START[level - 1] + xp
+
+
+def check_state(gold, level, xp):
+    """Raises ValueError for a state no player can be in"""
+    if gold < 0:
+        raise ValueError(f"gold must be at least 0, got {gold}")
+    if not 1 <= level <= MAX_LEVEL:
+        raise ValueError(f"level must be 1..{MAX_LEVEL}, got {level}")
+    # gain_xp() levels up as soon as xp reaches the level's cost and keeps 0 XP at MAX_LEVEL
+    needed = XP_TO_LEVEL[level - 1] if level < MAX_LEVEL else 1
+    if not 0 <= xp < needed:
+        raise ValueError(f"xp at level {level} must be 0..{needed - 1}, got {xp}")
+
+
+def level_xp(total):
+    """(level, xp) of a total-XP state"""
+    level = int(LEVEL_OF[total])
+    return level, (0 if level >= MAX_LEVEL else total - LEVEL_START[level - 1])
+
+
+class EconomyPlanner:
+    """Backward induction for one (objective, last round, target level); tables are reused across queries.
+
+    values[r][t, g] is the best value reachable from the start of round r with g gold and
+    t total XP, before that round's spending. Rounds are filled in from last_round down and
+    only as far back as a query has needed, so a later query for the same goal is a lookup.
+    """
+
+    def __init__(self, objective, last_round, target_level=MAX_LEVEL, refresh_cost=REFRESH_COST):
+        if objective not in OBJECTIVES:
+            raise ValueError(f"unknown objective {objective!r}")
+        self.objective = objective
+        self.last_round = last_round
+        self.target_level = target_level
+        self.refresh_cost = refresh_cost
+        self.max_gold = -1
+        self.next_gold = None
+        self.values = {}
+        self.rolled = {}        # value after rolling, before the round ends (rolldown only)
+
+    def ensure(self, round_number, gold):
+        """Fill the tables back to round_number, big enough for this much gold at that round;
+        raises ValueError for a round past last_round"""
+        if round_number > self.last_round:
+            raise ValueError(f"round {round_number} is past the last round {self.last_round}")
+        needed = gold + MAX_INCOME * max(0, self.last_round - round_number) + 1
+        if needed > self.max_gold:
+            # Room for queries a bit richer than this one before the tables are rebuilt
+            self.max_gold = max(needed, 2 * self.max_gold, 64)
+            gold_range = np.arange(self.max_gold)
+            # Gold after the round's income, clamped: states past the edge can't be reached
+            self.next_gold = np.minimum(gold_range + [income_for(g) for g in gold_range], self.max_gold - 1)
+            self.values = {self.last_round: self.terminal()}
+            self.rolled = {}
+        first = min(self.values)
+        while first > round_number:
+            first -= 1
+            self.values[first] = self.step(first)
+
+    def terminal(self):
+        gold = np.arange(self.max_gold, dtype=np.int64)
+        at_target = (LEVEL_OF >= self.target_level)[:, None]
+        if self.objective == "level":
+            return LEVEL_OF[:, None] * 10000 + gold[None, :]
+        if self.objective == "econ":
+            return np.where(at_target, gold[None, :], UNREACHABLE)
+        return np.where(at_target, gold[None, :] // self.refresh_cost * self.refresh_cost, 0)
+
+    def step(self, round_number):
+        """values for round_number from those of the round after it"""
+        later = self.values[round_number + 1]
+        gold = np.arange(self.max_gold)
+        next_total = np.minimum(np.arange(MAX_TOTAL_XP + 1) + XP_PER_ROUND, MAX_TOTAL_XP)
+        # Value of ending the round right now
+        ended = later[next_total[:, None], self.next_gold[None, :]]
+        if self.objective == "rolldown":
+            # Rolling k times first: best over k of ended[g - k * cost] + k * cost, at target level
+            rolled = ended.copy()
+            rows = LEVEL_OF >= self.target_level
+            for residue in range(self.refresh_cost):
+                part = ended[rows, residue::self.refresh_cost] - gold[residue::self.refresh_cost]
+                rolled[rows, residue::self.refresh_cost] = (np.maximum.accumulate(part, axis=1)
+                                                            + gold[residue::self.refresh_cost])
+            self.rolled[round_number] = rolled
+            ended = rolled
+        # Buying XP first: the better of stopping here or buying once more, most XP first
+        values = ended.copy()
+        for total in range(MAX_TOTAL_XP - 1, -1, -1):
+            after = min(total + XP_PER_PURCHASE, MAX_TOTAL_XP)
+            np.maximum(values[total, XP_COST:], values[after, :-XP_COST], out=values[total, XP_COST:])
+        return values
+
+    def best(self, round_number, gold, level, xp):
+        """Best value from this state; None if the target can't be reached.
+        Raises ValueError past last_round or for a state check_state() rejects"""
+        check_state(gold, level, xp)
+        self.ensure(round_number, gold)
+        value = int(self.values[round_number][total_xp(level, xp), gold])
+        return None if value <= UNREACHABLE // 2 else value
+
+    def schedule(self, round_number, gold, level, xp):
+        """The best plan, round by round: [{round, gold, level, xp, buy_xp, roll}], or None"""
+        if self.best(round_number, gold, level, xp) is None:
+            return None
+        total = total_xp(level, xp)
+        steps = []
+        while round_number < self.last_round:
+            level, xp = level_xp(total)
+            step = {"round": round_number, "gold": gold, "level": level, "xp": xp, "buy_xp": 0, "roll": 0}
+            # Keep buying XP until stopping is worth as much as the best plan
+            target = self.values[round_number][total, gold]
+            while self._ended(round_number, total, gold) != target:
+                total = min(total + XP_PER_PURCHASE, MAX_TOTAL_XP)
+                gold -= XP_COST
+                step["buy_xp"] += 1
+            if self.objective == "rolldown" and LEVEL_OF[total] >= self.target_level:
+                step["roll"] = self._best_roll(round_number, total, gold)
+                gold -= step["roll"]
+            steps.append(step)
+            gold += income_for(gold)
+            total = min(total + XP_PER_ROUND, MAX_TOTAL_XP)
+            round_number += 1
+        level, xp = level_xp(total)
+        roll = 0
+        if self.objective == "rolldown" and level >= self.target_level:
+            roll = gold // self.refresh_cost * self.refresh_cost
+        steps.append({"round": round_number, "gold": gold, "level": level, "xp": xp, "buy_xp": 0, "roll": roll})
+        return steps
+
+    def _ended(self, round_number, total, gold):
+        """Value of buying no more XP this round (then rolling, for rolldown)"""
+        if self.objective == "rolldown":
+            return self.rolled[round_number][total, gold]
+        return self.values[round_number + 1][min(total + XP_PER_ROUND, MAX_TOTAL_XP), self.next_gold[gold]]
+
+    def _best_roll(self, round_number, total, gold):
+        later = self.values[round_number + 1]
+        next_total = min(total + XP_PER_ROUND, MAX_TOTAL_XP)
+        target = self.rolled[round_number][total, gold]
+        for roll in range(0, gold + 1, self.refresh_cost):
+            if later[next_total, self.next_gold[gold - roll]] + roll == target:
+                return roll
+        return 0
+
+
+def _planner(objective, last_round, target_level, refresh_cost):
+    key = (objective, last_round, target_level, refresh_cost)
+    planner = _PLANNERS.get(key)
+    if planner is None:
+        planner = _PLANNERS[key] = EconomyPlanner(objective, last_round, target_level, refresh_cost)
+    return planner
+
+
+def plan(round_number, gold, level, xp, last_round, objective="econ", target_level=MAX_LEVEL,
+         refresh_cost=REFRESH_COST):
+    """Best schedule from this state to last_round, or None if target_level can't be reached in time.
+
+    Returns {"objective", "value", "steps"}: value is the final gold ("econ"), the gold rolled
+    ("rolldown") or level * 10000 + gold ("level"); steps come from EconomyPlanner.schedule().
+    "By last_round" means the level the player starts that round with: XP bought during
+    last_round itself doesn't count. Raises ValueError if round_number is past last_round or
+    gold, level and xp aren't a state a player can be in.
+    """
+    planner = _planner(objective, last_round, target_level, refresh_cost)
+    steps = planner.schedule(round_number, gold, level, xp)
+    if steps is None:
+        return None
+    return {"objective": objective, "value": planner.best(round_number, gold, level, xp), "steps": steps}
+
+
+def milestones_ahead(round_number, level):
+    """LEVEL_CURVE (level, round) pairs the player hasn't reached or run out of time for"""
+    return [(target_level, by_round) for target_level, by_round in LEVEL_CURVE
+            if target_level > level and by_round > round_number]
+
+
+def economy_hint(player):
+    """Info panel lines: the XP to buy now to reach the next milestone in reach with the most gold left"""
+    for target_level, by_round in milestones_ahead(player.round, player.level):
+        result = plan(player.round, player.gold, player.level, player.xp, by_round, "econ", target_level)
+        if result is not None:
+            buys = result["steps"][0]["buy_xp"]
+            now = f"Buy XP x{buys} now" if buys else "Save now"
+            return [f"Plan: Lv{target_level} by round {by_round}", f"{now}, {result['value']}g left"]
+    return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Optimal leveling and rolling schedules")
+    parser.add_argument("--round", type=int, default=1)
+    parser.add_argument("--gold", type=int, default=10)
+    parser.add_argument("--level", type=int, default=1)
+    parser.add_argument("--xp", type=int, default=0)
+    parser.add_argument("--last-round", type=int, default=20)
+    parser.add_argument("--objective", choices=OBJECTIVES, default="econ")
+    parser.add_argument("--target-level", type=int, default=MAX_LEVEL)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        result = plan(args.round, args.gold, args.level, args.xp, args.last_round, args.objective, args.target_level)
+    except ValueError as e:
+        print(e)
+        return 1
+    elapsed = time.perf_counter() - start
+    if result is None:
+        print(f"Level {args.target_level} can't be reached by round {args.last_round}")
+        return 1
+    print(f"{args.objective}: value {result['value']} ({elapsed * 1000:.0f} ms)")
+    print("round  gold  level  xp  buy XP  roll")
+    for step in result["steps"]:
+        print(f"{step['round']:>5} {step['gold']:>5} {step['level']:>6} {step['xp']:>3} {step['buy_xp']:>7} "
+              f"{step['roll']:>5}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
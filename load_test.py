@@ -0,0 +1,329 @@
+# load_test.py - scripted clients for capacity planning of server.py
+#
+# Usage:
+#   python load_test.py --spawn --steps 80,400,1600,3200 --duration 30
+#   python load_test.py --port 8765 --server-pid 12345 --steps 800
+#
+# Each step connects that many clients, which join lobbies and play them like people do:
+# rerolls, buys, board moves and sells with some thinking in between, then end their turn,
+# and start another game when theirs ends. The step reports action round-trip latency
+# percentiles, throughput and, when the server's pid is known (--spawn starts one), its CPU
+# and memory in total and per lobby. The first step that breaks --slo-ms at p99 or pins the
+# server's CPU is reported as the saturation point.
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import time
+
+from action_log import (BUY_UNIT, SELL_UNIT, MOVE_TO_BOARD, MOVE_TO_BENCH, SWAP_BOARD, REFRESH_SHOP, BUY_XP)
+from client import GameClient
+from game_constants import GameConstants
+from lobby import LOBBY_SIZE
+from net_protocol import DEFAULT_HOST, DEFAULT_PORT
+
+# What a planning phase is made of, as (action, weight); a turn ends with READY
+ACTION_MIX = [
+    (BUY_UNIT, 35),
+    (REFRESH_SHOP, 15),
+    (MOVE_TO_BOARD, 15),
+    (SWAP_BOARD, 10),
+    (BUY_XP, 10),
+    (MOVE_TO_BENCH, 5),
+    (SELL_UNIT, 5),
+]
+ACTIONS_PER_TURN = (4, 14)
+# Stop adding load once p99 passes the SLO or the server spends this much of a core
+CPU_SATURATION = 0.95
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def occupied(units):
+    return [i for i, unit in enumerate(units or []) if unit is not None]
+
+
+def board_squares(state, empty):
+    if state is None:
+        return []
+    return [(x, y) for y, row in enumerate(state["board"]) for x, unit in enumerate(row) if (unit is None) == empty]
+
+
+def choose_action(state, rng):
+    """One action from ACTION_MIX with arguments that make sense for the client's current state"""
+    ops, weights = zip(*ACTION_MIX)
+    op = rng.choices(ops, weights)[0]
+    bench = occupied(state and state["bench"])
+    if op == BUY_UNIT:
+        shop = occupied(state and state["shop"])
+        return op, [rng.choice(shop) if shop else rng.randrange(GameConstants.SHOP_SLOTS)]
+    if op == MOVE_TO_BOARD:
+        squares = board_squares(state, empty=True)
+        if bench and squares:
+            return op, [rng.choice(bench), *rng.choice(squares)]
+        return BUY_UNIT, [rng.randrange(GameConstants.SHOP_SLOTS)]
+    if op == MOVE_TO_BENCH:
+        squares = board_squares(state, empty=False)
+        free = [i for i in range(GameConstants.BENCH_SLOTS) if i not in bench]
+        if squares and free:
+            return op, [*rng.choice(squares), rng.choice(free)]
+        return REFRESH_SHOP, []
+    if op == SWAP_BOARD:
+        squares = board_squares(state, empty=False) + board_squares(state, empty=True)
+        if len(squares) >= 2:
+            a, b = rng.sample(squares, 2)
+            return op, [*a, *b]
+        return REFRESH_SHOP, []
+    if op == SELL_UNIT:
+        return op, [rng.choice(bench) if bench else 0]
+    return op, []
+
+
+class LoadStats:
+    def __init__(self):
+        self.latencies = []
+        self.rejected = 0
+        self.games = 0
+        self.errors = 0
+        self.lobbies = set()
+
+
+async def play_client(index, host, port, deadline, think, rng, stats):
+    """Play games back to back until the deadline, recording every action's round trip"""
+    try:
+        client = await GameClient.connect(host, port, f"load{index}")
+    except OSError:
+        stats.errors += 1
+        return
+    try:
+        while time.monotonic() < deadline:
+            joined = await client.join()
+            stats.lobbies.add(joined["lobby"])
+            while time.monotonic() < deadline:
+                if client.phase not in ("planning", "finished"):
+                    await client.wait_for(lambda c, t, b: c.phase in ("planning", "finished"))
+                if client.phase == "finished":
+                    stats.games += 1
+                    break
+                round_number = client.round
+                for _ in range(rng.randint(*ACTIONS_PER_TURN)):
+                    await asyncio.sleep(rng.uniform(0, 2 * think))
+                    if client.phase != "planning" or client.round != round_number:
+                        break
+                    op, args = choose_action(client.state, rng)
+                    start = time.perf_counter()
+                    ack = await client.action(op, *args)
+                    stats.latencies.append(time.perf_counter() - start)
+                    stats.rejected += not ack["ok"]
+                await client.ready()
+                await client.wait_for(lambda c, t, b: c.round != round_number or c.phase == "finished")
+    except ConnectionError:
+        stats.errors += 1
+    finally:
+        await client.close()
+
+
+async def run_clients(first_index, count, host, port, duration, think, seed, connect_rate):
+    stats = LoadStats()
+    deadline = time.monotonic() + duration
+    tasks = []
+    for i in range(first_index, first_index + count):
+        rng = random.Random(seed * 1_000_003 + i)
+        tasks.append(asyncio.create_task(play_client(i, host, port, deadline, think, rng, stats)))
+        # Don't overrun the server's listen backlog
+        await asyncio.sleep(1 / connect_rate)
+    # Clients stuck waiting on a phase change get a grace period, then are cut off
+    done, pending = await asyncio.wait(tasks, timeout=max(0.0, deadline - time.monotonic()) + 10)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    return {"latencies": stats.latencies, "rejected": stats.rejected, "games": stats.games,
+            "errors": stats.errors, "lobbies": len(stats.lobbies)}
+
+
+def _worker(job):
+    return asyncio.run(run_clients(*job))
+
+
+class ProcessMonitor:
+    """CPU and resident memory of a process, from /proc (Linux only)"""
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.ticks = os.sysconf("SC_CLK_TCK")
+
+    def cpu_seconds(self):
+        try:
+            with open(f"/proc/{self.pid}/stat") as f:
+                # Skip "pid (comm)": comm may contain spaces
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            return None
+        return (int(fields[11]) + int(fields[12])) / self.ticks
+
+    def rss_mb(self):
+        try:
+            with open(f"/proc/{self.pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) / 1024
+        except OSError:
+            pass
+        return None
+
+
+def run_step(args, clients, monitor):
+    workers = max(1, min(args.procs, clients))
+    per_worker = [clients // workers + (i < clients % workers) for i in range(workers)]
+    jobs = []
+    first = 0
+    for count in per_worker:
+        jobs.append((first, count, args.host, args.port, args.duration, args.think, args.seed,
+                     args.connect_rate / workers))
+        first += count
+
+    cpu_before = monitor.cpu_seconds() if monitor else None
+    rss_before = monitor.rss_mb() if monitor else None
+    start = time.perf_counter()
+    if workers == 1:
+        results = [_worker(jobs[0])]
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            results = pool.map(_worker, jobs)
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for r in results for latency in r["latencies"])
+    step = {
+        "clients": clients,
+        "lobbies": clients / args.lobby_size,
+        "actions": len(latencies),
+        "actions_per_s": len(latencies) / elapsed,
+        "rejected": sum(r["rejected"] for r in results),
+        "games_finished": sum(r["games"] for r in results),
+        "errors": sum(r["errors"] for r in results),
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+        "server_cpu": None,
+        "server_rss_mb": None,
+    }
+    if monitor and cpu_before is not None:
+        cpu_after = monitor.cpu_seconds()
+        if cpu_after is not None:
+            step["server_cpu"] = (cpu_after - cpu_before) / elapsed
+            step["cpu_ms_per_lobby_s"] = step["server_cpu"] * 1000 / step["lobbies"]
+        step["server_rss_mb"] = monitor.rss_mb()
+        if step["server_rss_mb"] is not None and rss_before is not None:
+            step["rss_kb_per_lobby"] = (step["server_rss_mb"] - rss_before) * 1024 / step["lobbies"]
+    step["saturated"] = (step["p99_ms"] > args.slo_ms or step["errors"] > 0 or
+                         (step["server_cpu"] or 0) >= CPU_SATURATION)
+    return step
+
+
+def spawn_server(args):
+    """Start server.py on a free port for the test; returns (process, port)"""
+    import socket
+    with socket.socket() as s:
+        s.bind((args.host, 0))
+        port = s.getsockname()[1]
+    command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py"),
+               "--host", args.host, "--port", str(port), "--lobby-size", str(args.lobby_size),
+               "--planning", str(args.planning), "--combat", str(args.combat), "--stats-interval", "0"]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                               env=dict(os.environ, SDL_VIDEODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1"))
+    for _ in range(100):
+        try:
+            socket.create_connection((args.host, port), timeout=0.1).close()
+            return process, port
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("server did not start listening")
+
+
+def raise_file_limit():
+    """Thousands of sockets need more than the usual 1024 descriptors"""
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    except (ImportError, ValueError, OSError):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the multiplayer server with scripted clients")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--spawn", action="store_true", help="start a server.py for the test and measure it")
+    parser.add_argument("--server-pid", type=int, help="pid of an already running server to measure")
+    parser.add_argument("--steps", default="80,400,1600", help="comma separated client counts, run in order")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per step")
+    parser.add_argument("--think", type=float, default=0.5, help="average seconds between a client's actions")
+    parser.add_argument("--planning", type=float, default=10.0, help="planning phase of a spawned server")
+    parser.add_argument("--combat", type=float, default=1.0, help="combat phase of a spawned server")
+    parser.add_argument("--lobby-size", type=int, default=LOBBY_SIZE)
+    parser.add_argument("--procs", type=int, default=max(1, (os.cpu_count() or 2) - 1),
+                        help="load generator processes, so the generator isn't the bottleneck")
+    parser.add_argument("--connect-rate", type=float, default=500.0, help="new connections per second")
+    parser.add_argument("--slo-ms", type=float, default=100.0, help="p99 round trip that counts as saturated")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="write the step results to this JSON file")
+    args = parser.parse_args()
+
+    raise_file_limit()
+    server_process = None
+    pid = args.server_pid
+    if args.spawn:
+        server_process, args.port = spawn_server(args)
+        pid = server_process.pid
+    monitor = ProcessMonitor(pid) if pid and os.path.exists(f"/proc/{pid}") else None
+
+    steps = []
+    saturation = None
+    try:
+        print(f"{'clients':>8}{'lobbies':>9}{'actions/s':>11}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+              f"{'max ms':>9}{'cpu':>7}{'rss MB':>9}{'cpu ms/lobby/s':>16}{'errors':>8}")
+        for clients in [int(n) for n in args.steps.split(",")]:
+            step = run_step(args, clients, monitor)
+            steps.append(step)
+            cpu = f"{step['server_cpu'] * 100:.0f}%" if step["server_cpu"] is not None else "-"
+            rss = f"{step['server_rss_mb']:.0f}" if step["server_rss_mb"] is not None else "-"
+            per_lobby = f"{step['cpu_ms_per_lobby_s']:.2f}" if "cpu_ms_per_lobby_s" in step else "-"
+            print(f"{clients:>8}{step['lobbies']:>9.0f}{step['actions_per_s']:>11,.0f}{step['p50_ms']:>9.1f}"
+                  f"{step['p95_ms']:>9.1f}{step['p99_ms']:>9.1f}{step['max_ms']:>9.1f}{cpu:>7}{rss:>9}"
+                  f"{per_lobby:>16}{step['errors']:>8}")
+            if step["saturated"]:
+                saturation = clients
+                break
+    finally:
+        if server_process is not None:
+            server_process.terminate()
+            server_process.wait()
+
+    if saturation is None:
+        print(f"Not saturated at {steps[-1]['clients']} clients" if steps else "No steps run")
+    else:
+        last_good = f"{steps[-2]['clients']} clients" if len(steps) > 1 else "none"
+        print(f"Saturated at {saturation} clients (p99 SLO {args.slo_ms:.0f} ms); last healthy step: {last_good}")
+        if steps[-1]["server_cpu"] is not None and steps[-1]["server_cpu"] < CPU_SATURATION / 2:
+            print("The server was mostly idle: the load generator is probably the bottleneck "
+                  "(more --procs, or run it on another machine)")
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({"settings": vars(args), "steps": steps, "saturated_at": saturation}, f, indent=4)
+        print(f"Wrote {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+# lobby.py - headless 8-player lobbies: shared unit pool, round-robin pairings, HP and placements
+#
+# Usage:
+#   python lobby.py --games 500 --workers 8 --seed 1 --out placements.json
+#   python lobby.py --games 500 --comps data/comp_library.json    # bots build library comps
+#
+# Every lobby's seed is derived from the master seed and its index, so the same command
+# produces the same placements whatever --workers is.
+import argparse
+import json
+import multiprocessing
+import sys
+import time
+from functools import partial
+
+from bot import HeuristicBot
+from combat import CombatManager
+from player import Player, UNIT_ROSTER, HUGO_STRANGE, HUGO_REPLACEMENTS
+from rng import RngStreams, derive_seed
+
+LOBBY_SIZE = 8
+STARTING_HP = 100
+MAX_ROUNDS = 60
+# Copies of each champion in the shared pool, by cost
+POOL_SIZES = {1: 29, 2: 22, 3: 18, 4: 12, 5: 10}
+# How many 1-star copies a unit of each star level is made of
+COPIES_PER_STAR = {1: 1, 2: 3, 3: 9}
+
+
+class UnitPool:
+    """Copies of every champion shared by the players of one lobby.
+
+    Shops draw from it, sold and unbought units go back to it. Hugo Strange's creations
+    share Hugo's copies.
+    """
+
+    def __init__(self, sizes=POOL_SIZES):
+        self.counts = {}
+        self.tiers = [[] for _ in range(5)]
+        for name, cost, _, _, _ in UNIT_ROSTER + [HUGO_STRANGE]:
+            self.counts[name] = sizes[cost]
+            self.tiers[cost - 1].append(name)
+
+    @staticmethod
+    def key(name):
+        return HUGO_STRANGE[0] if name in HUGO_REPLACEMENTS else name
+
+    def draw(self, tier_index, rng):
+        """Remove and return one champion name from the tier, weighted by copies left; None if sold out"""
+        names = self.tiers[tier_index]
+        total = sum(self.counts[name] for name in names)
+        if total <= 0:
+            return None
+        pick = rng.random() * total
+        for name in names:
+            pick -= self.counts[name]
+            if pick < 0 and self.counts[name] > 0:
+                self.counts[name] -= 1
+                return name
+        # Float rounding on the last step: take the last champion with copies left
+        for name in reversed(names):
+            if self.counts[name] > 0:
+                self.counts[name] -= 1
+                return name
+        return None
+
+    def give_back(self, unit):
+        key = self.key(unit.name)
+        if key in self.counts:
+            self.counts[key] += COPIES_PER_STAR.get(unit.stars, 1)
+
+    def give_back_all(self, units):
+        for unit in units:
+            if unit is not None:
+                self.give_back(unit)
+
+
+def round_robin_pairs(seats, round_number):
+    """Pairings for one round by the circle method; a None opponent means fight a ghost"""
+    seats = list(seats)
+    if len(seats) % 2:
+        seats.append(None)
+    if len(seats) < 2:
+        return []
+    # Seat 0 stays put, everyone else rotates one place per round
+    rest = seats[1:]
+    shift = round_number % len(rest)
+    rotated = [seats[0]] + rest[shift:] + rest[:shift]
+    half = len(rotated) // 2
+    return [(rotated[i], rotated[-1 - i]) for i in range(half)]
+
+
+def combat_damage(round_number, winner):
+    """HP the loser of a fight loses: a stage base plus one per star on the winner's board"""
+    base = min(2 + round_number // 5, 10)
+    return base + sum(u.stars for row in winner.board for u in row if u)
+
+
+def board_names(player):
+    return sorted(u.name for row in player.board for u in row if u)
+
+
+class Lobby:
+    """One game of LOBBY_SIZE players sharing a UnitPool.
+
+    With bot_class=None nobody plays the planning phase here; the caller (the multiplayer
+    server) applies its clients' actions and then calls resolve_combats() and end_round().
+    With a comp library ([(name, units)], see comp_finder.py) every bot builds towards one
+    of its comps, picked per seat from the seed.
+    """
+
+    def __init__(self, seed, size=LOBBY_SIZE, bot_class=HeuristicBot, comps=None):
+        self.seed = seed
+        streams = RngStreams(seed)
+        self.pool = UnitPool()
+        self.players = []
+        self.bots = []
+        for seat in range(size):
+            player = Player(fill_shop=False, rng=streams.python("player", seat))
+            player.name = f"Bot {seat + 1}"
+            player.pool = self.pool
+            player.hp = STARTING_HP
+            player.generate_shop()
+            self.players.append(player)
+            if bot_class is None:
+                self.bots.append(None)
+            elif comps:
+                _, units = streams.python("comp", seat).choice(comps)
+                self.bots.append(bot_class(player, streams.python("bot", seat), comp=units))
+            else:
+                self.bots.append(bot_class(player, streams.python("bot", seat)))
+        self.match_rng = streams.python("matchmaking")
+        self.combat = CombatManager(rng=streams.python("combat"), verbose=False)
+        self.round = 1
+        self.alive = list(range(size))
+        self.placements = {}
+        self.final_boards = {}
+
+    def eliminate(self, seats):
+        """Place every seat that dropped to 0 HP this round; lower HP places worse"""
+        for seat in sorted(seats, key=lambda s: self.players[s].hp, reverse=True):
+            self.placements[seat] = len(self.alive)
+            self.final_boards[seat] = board_names(self.players[seat])
+            self.alive.remove(seat)
+            player = self.players[seat]
+            self.pool.give_back_all(player.bench + player.shop + [u for row in player.board for u in row])
+
+    @property
+    def finished(self):
+        return len(self.alive) <= 1 or self.round > MAX_ROUNDS
+
+    def play_round(self):
+        for seat in self.alive:
+            self.bots[seat].take_turn()
+        self.resolve_combats()
+        self.end_round()
+
+    def resolve_combats(self):
+        """Fight this round's pairings; returns [(seat, opponent seat or ghost, won, hp lost)]"""
+        outcomes = []
+        for seat_a, seat_b in round_robin_pairs(self.alive, self.round):
+            if seat_a is None or seat_b is None:
+                # Odd lobby: fight a copy of someone else's board; the ghost's owner takes no damage
+                real = seat_a if seat_b is None else seat_b
+                ghost = self.match_rng.choice([s for s in self.alive if s != real])
+                won = self.combat.start_combat(self.players[real].board, self.players[ghost].board,
+                                               self.players[real].trait_modifiers, self.players[ghost].trait_modifiers)
+                damage = 0 if won else combat_damage(self.round, self.players[ghost])
+                self.players[real].hp -= damage
+                outcomes.append((real, ghost, won, damage))
+                continue
+            a, b = self.players[seat_a], self.players[seat_b]
+            if self.combat.start_combat(a.board, b.board, a.trait_modifiers, b.trait_modifiers):
+                damage = combat_damage(self.round, a)
+                b.hp -= damage
+                outcomes += [(seat_a, seat_b, True, 0), (seat_b, seat_a, False, damage)]
+            else:
+                damage = combat_damage(self.round, b)
+                a.hp -= damage
+                outcomes += [(seat_a, seat_b, False, damage), (seat_b, seat_a, True, 0)]
+        return outcomes
+
+    def end_round(self):
+        """Eliminate players at 0 HP, then pay income and open the next round's shops"""
+        dead = [seat for seat in self.alive if self.players[seat].hp <= 0]
+        if dead:
+            self.eliminate(dead)
+        for seat in self.alive:
+            self.players[seat].end_turn()
+        self.round += 1
+
+    def run(self):
+        """Play to the end; returns {"rounds", "placements": [per seat], "boards": [per seat]}"""
+        while not self.finished:
+            self.play_round()
+        return self.results()
+
+    def results(self):
+        # Whoever is left (normally just the winner) places by remaining HP
+        for rank, seat in enumerate(sorted(self.alive, key=lambda s: self.players[s].hp, reverse=True), start=1):
+            self.placements[seat] = rank
+            self.final_boards[seat] = board_names(self.players[seat])
+        size = len(self.players)
+        return {
+            "rounds": self.round - 1,
+            "placements": [self.placements[seat] for seat in range(size)],
+            "boards": [self.final_boards[seat] for seat in range(size)],
+        }
+
+
+def run_lobby(seed, comps=None):
+    return Lobby(seed, comps=comps).run()
+
+
+def _init_worker():
+    import unit
+    unit.LOAD_IMAGES = False
+
+
+def run_lobbies(master_seed, games, workers=1, chunksize=4, comps=None):
+    """Results for lobbies 0..games-1, in order; identical for any worker count"""
+    seeds = [derive_seed(master_seed, "lobby", i) for i in range(games)]
+    if workers <= 1:
+        _init_worker()
+        return [run_lobby(seed, comps) for seed in seeds]
+    with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+        return pool.map(partial(run_lobby, comps=comps), seeds, chunksize=chunksize)
+
+
+def placement_stats(results):
+    """Per champion: games on a final board, average placement and top-4 rate"""
+    totals = {}
+    for result in results:
+        for placement, board in zip(result["placements"], result["boards"]):
+            for name in set(board):
+                count, placement_sum, top4 = totals.get(name, (0, 0, 0))
+                totals[name] = (count + 1, placement_sum + placement, top4 + (placement <= 4))
+    return {name: {"boards": count,
+                   "avg_placement": round(placement_sum / count, 3),
+                   "top4_rate": round(top4 / count, 3)}
+            for name, (count, placement_sum, top4) in totals.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate headless 8-player lobbies of bots")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=1, help="processes to spread the lobbies over")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="write per-champion placement stats to this JSON file")
+    parser.add_argument("--comps", metavar="FILE", help="comp library for the bots to build (comp_finder.py --export)")
+    args = parser.parse_args()
+
+    comps = None
+    if args.comps:
+        from comp_finder import load_library
+        try:
+            comps = load_library(args.comps)
+        except (OSError, ValueError) as e:
+            print(f"Could not load comp library {args.comps}: {e}")
+            return 1
+
+    start = time.perf_counter()
+    results = run_lobbies(args.seed, args.games, args.workers, comps=comps)
+    elapsed = time.perf_counter() - start
+
+    rounds = sum(r["rounds"] for r in results) / len(results)
+    print(f"{args.games} lobbies in {elapsed:.1f} s ({args.games / elapsed * 60:,.0f} games/min, "
+          f"{args.workers} worker(s)), {rounds:.1f} rounds on average")
+
+    stats = placement_stats(results)
+    print(f"{'Champion':<22}{'boards':>8}{'avg place':>11}{'top 4':>8}")
+    for name, s in sorted(stats.items(), key=lambda item: item[1]["avg_placement"]):
+        print(f"{name:<22}{s['boards']:>8}{s['avg_placement']:>11.2f}{s['top4_rate'] * 100:>7.0f}%")
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({"seed": args.seed, "games": args.games, "champions": stats}, f, indent=4, sort_keys=True)
+        print(f"Wrote {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
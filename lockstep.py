@@ -0,0 +1,362 @@
+# lockstep.py - deterministic lockstep for small private lobbies
+#
+# Usage:
+#   python lockstep.py --port 8766          # run a relay
+#
+# Instead of simulating every lobby on the server (server.py), every peer simulates the
+# whole lobby from the seed the relay hands out. Peers only send timestamped inputs; the
+# relay numbers them and forwards them to everyone, so all peers apply the same inputs in
+# the same order and stay in sync without the relay ever touching game state.
+#
+# Each peer keeps a running CRC32 per seat, chained over that player's encoded state after
+# every input it applies and after every combat. At the end of every round the peers swap
+# those checksums. If they disagree, they swap that round's per-input hash history too,
+# and the first entry that differs is the input after which the simulations diverged.
+import argparse
+import asyncio
+import struct
+import sys
+import time
+import zlib
+
+from action_log import ACTIONS, CLIENT_ACTIONS, END_TURN, check_intent
+from client import GameClient
+from lobby import Lobby, LOBBY_SIZE
+from net_protocol import (DEFAULT_HOST, ProtocolError, encode_frame, decode_json, MSG_HELLO, MSG_PING,
+                          MSG_LS_JOIN, MSG_LS_INPUT, MSG_LS_CHECKSUM, MSG_LS_HISTORY, MSG_LS_START, MSG_ERROR)
+from rng import new_master_seed
+from save_state import encode_player
+from server import GameServer
+
+DEFAULT_RELAY_PORT = 8766
+# Peers may also send END_TURN: in lockstep it means "done planning this round"
+LOCKSTEP_ACTIONS = CLIENT_ACTIONS | {END_TURN}
+# Rounds of input history kept for pinpointing a desync reported late
+HISTORY_ROUNDS = 4
+
+_HP = struct.Struct("<h")
+
+
+def hash_player(player, previous):
+    return zlib.crc32(_HP.pack(player.hp) + encode_player(player), previous)
+
+
+def find_divergence(mine, theirs):
+    """Index of the first differing [seq, seat, hash] entry of two round histories, or None"""
+    for i, (a, b) in enumerate(zip(mine, theirs)):
+        if list(a) != list(b):
+            return i
+    if len(mine) != len(theirs):
+        return min(len(mine), len(theirs))
+    return None
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def check_report(msg_type, body, size):
+    """Reason a MSG_LS_CHECKSUM or MSG_LS_HISTORY body is malformed for a lobby of `size`, or None"""
+    if not _is_int(body.get("round")) or body["round"] < 1:
+        return "round must be a positive integer"
+    if msg_type == MSG_LS_CHECKSUM:
+        hashes = body.get("hashes")
+        if not isinstance(hashes, list) or len(hashes) != size or not all(_is_int(h) for h in hashes):
+            return f"hashes must be a list of {size} integers"
+        return None
+    history = body.get("history")
+    if not isinstance(history, list) or not all(
+            isinstance(entry, list) and len(entry) == 3 and (entry[0] is None or _is_int(entry[0]))
+            and _is_int(entry[1]) and 0 <= entry[1] < size and _is_int(entry[2]) for entry in history):
+        return "history must be a list of [seq, seat, hash] entries"
+    return None
+
+
+class LockstepGame:
+    """The whole lobby's simulation, advanced only by relayed inputs.
+
+    Inputs that are malformed, from eliminated players or sent after a player's END_TURN
+    are ignored - the same way on every peer, so ignoring them can't desync anyone.
+    """
+
+    def __init__(self, seed, size):
+        self.game = Lobby(seed, size=size, bot_class=None)
+        self.hashes = [0] * size
+        self.history = []       # [seq, seat, hash] per applied input this round; seq None for combat
+        self.inputs = {}        # seq -> relayed input, to report the one that diverged
+        self.ready = set()
+        self.departed = set()
+        self.rounds = {}        # round -> (checksum, history, inputs) of recent rounds
+
+    @property
+    def round(self):
+        return self.game.round
+
+    @property
+    def finished(self):
+        return self.game.finished
+
+    def apply(self, message):
+        """Apply one relayed input; returns (round, checksum) when it completed a round, else None"""
+        if self.finished:
+            return None
+        seat, op, args = message.get("seat"), message.get("op"), message.get("args", [])
+        if op is None and "op" in message:
+            # The relay's notice that the seat's peer left; peers can't send one (see RelayLobby.forward)
+            self.departed.add(seat)
+        elif seat not in self.game.alive or seat in self.ready or check_intent(op, args, LOCKSTEP_ACTIONS):
+            return None
+        elif op == END_TURN:
+            self.ready.add(seat)
+        else:
+            player = self.game.players[seat]
+            ACTIONS[op][2](player, *args)
+            self.hashes[seat] = hash_player(player, self.hashes[seat])
+            self.history.append([message["seq"], seat, self.hashes[seat]])
+            self.inputs[message["seq"]] = message
+        if all(seat in self.ready or seat in self.departed for seat in self.game.alive):
+            return self.finish_round()
+        return None
+
+    def finish_round(self):
+        round_number = self.game.round
+        self.game.resolve_combats()
+        self.game.end_round()
+        for seat, player in enumerate(self.game.players):
+            self.hashes[seat] = hash_player(player, self.hashes[seat])
+            self.history.append([None, seat, self.hashes[seat]])
+        checksum = list(self.hashes)
+        self.rounds[round_number] = (checksum, self.history, self.inputs)
+        self.rounds.pop(round_number - HISTORY_ROUNDS, None)
+        self.history = []
+        self.inputs = {}
+        self.ready.clear()
+        return round_number, checksum
+
+    def describe_divergence(self, round_number, theirs):
+        """Where this peer's history for a round first differs from another peer's"""
+        checksum, history, inputs = self.rounds[round_number]
+        index = find_divergence(history, theirs)
+        if index is None:
+            return None
+        entry = history[index] if index < len(history) else theirs[index]
+        seq, seat = entry[0], entry[1]
+        if seq is None:
+            what = "combat"
+        else:
+            message = inputs.get(seq, {})
+            what = f"{ACTIONS[message['op']][0]}{tuple(message['args'])}" if message else "unknown input"
+        return {"round": round_number, "index": index, "seq": seq, "seat": seat, "action": what}
+
+
+class LockstepPeer(GameClient):
+    """A player in a lockstep lobby: sends inputs, simulates everyone, checks for desyncs"""
+
+    def __init__(self, reader, writer, name):
+        super().__init__(reader, writer, name)
+        self.sim = None
+        self.checksums = {}     # round -> {seat: checksum} from every peer, this one included
+        self.histories = {}     # round -> {seat: history} received after a mismatch
+        self.history_sent = set()
+        self.desync = None
+
+    async def join_lockstep(self, code, size=LOBBY_SIZE):
+        started = self.wait_for(lambda c, t, b: t in (MSG_LS_START, MSG_ERROR))
+        self.send(MSG_LS_JOIN, {"code": code, "size": size})
+        body = await started
+        if "error" in body:
+            raise ConnectionError(body["error"])
+        return self.seat
+
+    def handle(self, msg_type, body):
+        if msg_type == MSG_LS_START:
+            self.seat = body["seat"]
+            self.sim = LockstepGame(body["seed"], body["size"])
+            self.round = self.sim.round
+        elif msg_type == MSG_LS_INPUT and self.sim is not None:
+            completed = self.sim.apply(body)
+            if completed is not None:
+                round_number, checksum = completed
+                self.round = self.sim.round
+                self.send(MSG_LS_CHECKSUM, {"round": round_number, "hashes": checksum})
+                if self.sim.finished:
+                    self.phase = "finished"
+        elif msg_type == MSG_LS_CHECKSUM:
+            self.checksums.setdefault(body["round"], {})[body["seat"]] = body["hashes"]
+            self.compare_checksums(body["round"])
+            self.checksums.pop(body["round"] - HISTORY_ROUNDS, None)
+        elif msg_type == MSG_LS_HISTORY:
+            self.histories.setdefault(body["round"], {})[body["seat"]] = body["history"]
+            self.pinpoint(body["round"])
+        super().handle(msg_type, body)
+
+    def compare_checksums(self, round_number):
+        received = self.checksums[round_number]
+        mine = received.get(self.seat)
+        if mine is None or all(hashes == mine for hashes in received.values()):
+            return
+        if round_number not in self.history_sent and round_number in self.sim.rounds:
+            self.history_sent.add(round_number)
+            self.send(MSG_LS_HISTORY, {"round": round_number, "history": self.sim.rounds[round_number][1]})
+
+    def pinpoint(self, round_number):
+        if self.desync is not None or round_number not in self.sim.rounds:
+            return
+        for seat, history in self.histories[round_number].items():
+            if seat == self.seat:
+                continue
+            divergence = self.sim.describe_divergence(round_number, history)
+            if divergence is not None:
+                divergence["peer"] = seat
+                self.desync = divergence
+                print(f"Desync with seat {seat} in round {round_number}: first differing input is "
+                      f"#{divergence['seq']} ({divergence['action']} by seat {divergence['seat']})")
+                return
+
+    def send_input(self, op, *args):
+        """Send an input; it takes effect when the relay echoes it back, in relay order"""
+        self.send(MSG_LS_INPUT, {"t": time.time(), "op": op, "args": list(args)})
+
+    def end_turn(self):
+        self.send_input(END_TURN)
+
+    async def wait_for_round(self, round_number):
+        if self.round >= round_number or self.phase == "finished":
+            return
+        await self.wait_for(lambda c, t, b: c.round >= round_number or c.phase == "finished")
+
+
+class RelayLobby:
+    """Seats of one private lobby; numbers inputs and forwards everything, simulates nothing"""
+
+    def __init__(self, relay, code, size):
+        self.relay = relay
+        self.lobby_id = code
+        self.sessions = [None] * size
+        self.joined = 0
+        self.phase = "waiting"
+        self.next_seq = 1
+
+    @property
+    def full(self):
+        return self.joined >= len(self.sessions)
+
+    def add(self, session):
+        seat = self.joined
+        self.joined += 1
+        self.sessions[seat] = session
+        session.lobby = self
+        session.seat = seat
+        if self.full:
+            self.phase = "playing"
+            seed = new_master_seed()
+            for seat, session in enumerate(self.sessions):
+                if session is not None:
+                    session.send(MSG_LS_START, {"seed": seed, "size": len(self.sessions), "seat": seat})
+
+    def broadcast(self, msg_type, body):
+        frame = encode_frame(msg_type, body)
+        for session in self.sessions:
+            if session is not None:
+                session.send_frame(frame)
+
+    def forward(self, session, msg_type, body):
+        if self.phase != "playing":
+            return
+        if msg_type == MSG_LS_INPUT and check_intent(body.get("op"), body.get("args", []), LOCKSTEP_ACTIONS):
+            # Malformed inputs never reach the peers; an "op" of None is reserved for leave()
+            return
+        if msg_type in (MSG_LS_CHECKSUM, MSG_LS_HISTORY):
+            # Every peer reads these as they come, so a bad one is stopped here
+            error = check_report(msg_type, body, len(self.sessions))
+            if error is not None:
+                session.send(MSG_ERROR, {"error": error})
+                return
+        self._relay(session, msg_type, body)
+
+    def _relay(self, session, msg_type, body):
+        body["seat"] = session.seat
+        if msg_type == MSG_LS_INPUT:
+            body["seq"] = self.next_seq
+            body["st"] = time.time()
+            self.next_seq += 1
+        self.broadcast(msg_type, body)
+
+    def leave(self, session):
+        if self.phase == "waiting":
+            # Nobody has been told a seat yet: close the gap so the lobby only starts once it is
+            # really full, rather than with a seat every peer would wait on forever
+            waiting = [s for s in self.sessions if s is not None and s is not session]
+            self.sessions = waiting + [None] * (len(self.sessions) - len(waiting))
+            for seat, s in enumerate(waiting):
+                s.seat = seat
+            self.joined = len(waiting)
+        elif self.sessions[session.seat] is session:
+            self.sessions[session.seat] = None
+        if self.phase == "playing":
+            # Peers treat the seat as ready every round from here on
+            self._relay(session, MSG_LS_INPUT, {"t": time.time(), "op": None, "args": []})
+        if all(s is None for s in self.sessions):
+            self.close()
+
+    def close(self):
+        self.phase = "finished"
+        self.relay.remove_lobby(self)
+
+
+class LockstepRelay(GameServer):
+    """Accepts peers into private lobbies by code and relays their messages"""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_RELAY_PORT):
+        super().__init__(host, port)
+
+    def dispatch(self, session, msg_type, body):
+        if msg_type in (MSG_HELLO, MSG_PING):
+            super().dispatch(session, msg_type, body)
+            return
+        body = decode_json(body)
+        if msg_type == MSG_LS_JOIN:
+            if session.lobby is None:
+                self.join_private(session, str(body.get("code", ""))[:32], body.get("size", LOBBY_SIZE))
+        elif msg_type in (MSG_LS_INPUT, MSG_LS_CHECKSUM, MSG_LS_HISTORY):
+            if session.lobby is not None:
+                session.lobby.forward(session, msg_type, body)
+        else:
+            raise ProtocolError(f"unknown message type {msg_type}")
+
+    def join_private(self, session, code, size):
+        lobby = self.lobbies.get(code)
+        if lobby is None:
+            if not isinstance(size, int) or not 2 <= size <= LOBBY_SIZE:
+                session.send(MSG_ERROR, {"error": f"lobby size must be 2 to {LOBBY_SIZE}"})
+                return
+            lobby = self.lobbies[code] = RelayLobby(self, code, size)
+        elif lobby.full:
+            session.send(MSG_ERROR, {"error": f"lobby {code!r} is full"})
+            return
+        lobby.add(session)
+
+
+async def run_relay(args):
+    relay = await LockstepRelay(args.host, args.port).start()
+    print(f"DC Auto Battler lockstep relay on {relay.host}:{relay.port}")
+    try:
+        await relay.serve_forever()
+    finally:
+        relay.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Relay for lockstep private lobbies")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_RELAY_PORT)
+    args = parser.parse_args()
+    try:
+        asyncio.run(run_relay(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+# logic_benchmark.py - micro-benchmarks for the Player / CombatManager hot paths
+#
+# Usage:
+#   python logic_benchmark.py                    # run and compare against the saved baseline
+#   python logic_benchmark.py --save-baseline    # run and store the results as the new baseline
+#   python logic_benchmark.py --only generate_shop end_turn
+import os
+
+# Units load their PNGs through pygame, so give it a display that never opens a window
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import contextlib
+import io
+import random
+import sys
+import time
+import tracemalloc
+
+import pygame
+
+from benchmark_utils import BASELINE_DIR, load_baseline, save_baseline, sample_units, clone_unit
+from bot import HeuristicBot
+from combat import CombatManager
+from game_constants import GameConstants
+from player import Player
+
+DEFAULT_BASELINE = os.path.join(BASELINE_DIR, "logic_baseline.json")
+SEED = 1337
+
+
+class Templates:
+    """Units sampled once with a fixed seed; every benchmark state is built from clones of these"""
+
+    def __init__(self):
+        self.player = Player(rng=random.Random(SEED))
+        self.units = sample_units(self.player, 30, seed=SEED)
+        # The champion we build 2-star / 3-star chains out of
+        self.chain = self.units[0]
+        self.fillers = self.units[1:]
+
+
+def fresh_player(level=9, gold=50):
+    # Same seed every time, so every iteration rolls the same shops
+    player = Player(rng=random.Random(SEED))
+    player.level = level
+    player.gold = gold
+    return player
+
+
+def place_on_board(player, units):
+    for i, unit in enumerate(units):
+        player.board[i // GameConstants.BOARD_WIDTH][i % GameConstants.BOARD_WIDTH] = unit
+    player.calculate_traits()
+
+
+def fill_bench(player, units, start=0):
+    for i, unit in enumerate(units):
+        player.bench[start + i] = unit
+
+
+# --- State factories (run outside the timed region) ---
+
+def setup_generate_shop(t):
+    return fresh_player(level=9)
+
+
+def setup_check_combinations(t):
+    # Two 2-star copies on the board, three 1-star copies on the bench: one call chains all the way to 3 stars
+    player = fresh_player(level=9)
+    place_on_board(player, [clone_unit(player, t.chain, stars=2) for _ in range(2)] +
+                   [clone_unit(player, u) for u in t.fillers[:7]])
+    fill_bench(player, [clone_unit(player, t.chain) for _ in range(3)])
+    fill_bench(player, [clone_unit(player, u) for u in t.fillers[7:13]], start=3)
+    return player
+
+
+def setup_calculate_traits(t):
+    player = fresh_player(level=10)
+    place_on_board(player, [clone_unit(player, u) for u in t.fillers[:10]])
+    return player
+
+
+def setup_buy_and_combine(t):
+    # Buying the shop copy completes 1-star -> 2-star -> 3-star
+    player = fresh_player(level=9)
+    place_on_board(player, [clone_unit(player, t.chain, stars=2) for _ in range(2)] +
+                   [clone_unit(player, u) for u in t.fillers[:7]])
+    fill_bench(player, [clone_unit(player, t.chain) for _ in range(2)])
+    fill_bench(player, [clone_unit(player, u) for u in t.fillers[7:13]], start=2)
+    player.shop[0] = clone_unit(player, t.chain)
+    return player
+
+
+def setup_move_unit_to_board(t):
+    player = fresh_player(level=9)
+    place_on_board(player, [clone_unit(player, u) for u in t.fillers[:8]])
+    fill_bench(player, [clone_unit(player, u) for u in t.fillers[8:8 + GameConstants.BENCH_SLOTS]])
+    return player
+
+
+def setup_end_turn(t):
+    player = fresh_player(level=9, gold=57)
+    place_on_board(player, [clone_unit(player, u) for u in t.fillers[:9]])
+    return player
+
+
+def setup_start_combat(t):
+    player = fresh_player(level=10)
+    opponent = fresh_player(level=10)
+    place_on_board(player, [clone_unit(player, u) for u in t.fillers[:10]])
+    place_on_board(opponent, [clone_unit(opponent, u, stars=2) for u in t.fillers[10:20]])
+    return (CombatManager(rng=random.Random(SEED)), player.board, opponent.board,
+            player.trait_modifiers, opponent.trait_modifiers)
+
+
+def setup_bot_turn(t):
+    # Mid-game planning phase: gold to spend, a partial board, a few bench units
+    player = fresh_player(level=6, gold=40)
+    player.round = 12
+    place_on_board(player, [clone_unit(player, u) for u in t.fillers[:5]])
+    fill_bench(player, [clone_unit(player, u) for u in t.fillers[5:8]])
+    return HeuristicBot(player, random.Random(SEED))
+
+
+BENCHMARKS = {
+    "generate_shop": (setup_generate_shop, lambda p: p.generate_shop()),
+    "check_combinations": (setup_check_combinations, lambda p: p.check_combinations()),
+    "calculate_traits": (setup_calculate_traits, lambda p: p.calculate_traits()),
+    "buy_and_combine": (setup_buy_and_combine, lambda p: p.buy_and_combine(0)),
+    "move_unit_to_board": (setup_move_unit_to_board, lambda p: p.move_unit_to_board(0, 1, 2)),
+    "end_turn": (setup_end_turn, lambda p: p.end_turn()),
+    "start_combat": (setup_start_combat, lambda s: s[0].start_combat(*s[1:])),
+    "bot_turn": (setup_bot_turn, lambda bot: bot.take_turn()),
+}
+
+
+def time_op(templates, setup, op, iterations):
+    """Mean seconds per call; each call gets a freshly built state"""
+    total = 0.0
+    for _ in range(iterations):
+        state = setup(templates)
+        start = time.perf_counter()
+        op(state)
+        total += time.perf_counter() - start
+    return total / iterations
+
+
+def measure_allocations(templates, setup, op, iterations):
+    """Peak bytes and net new memory blocks per call, measured with tracemalloc"""
+    peak_total = 0
+    blocks_total = 0
+    tracemalloc.start()
+    try:
+        for _ in range(iterations):
+            state = setup(templates)
+            before = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+            baseline_bytes = tracemalloc.get_traced_memory()[0]
+            op(state)
+            peak_total += tracemalloc.get_traced_memory()[1] - baseline_bytes
+            after = tracemalloc.take_snapshot()
+            blocks_total += sum(max(0, stat.count_diff) for stat in after.compare_to(before, 'lineno'))
+    finally:
+        tracemalloc.stop()
+    return peak_total / iterations, blocks_total / iterations
+
+
+def run_benchmarks(names, iterations, alloc_iterations):
+    pygame.display.set_mode((1, 1))
+    templates = Templates()
+    results = {}
+    for name in names:
+        setup, op = BENCHMARKS[name]
+        # start_combat prints its result; keep the output out of the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            time_op(templates, setup, op, max(1, iterations // 10))  # warmup
+            seconds = time_op(templates, setup, op, iterations)
+            peak_bytes, blocks = measure_allocations(templates, setup, op, alloc_iterations)
+
+        results[name] = {
+            "ops_per_sec": round(1.0 / seconds, 1) if seconds else 0.0,
+            "us_per_op": round(seconds * 1e6, 3),
+            "peak_kib_per_op": round(peak_bytes / 1024.0, 3),
+            "blocks_per_op": round(blocks, 1),
+        }
+        r = results[name]
+        print(f"{name:<20} {r['ops_per_sec']:>12,.0f} ops/s  {r['us_per_op']:>10.2f} us/op  "
+              f"{r['peak_kib_per_op']:>8.2f} KiB peak  {r['blocks_per_op']:>7.1f} blocks")
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    regressions = []
+    base_results = baseline.get("results", {})
+    for name, stats in results.items():
+        base = base_results.get(name)
+        if not base or not base.get("ops_per_sec"):
+            continue
+        change = stats["ops_per_sec"] / base["ops_per_sec"] - 1.0
+        marker = ""
+        if change < -tolerance:
+            marker = "  <-- REGRESSION"
+            regressions.append(name)
+        print(f"{name:<20} {base['ops_per_sec']:>12,.0f} -> {stats['ops_per_sec']:>12,.0f} ops/s "
+              f"({change * 100:+.1f}%)  blocks {base.get('blocks_per_op', 0):.1f} -> "
+              f"{stats['blocks_per_op']:.1f}{marker}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the game-logic layer")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--iterations", type=int, default=2000, help="timed calls per benchmark")
+    parser.add_argument("--alloc-iterations", type=int, default=50, help="tracemalloc calls per benchmark")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="overwrite the baseline with this run")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="allowed ops/sec drop before a benchmark counts as a regression (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.only, args.iterations, args.alloc_iterations)
+    report = {
+        "meta": {"python": sys.version.split()[0], "seed": SEED, "iterations": args.iterations},
+        "results": results,
+    }
+
+    if args.save_baseline:
+        save_baseline(args.baseline, report)
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+
+    print("\nComparison against baseline:")
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.tolerance * 100:.0f}%")
+        return 1
+    print("\nNo logic regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+# net_protocol.py - framing and message types shared by server.py and client.py
+#
+# Frame: payload length (I, big endian, counts the type byte), message type (B), body.
+# Bodies are UTF-8 JSON objects unless a message type says otherwise; the high-rate state
+# messages are binary (see state_sync.py).
+import json
+import struct
+
+PROTOCOL_VERSION = 2
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Anything bigger is a broken or hostile client
+MAX_FRAME_BYTES = 64 * 1024
+
+# Client -> server
+MSG_HELLO = 1       # {"name", "version"}
+MSG_JOIN = 2        # {} - join the next open lobby
+MSG_ACTION = 3      # {"seq", "op", "args"} - op is an action_log opcode
+MSG_READY = 4       # {} - done planning; combat starts early once everyone alive is ready
+MSG_PING = 5        # {"t"}
+MSG_STATE_ACK = 6   # binary: state version held (I), 0 to ask for a keyframe
+
+# Lockstep relay (lockstep.py); the relay forwards inputs, checksums and histories to every
+# peer in the lobby, adding the sender's "seat"
+MSG_LS_JOIN = 16    # {"code", "size"} - join, or open, the private lobby with this code
+MSG_LS_INPUT = 17   # {"t", "op", "args"}; relayed with "seq" and the relay's time "st". op null: seat left
+MSG_LS_CHECKSUM = 18  # {"round", "hashes": per seat}
+MSG_LS_HISTORY = 19   # {"round", "history": [[seq, seat, hash]]} - sent after a checksum mismatch
+
+# Server -> client
+MSG_WELCOME = 64    # {"client_id"}
+MSG_JOINED = 65     # {"lobby", "seat", "size"}
+MSG_ACK = 66        # {"seq", "ok", "result" | "error"}
+MSG_STATE = 67      # binary: state_sync keyframe or delta of the client's own player
+MSG_PHASE = 68      # {"phase", "round", "seconds"}
+MSG_COMBAT = 69     # {"round", "results": [[seat, opponent, won, hp_lost]], "hp": [per seat]}
+MSG_GAME_OVER = 70  # {"placement"}
+MSG_ERROR = 71      # {"error"}
+MSG_PONG = 72       # {"t"}
+MSG_LS_START = 96   # {"seed", "size", "seat"} - the lockstep lobby is full; simulate from this seed
+
+_LENGTH = struct.Struct(">I")
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def encode_frame(msg_type, body=b""):
+    """Frame a message; dict bodies are sent as JSON, bytes as they are"""
+    if not isinstance(body, (bytes, bytearray)):
+        body = json.dumps(body, separators=(",", ":")).encode("utf-8")
+    return _LENGTH.pack(len(body) + 1) + bytes((msg_type,)) + body
+
+
+def decode_json(body):
+    try:
+        value = json.loads(body.decode("utf-8")) if body else {}
+    except (UnicodeDecodeError, ValueError) as e:
+        raise ProtocolError(f"bad JSON body: {e}")
+    if not isinstance(value, dict):
+        raise ProtocolError("body is not an object")
+    return value
+
+
+async def read_frame(reader):
+    """Next (msg_type, body bytes); raises asyncio.IncompleteReadError when the peer hangs up"""
+    header = await reader.readexactly(_LENGTH.size)
+    length = _LENGTH.unpack(header)[0]
+    if length < 1 or length > MAX_FRAME_BYTES:
+        raise ProtocolError(f"frame length {length} out of range")
+    payload = await reader.readexactly(length)
+    return payload[0], payload[1:]
+
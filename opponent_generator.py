@@ -0,0 +1,235 @@
+# opponent_generator.py - PvE opponent boards from precomputed round tables
+#
+# Usage:
+#   python opponent_generator.py --round 12 --seed 5   # show one round's opponent
+#   python opponent_generator.py --table               # power of every comp, round by round
+#   python opponent_generator.py --table --library data/comp_library.json
+#
+# Opponents come from a small curated comp library, or from a comp_finder.py export staged by
+# comp level. At import every comp's stats are worked out for every round - star level from
+# the round, then the round's scaling applied once to the champion's base stats - and stored
+# in flat integer arrays. Building a round's opponent is then a table lookup: nothing
+# compounds between rounds, no float rounding drifts, and the same seed and round always
+# give the same board.
+import argparse
+import sys
+from array import array
+
+from economy_planner import LEVEL_CURVE
+from game_constants import GameConstants
+from lobby import MAX_ROUNDS
+from player import get_asset_files, find_png_name
+from rng import derive_seed, python_rng
+from save_state import SAVE_ROSTER, ROSTER_IDS
+
+# Stats grow 10% of base per round, kept in thousandths so the tables are exact integers
+SCALE_PER_ROUND = 100
+BOARD_UNITS = 9
+# Where a comp's units stand, in the order they are listed: front line first
+FORMATION = [(3, 2), (2, 2), (4, 2), (1, 2), (5, 2), (3, 1), (2, 0), (4, 0), (3, 0)]
+
+# Curated comps: units in order of importance; earlier rounds field only the first few
+COMP_LIBRARY = [
+    ("Justice League Rookies", ["Martian Manhunter", "Aquaman", "Power Girl", "Robin", "Batgirl",
+                                "Green Arrow", "Catwoman", "Krypto", "Supergirl"]),
+    ("Rogues", ["Killer Croc", "Heatwave", "Clayface", "Lex Luthor", "Black Manta", "Captain Boomerang",
+                "Pied Piper", "Sinestro", "Cheetah"]),
+    ("Young Titans", ["Starfire", "Amazo", "Red Tornado", "Nightwing", "Blue Beetle", "Robin",
+                      "Zatanna", "Krypto", "Supergirl"]),
+    ("Kryptonians", ["Zod", "Power Girl", "Doomsday", "Bane", "Superman", "Supergirl", "Krypto",
+                     "Green Lantern", "Wonder Woman"]),
+    ("Sorcerers", ["Weather Wizard", "Swamp Thing", "Cyborg", "Green Lantern", "Zatanna", "Constantine",
+                   "Sinestro", "Raven", "Brainiac"]),
+    ("Legion of Doom", ["Bane", "Lex Luthor", "Gorilla Grodd", "Metallo", "Cheetah", "Black Manta",
+                        "Sinestro", "Deathstroke", "Doomsday"]),
+    ("Justice League", ["Wonder Woman", "Superman", "Martian Manhunter", "Batman", "Aquaman", "Flash",
+                        "Green Lantern", "Red Hood", "Dr. Fate"]),
+    ("Apokolips", ["Darkseid", "Solomon Grundy", "Gorilla Grodd", "Metallo", "King Shark", "Zoom",
+                   "Brainiac", "Deathstroke", "Joker"]),
+    ("Squad and Rogues", ["King Shark", "Weather Wizard", "Harley Quinn", "Captain Cold", "Joker", "Deadshot",
+                          "Trickster", "Mirror Master", "Captain Boomerang"]),
+]
+# (first round, comps that can appear from then on)
+STAGES = [
+    (1, [0, 1, 2]),
+    (10, [3, 4, 5]),
+    (21, [6, 7, 8]),
+]
+
+
+def units_for_round(round_number):
+    return min(BOARD_UNITS, 2 + (round_number - 1) // 3)
+
+
+def stars_for_round(round_number, index):
+    """Star level of a comp's index-th unit; the carries (listed first) star up first"""
+    if round_number >= 30:
+        return 3 if index < 2 else 2
+    if round_number >= 15:
+        return 2
+    if round_number >= 6:
+        return 2 if index < 3 else 1
+    return 1
+
+
+def star_stat(value, stars):
+    """A base stat at this star level, truncated exactly as Unit.combine does"""
+    for star in range(2, stars + 1):
+        value = int(value * 1.8)
+        if star == 3:
+            value = int(value * 1.5)
+    return value
+
+
+def scale_stat(value, round_number):
+    """value scaled by 1 + 0.1 * round, rounded half up, in integers"""
+    return (value * (1000 + SCALE_PER_ROUND * round_number) + 500) // 1000
+
+
+def round_scaled_stats(name, stars, round_number):
+    """(health, damage) of a champion at a star level in a given round"""
+    _, _, _, health, damage = SAVE_ROSTER[ROSTER_IDS[name]]
+    return scale_stat(star_stat(health, stars), round_number), scale_stat(star_stat(damage, stars), round_number)
+
+
+def _stage_comps(round_number, stages=STAGES):
+    comps = stages[0][1]
+    for first_round, stage_comps in stages:
+        if round_number >= first_round:
+            comps = stage_comps
+    return comps
+
+
+def library_stages(levels):
+    """STAGES for library comps of these levels: the lowest level's comps from round 1, each
+    higher level's from the round LEVEL_CURVE expects a player to reach it"""
+    reached = dict(LEVEL_CURVE)
+    stages = []
+    for level in sorted(set(levels)):
+        first_round = max(reached.get(level, 1), stages[-1][0] + 1) if stages else 1
+        stages.append((first_round, [comp for comp, comp_level in enumerate(levels) if comp_level == level]))
+    return stages
+
+
+def _build_tables(library=COMP_LIBRARY):
+    """Flat arrays indexed by (round - 1, comp, unit): roster ids, stars, health and damage, plus power"""
+    for name, names in library:
+        if len(names) < BOARD_UNITS:
+            raise ValueError(f"comp {name!r} has {len(names)} units, opponents need {BOARD_UNITS}")
+    roster_ids = array('B', (ROSTER_IDS[name] for _, names in library for name in names[:BOARD_UNITS]))
+    stars, health, damage, power = array('B'), array('I'), array('I'), array('I')
+    for round_number in range(1, MAX_ROUNDS + 1):
+        count = units_for_round(round_number)
+        for comp in range(len(library)):
+            total = 0
+            for i in range(BOARD_UNITS):
+                unit_stars = stars_for_round(round_number, i)
+                name = SAVE_ROSTER[roster_ids[comp * BOARD_UNITS + i]][0]
+                h, d = round_scaled_stats(name, unit_stars, round_number)
+                stars.append(unit_stars)
+                health.append(h)
+                damage.append(d)
+                if i < count:
+                    total += h + d
+            power.append(total)
+    return roster_ids, stars, health, damage, power
+
+
+_TABLES = _build_tables()
+
+
+class OpponentGenerator:
+    """PvE opponents for one run; which comp a round brings depends only on the seed and the round.
+
+    library replaces COMP_LIBRARY with [(name, units)] of at least BOARD_UNITS units each, e.g.
+    comp_finder.load_library(), and stages replaces STAGES for it (see library_stages()); without
+    stages every round picks from all of the library's comps.
+    """
+
+    def __init__(self, seed, library=None, stages=None):
+        self.seed = seed
+        self.library = COMP_LIBRARY if library is None else library
+        self.tables = _TABLES if library is None else _build_tables(library)
+        self.stages = STAGES if library is None else stages
+
+    def comp_for_round(self, round_number):
+        """Index into the comp library of this round's opponent"""
+        comps = _stage_comps(round_number, self.stages) if self.stages else range(len(self.library))
+        return comps[derive_seed(self.seed, "pve", round_number) % len(comps)]
+
+    def _offsets(self, round_number):
+        """(table round, comp, table row) of a round; rounds outside 1..MAX_ROUNDS use the nearest table round"""
+        table_round = min(max(round_number, 1), MAX_ROUNDS)
+        comp = self.comp_for_round(round_number)
+        row = (table_round - 1) * len(self.library) + comp
+        return table_round, comp, row
+
+    def power(self, round_number):
+        """Summed health + damage of the round's opponent, as CombatManager weighs it"""
+        return self.tables[4][self._offsets(round_number)[2]]
+
+    def units(self, round_number):
+        """[(name, stars, x, y, health, damage)] for the round's opponent"""
+        roster_ids, stars, health, damage, _ = self.tables
+        table_round, comp, row = self._offsets(round_number)
+        result = []
+        for i in range(units_for_round(table_round)):
+            x, y = FORMATION[i]
+            slot = row * BOARD_UNITS + i
+            result.append((SAVE_ROSTER[roster_ids[comp * BOARD_UNITS + i]][0], stars[slot], x, y,
+                           health[slot], damage[slot]))
+        return result
+
+    def board(self, round_number):
+        """The round's opponent as a board of Units (unit ids are seeded too)"""
+        from unit import Unit
+        rng = python_rng(self.seed, "pve units", round_number)
+        png_files = get_asset_files()
+        board = [[None] * GameConstants.BOARD_WIDTH for _ in range(GameConstants.BOARD_HEIGHT)]
+        for name, stars, x, y, health, damage in self.units(round_number):
+            _, cost, traits, _, _ = SAVE_ROSTER[ROSTER_IDS[name]]
+            unit = Unit(name, cost, list(traits), health, damage, find_png_name(name, png_files), rng)
+            unit.stars = stars
+            board[y][x] = unit
+        return board
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the PvE opponent tables")
+    parser.add_argument("--round", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--table", action="store_true", help="print every comp's power for every round")
+    parser.add_argument("--library", metavar="FILE", help="field the comps of a comp_finder.py export instead")
+    args = parser.parse_args()
+
+    library = stages = None
+    if args.library:
+        from comp_finder import load_library
+        try:
+            comps = load_library(args.library, min_units=BOARD_UNITS, with_levels=True)
+            if not comps:
+                raise ValueError(f"no comps of {BOARD_UNITS}+ units")
+        except (OSError, ValueError) as e:
+            print(f"Could not load comp library {args.library}: {e}")
+            return 1
+        library = [(name, units) for name, units, _ in comps]
+        stages = library_stages([level for _, _, level in comps])
+    generator = OpponentGenerator(args.seed, library, stages)
+
+    if args.table:
+        comps = len(generator.library)
+        print("round " + "".join(f"{name[:14]:>16}" for name, _ in generator.library))
+        for round_number in range(1, MAX_ROUNDS + 1):
+            row = (round_number - 1) * comps
+            print(f"{round_number:>5} " + "".join(f"{generator.tables[4][row + comp]:>16,}" for comp in range(comps)))
+        return 0
+
+    comp = generator.comp_for_round(args.round)
+    print(f"Round {args.round}: {generator.library[comp][0]} (power {generator.power(args.round):,})")
+    for name, stars, x, y, health, damage in generator.units(args.round):
+        print(f"  {name:<20} {'*' * stars:<3} at ({x}, {y})  {health:>6} HP {damage:>5} DMG")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
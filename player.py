@@ -2,27 +2,146 @@ import random
 from game_constants import GameConstants
 import os
 
+# Champions (name, cost, traits, health, damage) are defined in data/roster.json, see roster.py.
+# Hugo Strange sits in the 3-cost pool until the player picks one of his creations to replace him
+from roster import CHAMPIONS, TIER_IDS, UNIT_ROSTER, HUGO_STRANGE, HUGO_REPLACEMENTS
+from trait_effects import compile_modifiers
+from unit_hooks import dispatch, dispatch_owned
+
+# Shop odds table for each level: [1, 2, 3, 4, 5]-cost units (percentages)
+SHOP_ODDS = {
+    1: [1.00, 0.00, 0.00, 0.00, 0.00],  # Level 1
+    2: [1.00, 0.00, 0.00, 0.00, 0.00],  # Level 2
+    3: [0.75, 0.25, 0.00, 0.00, 0.00],  # Level 3
+    4: [0.55, 0.30, 0.15, 0.00, 0.00],  # Level 4
+    5: [0.45, 0.33, 0.20, 0.02, 0.00],  # Level 5
+    6: [0.30, 0.40, 0.25, 0.05, 0.00],  # Level 6
+    7: [0.19, 0.30, 0.40, 0.10, 0.01],  # Level 7
+    8: [0.17, 0.24, 0.32, 0.24, 0.03],  # Level 8
+    9: [0.15, 0.18, 0.25, 0.30, 0.12],  # Level 9
+    10: [0.05, 0.10, 0.20, 0.40, 0.25]  # Level 10
+}
+
+# Roster entries grouped by cost tier (index 0 = 1-cost), without Hugo Strange
+TIER_ROSTERS = [[CHAMPIONS[i] for i in ids] for ids in TIER_IDS]
+ROSTER_BY_NAME = {entry[0]: entry for entry in UNIT_ROSTER + [HUGO_STRANGE]}
+
+# Economy: XP needed to leave each level 1-9, income and the price of XP
+XP_TO_LEVEL = [2, 2, 6, 10, 20, 36, 48, 76, 84]
+MAX_LEVEL = 10
+STARTING_GOLD = 8
+BASE_INCOME = 5
+MAX_INTEREST = 5        # 1 gold per 10 banked, up to this much
+XP_COST = 4
+XP_PER_PURCHASE = 4
+XP_PER_ROUND = 2
+
+
+def income_for(gold):
+    """Gold earned at the end of a round with this much banked"""
+    return BASE_INCOME + min(gold // 10, MAX_INTEREST)
+
+
+def gain_xp(level, xp, amount, xp_to_level=XP_TO_LEVEL):
+    """(level, xp) after gaining amount XP; level-ups carry overflow XP, level 10 keeps 0 XP"""
+    if level >= MAX_LEVEL:
+        return level, xp
+    xp += amount
+    while level < MAX_LEVEL:
+        xp_needed = xp_to_level[level - 1] if level <= len(xp_to_level) else 100
+        if xp < xp_needed:
+            break
+        xp -= xp_needed
+        level += 1
+        if level == MAX_LEVEL:
+            xp = 0
+    return level, xp
+
+
+# Asset listing and name -> PNG matches, computed once instead of on every shop roll
+_ASSET_FILES = None
+_PNG_NAME_CACHE = {}
+_IMAGES_WARMED = False
+
+
+def shop_tier_pools(hugo_replacement_choice=None):
+    """Roster entries a shop slot picks from, per cost tier (index 0 = 1-cost).
+
+    Hugo Strange is in the 3-cost pool until a replacement is chosen; then only the replacement is.
+    """
+    tier_3 = TIER_ROSTERS[2]
+    if hugo_replacement_choice is None:
+        tier_3 = tier_3 + [HUGO_STRANGE]
+    elif hugo_replacement_choice in HUGO_REPLACEMENTS:
+        tier_3 = tier_3 + [(hugo_replacement_choice,) + HUGO_REPLACEMENTS[hugo_replacement_choice]]
+    return [TIER_ROSTERS[0], TIER_ROSTERS[1], tier_3, TIER_ROSTERS[3], TIER_ROSTERS[4]]
+
+
+def get_asset_files():
+    global _ASSET_FILES
+    if _ASSET_FILES is None:
+        png_dir = "assets"
+        _ASSET_FILES = os.listdir(png_dir) if os.path.exists(png_dir) else []
+    return _ASSET_FILES
+
+
+def find_png_name(name, png_files):
+    """Match a champion name to its asset file (e.g. "Mr. Freeze" -> "Mr._Freeze.png")"""
+    if not png_files:
+        return None
+    if name not in _PNG_NAME_CACHE:
+        png_name = None
+        for file in png_files:
+            file_name = file.replace('.png', '').replace('_', ' ')
+            if name.lower() in file_name.lower() or file_name.lower() in name.lower():
+                png_name = file
+                break
+        _PNG_NAME_CACHE[name] = png_name
+    return _PNG_NAME_CACHE[name]
+
+
+def warm_unit_images():
+    """Load every champion's art once up front, so a unit's first shop appearance doesn't stall on disk"""
+    global _IMAGES_WARMED
+    if _IMAGES_WARMED:
+        return
+    _IMAGES_WARMED = True
+    # Goes through the image cache directly: building throwaway Units would consume RNG draws for their ids
+    from unit import load_unit_image
+    png_files = get_asset_files()
+    for name in [entry[0] for entry in UNIT_ROSTER] + [HUGO_STRANGE[0]] + list(HUGO_REPLACEMENTS):
+        load_unit_image(find_png_name(name, png_files), name)
+
+
 class Player:
-    def __init__(self):
-        self.gold = 8
+    def __init__(self, fill_shop=True, rng=None):
+        self.gold = STARTING_GOLD
         self.level = 1
         self.xp = 0
-        self.xp_to_level = [2, 2, 6, 10, 20, 36, 48, 76, 84]
+        self.xp_to_level = list(XP_TO_LEVEL)
         self.bench = [None] * GameConstants.BENCH_SLOTS
         self.board = [[None for _ in range(GameConstants.BOARD_WIDTH)]
                       for _ in range(GameConstants.BOARD_HEIGHT)]
         self.shop = []
         self.traits = {}
+        # Trait bonuses compiled for the current board, see trait_effects.py
+        self.trait_modifiers = None
         self.refresh_cost = 2
         self.round = 1
         self.hugo_replacement_choice = None   # <--- ADD THIS LINE
-        self.generate_shop()
+        self.hugo_strange_activated = False
+        # Set by the Hugo Strange unit hooks while the player owns him and hasn't picked a replacement
+        self.hugo_choice_pending = False
+        # Shop rolls and unit ids draw from this, never from the global random module (see rng.py)
+        self.rng = rng if rng is not None else random.Random()
+        # Shared UnitPool in multiplayer lobbies (see lobby.py); None means unlimited copies
+        self.pool = None
+        if fill_shop:
+            self.generate_shop()
 
     def calculate_income(self):
         """Calculate gold income for next round"""
-        base_income = 5
-        interest = min(self.gold // 10, 5)  # 1 gold per 10, max 5
-        return base_income + interest
+        return income_for(self.gold)
 
     def end_turn(self):
         """End turn, receive income, and grant 2 XP (with correct level-up behavior up to 10)"""
@@ -31,37 +150,17 @@ class Player:
         self.round += 1
 
         # Give 2 XP per round, but do not exceed level 10
-        if self.level < 10:
-            self.xp += 2
-            while self.level < 10:
-                xp_needed = self.xp_to_level[self.level - 1] if self.level <= len(self.xp_to_level) else 100
-                if self.xp >= xp_needed:
-                    self.xp -= xp_needed
-                    self.level += 1
-                    if self.level == 10:
-                        self.xp = 0  # XP is capped at 10
-                        break
-                else:
-                    break
+        self.level, self.xp = gain_xp(self.level, self.xp, XP_PER_ROUND, self.xp_to_level)
 
         self.generate_shop()  # Free refresh each round
+        dispatch_owned(self, "on_round_start")
         return income
 
     def buy_xp(self):
         """Buy 4 XP for 4 gold (works up to level 10, handles overflow XP)"""
-        if self.gold >= 4 and self.level < 10:
-            self.gold -= 4
-            self.xp += 4
-            while self.level < 10:
-                xp_needed = self.xp_to_level[self.level - 1] if self.level <= len(self.xp_to_level) else 100
-                if self.xp >= xp_needed:
-                    self.xp -= xp_needed
-                    self.level += 1
-                    if self.level == 10:
-                        self.xp = 0  # Cap XP at 0 on max level
-                        break
-                else:
-                    break
+        if self.gold >= XP_COST and self.level < MAX_LEVEL:
+            self.gold -= XP_COST
+            self.level, self.xp = gain_xp(self.level, self.xp, XP_PER_PURCHASE, self.xp_to_level)
             return True
         return False
 
@@ -76,125 +175,20 @@ class Player:
     def generate_shop(self):
         """Generate shop units based on player level"""
         # Use assets directory for PNGs
-        png_dir = "assets"
-        png_files = []
-        if os.path.exists(png_dir):
-            png_files = os.listdir(png_dir)
-
-        # Unit pools by cost tier with updated roster
-        cost_1_units = [
-            self.create_unit("Martian Manhunter", 1, ["Justice League", "Bruiser"], 700, 45, png_files),
-            self.create_unit("Robin", 1, ["Bat Family", "League of Assassins"], 550, 55, png_files),
-            self.create_unit("Batgirl", 1, ["Bat Family", "Duelists"], 500, 60, png_files),
-            self.create_unit("Krypto", 1, ["Animals", "Kryptonians"], 400, 70, png_files),
-            self.create_unit("Killer Croc", 1, ["Suicide Squad", "Bruiser"], 650, 40, png_files),
-            self.create_unit("Heatwave", 1, ["Rogues Gallery", "Bruiser"], 540, 56, png_files),
-            self.create_unit("Constantine", 1, ["Sorcerer", "Justice League Dark"], 580, 80, png_files),
-            self.create_unit("Sinestro", 1, ["Legion of Doom", "Sorcerer"], 640, 76, png_files),
-            self.create_unit("Pied Piper", 1, ["Rogues Gallery", "Snipers"], 440, 60, png_files),
-            self.create_unit("Aquaman", 1, ["Justice League", "Rivals"], 600, 60, png_files),
-            self.create_unit("Blue Beetle", 1, ["Teen Titans", "Robots"], 500, 70, png_files),
-            self.create_unit("Supergirl", 1, ["Kryptonians", "Snipers"], 740, 78, png_files),
-            self.create_unit("Booster Gold", 1, ["Fortune", "Tech"], 500, 70, png_files),
-            self.create_unit("Black Manta", 1, ["Legion of Doom", "Rivals"], 690, 71, png_files),
-        ]
-
-        cost_2_units = [
-            self.create_unit("Catwoman", 2, ["Bat Family", "Fortune"], 600, 70, png_files),
-            self.create_unit("Green Arrow", 2, ["Justice League", "Snipers"], 550, 75, png_files),
-            self.create_unit("Power Girl", 2, ["Kryptonians", "Bruiser"], 750, 65, png_files),
-            self.create_unit("Cheetah", 2, ["Animals", "Legion of Doom"], 650, 72, png_files),
-            self.create_unit("Nightwing", 2, ["Teen Titans", "Fortune"], 620, 68, png_files),
-            self.create_unit("Starfire", 2, ["Teen Titans", "Bruiser"], 580, 74, png_files),
-            self.create_unit("Lex Luthor", 2, ["Legion of Doom", "Bruiser"], 680, 58, png_files),
-            self.create_unit("Ras al Ghul", 2, ["League of Assassins", "Familial Bond"], 590, 66, png_files),
-            self.create_unit("Red Tornado", 2, ["Robots", "Fortune"], 870, 84, png_files),
-            self.create_unit("Zatanna", 2, ["Sorcerer", "Justice League Dark"], 610, 77, png_files),
-            self.create_unit("Amazo", 2, ["Robots", "Duelists"], 940, 83, png_files),
-            self.create_unit("Clayface", 2, ["Monsters", "Bruiser"], 580, 74, png_files),
-            self.create_unit("Captain Boomerang", 2, ["Duelists", "Suicide Squad", "Rogues Gallery"], 450, 65, png_files),
-        ]
-
-        cost_3_units = [
-            self.create_unit("Weather Wizard", 3, ["Bruiser", "Sorcerer", "Rogues Gallery"], 700, 68, png_files),
-            self.create_unit("Beast Boy", 3, ["Animals", "Teen Titans"], 650, 72, png_files),
-            self.create_unit("Batman", 3, ["Justice League", "Bat Family"], 720, 75, png_files),
-            self.create_unit("Green Lantern", 3, ["Justice League", "Sorcerer"], 680, 70, png_files),
-            self.create_unit("Cyborg", 3, ["Teen Titans", "Robots", "Bruiser"], 780, 65, png_files),
-            self.create_unit("Bane", 3, ["Legion of Doom", "Bruiser"], 820, 62, png_files),
-            self.create_unit("Swamp Thing", 3, ["Monsters", "Justice League Dark"], 750, 64, png_files),
-            self.create_unit("Talia al Ghul", 3, ["League of Assassins", "Familial Bond"], 880, 78, png_files),
-            self.create_unit("Zod", 3, ["Kryptonians", "Bruiser"], 750, 75, png_files),
-            self.create_unit("Mirror Master", 3, ["Rogues Gallery", "Snipers"], 460, 62, png_files),
-            self.create_unit("Doomsday", 3, ["Bruiser", "Monsters"], 750, 64, png_files),
-            self.create_unit("Mr. Terrific", 3, ["Tech", "Duelists"], 430, 65, png_files),
-        ]
-
-        # Remove Hugo Strange from the pool unless no replacement chosen yet
-        if self.hugo_replacement_choice is None:
-            cost_3_units.append(self.create_unit("Hugo Strange", 3, ["Mind Games"], 600, 65, png_files))
-        else:
-            # Only show the chosen replacement instead of Hugo
-            # Make sure to use Mind Games trait, cost 3, correct stats for the character
-            hugo_map = {
-                "Mr. Freeze": (3, ["Mind Games"], 720, 52),
-                "Two Face": (3, ["Mind Games"], 520, 78),
-                "Poison Ivy": (3, ["Mind Games"], 480, 76),
-            }
-            if self.hugo_replacement_choice in hugo_map:
-                cost, traits, health, damage = hugo_map[self.hugo_replacement_choice]
-                cost_3_units.append(
-                    self.create_unit(self.hugo_replacement_choice, cost, traits, health, damage, png_files))
-
-        cost_4_units = [
-            self.create_unit("Superman", 4, ["Justice League", "Kryptonians"], 1000, 80, png_files),
-            self.create_unit("Wonder Woman", 4, ["Justice League", "Bruiser"], 950, 82, png_files),
-            self.create_unit("Gorilla Grodd", 4, ["Animals", "Bruiser"], 1100, 70, png_files),
-            self.create_unit("Deathstroke", 4, ["League of Assassins", "Duelists"], 920, 85, png_files),
-            self.create_unit("Metallo", 4, ["Robots", "Bruiser"], 850, 88, png_files),
-            self.create_unit("Brainiac", 4, ["Robots", "Sorcerer"], 950, 92, png_files),
-            self.create_unit("Raven", 4, ["Teen Titans", "Sorcerer"], 660, 74, png_files),
-            self.create_unit("Deadshot", 4, ["Suicide Squad", "Snipers"], 470, 68, png_files),
-            self.create_unit("Trickster", 4, ["Rogues Gallery", "Tech"], 430, 65, png_files),
-            self.create_unit("Harley Quinn", 4, ["Suicide Squad", "Mad Love"], 560, 70, png_files),
-            self.create_unit("Zoom", 4, ["Duelists", "Fortune"], 880, 98, png_files),
-            self.create_unit("Detective Chimp", 4, ["Animals", "Justice League Dark"], 700, 70, png_files),
-            self.create_unit("Abra Kadabra", 4, ["Tech", "Fortune"], 500, 70, png_files),
-
-        ]
-
-        cost_5_units = [
-            self.create_unit("Flash", 5, ["Justice League", "Fastest Man Alive"], 900, 95, png_files),
-            self.create_unit("Dr. Fate", 5, ["Nabu's Chosen", "Sorcerer"], 850, 90, png_files),
-            self.create_unit("Red Hood", 5, ["Bat Family", "Snipers"], 920, 88, png_files),
-            self.create_unit("Solomon Grundy", 5, ["Resurrection", "Legion of Doom", "Monsters"], 1300, 75, png_files),
-            self.create_unit("King Shark", 5, ["Animals", "Lurking In The Waters"], 1250, 80, png_files),
-            self.create_unit("Darkseid", 5, ["Threat"], 1400, 85, png_files),
-            self.create_unit("The Question", 5, ["I Have A Question"], 800, 95, png_files),
-            self.create_unit("Captain Cold", 5, ["Lets Put You On Ice", "Rogues Gallery"], 520, 58, png_files),
-            self.create_unit("Joker", 5, ["Clown Prince of Crime", "Mad Love"], 560, 70, png_files),
-        ]
-
-        # Shop odds table for each level: [1, 2, 3, 4, 5]-cost units (percentages)
-        shop_odds = {
-            1: [1.00, 0.00, 0.00, 0.00, 0.00],  # Level 1
-            2: [1.00, 0.00, 0.00, 0.00, 0.00],  # Level 2
-            3: [0.75, 0.25, 0.00, 0.00, 0.00],  # Level 3
-            4: [0.55, 0.30, 0.15, 0.00, 0.00],  # Level 4
-            5: [0.45, 0.33, 0.20, 0.02, 0.00],  # Level 5
-            6: [0.30, 0.40, 0.25, 0.05, 0.00],  # Level 6
-            7: [0.19, 0.30, 0.40, 0.10, 0.01],  # Level 7
-            8: [0.17, 0.24, 0.32, 0.24, 0.03],  # Level 8
-            9: [0.15, 0.18, 0.25, 0.30, 0.12],  # Level 9
-            10: [0.05, 0.10, 0.20, 0.40, 0.25]  # Level 10
-        }
-        unit_pools = [cost_1_units, cost_2_units, cost_3_units, cost_4_units, cost_5_units]
+        png_files = get_asset_files()
+        warm_unit_images()
+
+        unit_pools = shop_tier_pools(self.hugo_replacement_choice)
+
+        if self.pool is not None:
+            # Unbought shop units go back into the shared pool before the reroll
+            self.pool.give_back_all(self.shop)
 
         shop_units = []
         for _ in range(GameConstants.SHOP_SLOTS):
-            roll = random.random()
+            roll = self.rng.random()
             level = max(1, min(self.level, 10))
-            odds = shop_odds[level]
+            odds = SHOP_ODDS[level]
             cumulative = 0.0
             for idx, chance in enumerate(odds):
                 cumulative += chance
@@ -202,20 +196,33 @@ class Player:
                     pool = unit_pools[idx]
                     break
             else:
+                idx = 0
                 pool = unit_pools[0]  # fallback, should never hit
-            shop_units.append(random.choice(pool))
+            if self.pool is not None:
+                entry = self.draw_from_shared_pool(idx)
+                if entry is None:
+                    shop_units.append(None)
+                    continue
+            else:
+                entry = self.rng.choice(pool)
+            # Only the five offered units are built, not the whole roster
+            name, cost, traits, health, damage = entry
+            shop_units.append(self.create_unit(name, cost, list(traits), health, damage, png_files))
         self.shop = shop_units
 
+    def draw_from_shared_pool(self, tier_index):
+        """Take one copy from the shared pool, falling back to cheaper tiers when a tier is sold out"""
+        for idx in range(tier_index, -1, -1):
+            name = self.pool.draw(idx, self.rng)
+            if name is not None:
+                if name == HUGO_STRANGE[0] and self.hugo_replacement_choice in HUGO_REPLACEMENTS:
+                    return (self.hugo_replacement_choice,) + HUGO_REPLACEMENTS[self.hugo_replacement_choice]
+                return ROSTER_BY_NAME[name]
+        return None
+
     def create_unit(self, name, cost, traits, health, damage, png_files):
         from unit import Unit
-        png_name = None
-        for file in png_files:
-            file_name = file.replace('.png', '').replace('_', ' ')
-            if name.lower() in file_name.lower() or file_name.lower() in name.lower():
-                png_name = file
-                break
-
-        return Unit(name, cost, traits, health, damage, png_name)
+        return Unit(name, cost, traits, health, damage, find_png_name(name, png_files), self.rng)
 
     def buy_unit(self, shop_index):
         """Buy unit from shop"""
@@ -235,6 +242,7 @@ class Player:
                         self.bench[i] = new_unit
                         self.gold -= unit.cost
                         self.shop[shop_index] = None
+                        dispatch(self, "on_buy", new_unit)
                         self.check_combinations()
                         return True
         return False
@@ -256,6 +264,9 @@ class Player:
 
             self.gold += sell_value
             self.bench[bench_index] = None
+            if self.pool is not None:
+                self.pool.give_back(unit)
+            dispatch(self, "on_remove", unit)
             return True
         return False
 
@@ -279,7 +290,10 @@ class Player:
 
             self.gold += sell_value
             self.board[y][x] = None
+            if self.pool is not None:
+                self.pool.give_back(unit)
             self.calculate_traits()
+            dispatch(self, "on_remove", unit)
             return True
         return False
 
@@ -294,6 +308,7 @@ class Player:
                 self.board[board_y][board_x] = self.bench[bench_index]
                 self.bench[bench_index] = None
                 self.calculate_traits()
+                dispatch(self, "on_place", self.board[board_y][board_x])
                 self.check_combinations()  # <--- ADD THIS LINE
                 return True
         return False
@@ -306,10 +321,72 @@ class Player:
             self.bench[bench_index] = self.board[board_y][board_x]
             self.board[board_y][board_x] = None
             self.calculate_traits()
+            dispatch(self, "on_remove", self.bench[bench_index])
             self.check_combinations()  # <--- ADD THIS LINE
             return True
         return False
 
+    def swap_bench_and_board(self, bench_index, board_x, board_y):
+        """Swap a bench unit with the unit occupying a board slot"""
+        if (0 <= bench_index < len(self.bench) and self.bench[bench_index] and
+                0 <= board_x < GameConstants.BOARD_WIDTH and
+                0 <= board_y < GameConstants.BOARD_HEIGHT and
+                self.board[board_y][board_x] is not None):
+            self.bench[bench_index], self.board[board_y][board_x] = self.board[board_y][board_x], self.bench[bench_index]
+            self.calculate_traits()
+            dispatch(self, "on_remove", self.bench[bench_index])
+            dispatch(self, "on_place", self.board[board_y][board_x])
+            return True
+        return False
+
+    def swap_board_units(self, from_x, from_y, to_x, to_y):
+        """Move a board unit to another board slot, swapping with whatever is there"""
+        if (0 <= from_x < GameConstants.BOARD_WIDTH and 0 <= from_y < GameConstants.BOARD_HEIGHT and
+                0 <= to_x < GameConstants.BOARD_WIDTH and 0 <= to_y < GameConstants.BOARD_HEIGHT and
+                self.board[from_y][from_x] is not None):
+            self.board[to_y][to_x], self.board[from_y][from_x] = self.board[from_y][from_x], self.board[to_y][to_x]
+            self.calculate_traits()
+            return True
+        return False
+
+    def swap_bench_units(self, from_index, to_index):
+        """Move a bench unit to another bench slot, swapping with whatever is there"""
+        if 0 <= from_index < len(self.bench) and 0 <= to_index < len(self.bench) and self.bench[from_index]:
+            self.bench[to_index], self.bench[from_index] = self.bench[from_index], self.bench[to_index]
+            return True
+        return False
+
+    def choose_hugo_replacement(self, replacement_name):
+        """Turn every Hugo Strange into the chosen creation; future shops offer the replacement instead.
+
+        Only allowed while a choice is pending: the player owns Hugo and hasn't chosen yet.
+        """
+        if replacement_name not in HUGO_REPLACEMENTS or not self.hugo_choice_pending:
+            return False
+        cost, traits, _, _ = HUGO_REPLACEMENTS[replacement_name]
+        png_files = get_asset_files()
+
+        def replace(old_unit):
+            # Keeps Hugo's (possibly starred-up) stats, only the identity changes
+            new_unit = self.create_unit(replacement_name, cost, list(traits), old_unit.health, old_unit.damage,
+                                        png_files)
+            new_unit.stars = old_unit.stars
+            return new_unit
+
+        for y in range(GameConstants.BOARD_HEIGHT):
+            for x in range(GameConstants.BOARD_WIDTH):
+                if self.board[y][x] and self.board[y][x].name == "Hugo Strange":
+                    self.board[y][x] = replace(self.board[y][x])
+        for i in range(len(self.bench)):
+            if self.bench[i] and self.bench[i].name == "Hugo Strange":
+                self.bench[i] = replace(self.bench[i])
+
+        self.hugo_strange_activated = True
+        self.hugo_choice_pending = False
+        self.hugo_replacement_choice = replacement_name
+        self.calculate_traits()
+        return True
+
     def check_combinations(self):
         """
         Combine units so that the new unit appears in the board slot if any combining units are on the board,
@@ -385,6 +462,10 @@ class Player:
                         base_unit.damage = int(base_unit.damage * 1.5)
 
                     self.calculate_traits()
+                    for i, (_, unit) in enumerate(found):
+                        if i != base_index:
+                            dispatch(self, "on_remove", unit)
+                    dispatch(self, "on_combine", base_unit)
                     did_combine = True
                     break  # Start over for chain combining
 
@@ -405,6 +486,7 @@ class Player:
                             trait_counts[trait] = trait_counts.get(trait, 0) + 1
 
         self.traits = trait_counts
+        self.trait_modifiers = compile_modifiers(self.board, trait_counts)
 
     def can_combine_anywhere(self, unit_to_check):
         if not unit_to_check:
@@ -437,6 +519,7 @@ class Player:
                         self.bench[i] = new_unit
                         self.gold -= unit.cost
                         self.shop[shop_index] = None
+                        dispatch(self, "on_buy", new_unit)
                         # CRITICAL: call the same combination checker as everywhere else
                         self.check_combinations()
                         return True
@@ -0,0 +1,69 @@
+# quality_governor.py - steps render quality down/up to keep frame time inside the budget
+from collections import deque
+
+# Each tier keeps everything the previous one dropped. render_scale caps DisplayManager's own
+# render scale; panel_interval is how many frames the non-interactive panels are reused for.
+QUALITY_TIERS = [
+    {"name": "High", "text_outlines": True, "smooth_scaling": True, "render_scale": 1.0, "panel_interval": 1},
+    {"name": "Medium", "text_outlines": False, "smooth_scaling": True, "render_scale": 1.0, "panel_interval": 1},
+    {"name": "Low", "text_outlines": False, "smooth_scaling": False, "render_scale": 1.0, "panel_interval": 1},
+    {"name": "Very Low", "text_outlines": False, "smooth_scaling": False, "render_scale": 0.75, "panel_interval": 1},
+    {"name": "Minimum", "text_outlines": False, "smooth_scaling": False, "render_scale": 0.75, "panel_interval": 6},
+]
+
+
+class QualityGovernor:
+    # Step down when the rolling average is over budget, step up only with plenty of headroom
+    STEP_DOWN_RATIO = 1.05
+    STEP_UP_RATIO = 0.6
+
+    def __init__(self, target_fps=60, tier=0, dynamic=True, window=60):
+        self.target_fps = target_fps
+        self.budget_ms = 1000.0 / target_fps
+        self.tier = max(0, min(tier, len(QUALITY_TIERS) - 1))
+        self.dynamic = dynamic
+        self.frame_times = deque(maxlen=window)
+        # Frames to wait after a change before judging again, so one tier gets a fair trial
+        self.cooldown = 0
+
+    @property
+    def settings(self):
+        return QUALITY_TIERS[self.tier]
+
+    def average_frame_ms(self):
+        if not self.frame_times:
+            return 0.0
+        return sum(self.frame_times) / len(self.frame_times)
+
+    def set_tier(self, tier):
+        tier = max(0, min(tier, len(QUALITY_TIERS) - 1))
+        if tier == self.tier:
+            return False
+        self.tier = tier
+        self.frame_times.clear()
+        self.cooldown = self.frame_times.maxlen
+        return True
+
+    def record_frame(self, frame_ms):
+        """Add the time spent on one frame (excluding the frame-cap sleep).
+
+        Returns True when the tier changed and the caller should apply the new settings.
+        """
+        self.frame_times.append(frame_ms)
+        if not self.dynamic:
+            return False
+        if self.cooldown > 0:
+            self.cooldown -= 1
+            return False
+        if len(self.frame_times) < self.frame_times.maxlen:
+            return False
+
+        average = self.average_frame_ms()
+        if average > self.budget_ms * self.STEP_DOWN_RATIO and self.tier < len(QUALITY_TIERS) - 1:
+            return self.set_tier(self.tier + 1)
+        if average < self.budget_ms * self.STEP_UP_RATIO and self.tier > 0:
+            # Stepping up costs more time per frame, so wait twice as long before the next judgement
+            changed = self.set_tier(self.tier - 1)
+            self.cooldown *= 2
+            return changed
+        return False
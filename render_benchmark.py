@@ -0,0 +1,221 @@
+# render_benchmark.py - headless frame-time benchmark for the draw path
+#
+# Usage:
+#   python render_benchmark.py                    # run and compare against the saved baseline
+#   python render_benchmark.py --save-baseline    # run and store the results as the new baseline
+#   python render_benchmark.py --frames 300 --scenes full_board active_drag
+import os
+
+# Must be set before pygame is imported anywhere
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import random
+import sys
+import time
+
+import pygame
+
+from benchmark_utils import BASELINE_DIR, summarize_frame_times, load_baseline, save_baseline, fill_board_and_bench
+from dc_auto_battler import (draw_main_menu, draw_single_player_game, draw_hugo_strange_choice)
+from display_manager import DisplayManager
+from game_constants import GameConstants, DragState
+from player import Player
+from ui_elements import Button
+
+DEFAULT_BASELINE = os.path.join(BASELINE_DIR, "render_baseline.json")
+SCENES = ["main_menu", "empty_board", "full_board", "active_drag", "trait_tooltip", "hugo_overlay"]
+
+
+def build_ui(screen_width, screen_height):
+    """Create the fonts and buttons the same way main() does for this resolution"""
+    base_size = screen_height / 15
+    fonts = {
+        'title': pygame.font.SysFont('arial', int(base_size * 1.6), bold=True),
+        'button': pygame.font.SysFont('arial', int(base_size * 0.8))
+    }
+    menu_font = pygame.font.SysFont('arial', int(base_size * 0.6))
+    center_x, center_y = screen_width // 2, screen_height // 2
+
+    main_menu_buttons = [
+        Button(center_x - 100, center_y - 50, 200, 60, "PLAY", menu_font),
+        Button(center_x - 100, center_y + 30, 200, 60, "OPTIONS", menu_font),
+        Button(center_x - 100, center_y + 110, 200, 60, "QUIT", menu_font),
+    ]
+    back_button = Button(30, 30, 80, 30, "BACK", menu_font)
+    end_turn_button = Button(screen_width // 2 - 50, 15, 100, 30, "End Turn", menu_font)
+
+    return {
+        "fonts": fonts,
+        "main_menu_buttons": main_menu_buttons,
+        "game_buttons": [end_turn_button, back_button],
+        "hugo_choices": ["Mr. Freeze", "Poison Ivy", "Two Face"],
+        "hugo_buttons": [],
+    }
+
+
+def build_players():
+    """Fixed-seed players: an empty one (fresh game) and one with a full board and bench"""
+    rng = random.Random(2024)
+    empty_player = Player(rng=rng)
+    full_player = fill_board_and_bench(Player(rng=rng))
+    opponent = Player(rng=rng)
+    opponent.board = [[None for _ in range(GameConstants.BOARD_WIDTH)] for _ in range(GameConstants.BOARD_HEIGHT)]
+    return empty_player, full_player, opponent
+
+
+def render_scene(scene, frame, screen, ui, players, screen_width, screen_height):
+    """Draw one frame of a scripted scene"""
+    empty_player, full_player, opponent = players
+    fonts = ui["fonts"]
+    idle_mouse = (screen_width // 2, 5)
+
+    if scene == "main_menu":
+        draw_main_menu(screen, ui["main_menu_buttons"], idle_mouse, fonts, screen_width, screen_height)
+    elif scene == "empty_board":
+        draw_single_player_game(screen, empty_player, opponent, ui["game_buttons"], idle_mouse, fonts,
+                                screen_width, screen_height, DragState.NONE, None, (0, 0), None)
+    elif scene == "full_board":
+        draw_single_player_game(screen, full_player, opponent, ui["game_buttons"], idle_mouse, fonts,
+                                screen_width, screen_height, DragState.NONE, None, (0, 0), None)
+    elif scene == "active_drag":
+        # Sweep the dragged unit across the board so highlights change from frame to frame
+        drag_pos = (200 + (frame * 17) % max(1, screen_width - 400), screen_height // 2)
+        draw_single_player_game(screen, full_player, opponent, ui["game_buttons"], drag_pos, fonts,
+                                screen_width, screen_height, DragState.FROM_BENCH, full_player.bench[0],
+                                drag_pos, 'bench')
+    elif scene == "trait_tooltip":
+        # First row of the traits panel (see draw_traits_panel)
+        trait_pos = (60, 180 + 50 + 10)
+        draw_single_player_game(screen, full_player, opponent, ui["game_buttons"], trait_pos, fonts,
+                                screen_width, screen_height, DragState.NONE, None, (0, 0), None)
+    elif scene == "hugo_overlay":
+        draw_single_player_game(screen, full_player, opponent, ui["game_buttons"], idle_mouse, fonts,
+                                screen_width, screen_height, DragState.NONE, None, (0, 0), None)
+        draw_hugo_strange_choice(screen, ui["hugo_choices"], ui["hugo_buttons"], idle_mouse,
+                                 screen_width, screen_height)
+    else:
+        raise ValueError(f"Unknown scene: {scene}")
+
+
+def run_benchmark(resolutions, scenes, frames, warmup, render_scale=1.0):
+    results = {}
+    players = None
+    for res in resolutions:
+        window = pygame.display.set_mode(res["size"])
+        screen_width, screen_height = DisplayManager.scaled_resolution(res["size"], render_scale)
+        if (screen_width, screen_height) == res["size"]:
+            screen = window
+        else:
+            screen = pygame.Surface((screen_width, screen_height)).convert()
+
+        def present():
+            # Same presentation as DisplayManager.present()
+            if screen is not window:
+                pygame.transform.scale(screen, window.get_size(), window)
+            pygame.display.flip()
+
+        if players is None:
+            # Units load their PNGs with convert_alpha(), which needs a display mode first
+            players = build_players()
+        ui = build_ui(screen_width, screen_height)
+
+        res_key = f"{res['size'][0]}x{res['size'][1]}"
+        results[res_key] = {}
+        for scene in scenes:
+            for frame in range(warmup):
+                render_scene(scene, frame, screen, ui, players, screen_width, screen_height)
+                present()
+
+            samples = []
+            for frame in range(frames):
+                start = time.perf_counter()
+                render_scene(scene, frame, screen, ui, players, screen_width, screen_height)
+                present()
+                samples.append((time.perf_counter() - start) * 1000.0)
+
+            stats = summarize_frame_times(samples)
+            results[res_key][scene] = stats
+            print(f"{res_key:>10} {scene:<14} p50 {stats['p50_ms']:8.3f} ms  "
+                  f"p95 {stats['p95_ms']:8.3f} ms  p99 {stats['p99_ms']:8.3f} ms")
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Print the p95 delta for every scene; return the list of regressions"""
+    regressions = []
+    base_results = baseline.get("results", {})
+    for res_key, scenes in results.items():
+        for scene, stats in scenes.items():
+            base = base_results.get(res_key, {}).get(scene)
+            if not base or not base.get("p95_ms"):
+                continue
+            ratio = stats["p95_ms"] / base["p95_ms"]
+            marker = ""
+            if ratio > 1.0 + tolerance:
+                marker = "  <-- REGRESSION"
+                regressions.append((res_key, scene, base["p95_ms"], stats["p95_ms"]))
+            print(f"{res_key:>10} {scene:<14} p95 {base['p95_ms']:8.3f} -> {stats['p95_ms']:8.3f} ms "
+                  f"({(ratio - 1.0) * 100:+.1f}%){marker}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless render benchmark for DC Auto Battler")
+    parser.add_argument("--frames", type=int, default=120, help="measured frames per scene")
+    parser.add_argument("--warmup", type=int, default=10, help="unmeasured frames per scene")
+    parser.add_argument("--scenes", nargs="+", choices=SCENES, default=SCENES)
+    parser.add_argument("--resolutions", nargs="+", help="subset like 1920x1080 2560x1440")
+    parser.add_argument("--render-scale", type=float, default=1.0, choices=DisplayManager.render_scales,
+                        help="draw into a smaller surface and scale it to the window, like the game option")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="overwrite the baseline with this run")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="allowed p95 slowdown before a scene counts as a regression (0.15 = 15%%)")
+    args = parser.parse_args()
+
+    pygame.init()
+    resolutions = DisplayManager.resolutions
+    if args.resolutions:
+        resolutions = [r for r in resolutions if f"{r['size'][0]}x{r['size'][1]}" in args.resolutions]
+        if not resolutions:
+            parser.error("none of the requested resolutions are in DisplayManager.resolutions")
+
+    results = run_benchmark(resolutions, args.scenes, args.frames, args.warmup, args.render_scale)
+    report = {
+        "meta": {
+            "pygame": pygame.version.ver,
+            "python": sys.version.split()[0],
+            "frames": args.frames,
+            "render_scale": args.render_scale,
+        },
+        "results": results,
+    }
+
+    if args.save_baseline:
+        save_baseline(args.baseline, report)
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+    # Frame times at different render scales aren't comparable; baselines from before the option drew at 1.0
+    base_scale = baseline.get("meta", {}).get("render_scale", 1.0)
+    if base_scale != args.render_scale:
+        print(f"Baseline {args.baseline} was saved at render scale {base_scale}; "
+              f"rerun with --render-scale {base_scale} or save a baseline at {args.render_scale}.")
+        return 1
+
+    print("\nComparison against baseline (p95):")
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} scene(s) regressed by more than {args.tolerance * 100:.0f}%")
+        return 1
+    print("\nNo render regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
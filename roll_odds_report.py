@@ -0,0 +1,235 @@
+# roll_odds_report.py - simulate millions of shops per level and report what players actually see
+#
+# Usage:
+#   python roll_odds_report.py --shops 2000000 --workers 8 --json roll_odds.json --text roll_odds.txt
+#
+# For every level in SHOP_ODDS, shops are rolled the way Player.generate_shop rolls them
+# (tier from the level's odds, then a champion uniformly from that tier's pool), using the
+# same shop_tier_pools(), so roster changes show up here straight away. Shops are simulated
+# in fixed-size NumPy batches spread over worker processes and only per-champion counts are
+# kept, so memory stays flat however many shops are rolled.
+#
+# Reported per level and champion: appearance rate per shop slot, the rate the odds imply
+# and the deviation (z-score), expected rerolls to see it at all, and expected gold spent
+# on rerolls and copies to reach 2 and 3 stars. The gold figures assume a solo shop (no
+# shared pool), every shop is a paid reroll and every copy seen is bought.
+import argparse
+import json
+import math
+import multiprocessing
+import sys
+import time
+
+import numpy as np
+
+from game_constants import GameConstants
+from player import SHOP_ODDS, shop_tier_pools
+from rng import derive_seed
+from roster import HUGO_REPLACEMENTS
+
+REFRESH_COST = 2
+# Copies a 2-star and a 3-star champion are made of
+COPIES_FOR_STARS = {2: 3, 3: 9}
+SHOPS_PER_JOB = 250_000
+# Shops per vectorised batch: keeps the (shops x champions) count matrix small
+BATCH_SHOPS = 20_000
+MAX_COPIES = GameConstants.SHOP_SLOTS
+
+
+class ShopModel:
+    """Everything a worker needs to roll shops: champion order, tier offsets and odds thresholds"""
+
+    def __init__(self, hugo_choice=None):
+        if hugo_choice is not None and hugo_choice not in HUGO_REPLACEMENTS:
+            raise ValueError(f"unknown Hugo Strange replacement {hugo_choice!r}")
+        pools = shop_tier_pools(hugo_choice)
+        self.entries = [entry for pool in pools for entry in pool]
+        self.names = [entry[0] for entry in self.entries]
+        self.costs = [entry[1] for entry in self.entries]
+        self.tier_sizes = np.array([len(pool) for pool in pools], dtype=np.int64)
+        self.tier_offsets = np.concatenate(([0], np.cumsum(self.tier_sizes)[:-1])).astype(np.int64)
+        self.tier_of = np.repeat(np.arange(len(pools)), self.tier_sizes)
+
+    @staticmethod
+    def thresholds(level):
+        """Running sums of the level's odds, added up in the same order generate_shop does"""
+        cumulative, result = 0.0, []
+        for chance in SHOP_ODDS[level]:
+            cumulative += chance
+            result.append(cumulative)
+        return np.array(result)
+
+    def expected_rates(self, level):
+        """Chance per shop slot of each champion implied by the odds (with generate_shop's tier-0 fallback)"""
+        odds = np.diff(np.concatenate(([0.0], self.thresholds(level))))
+        odds[0] += max(0.0, 1.0 - self.thresholds(level)[-1])
+        return odds[self.tier_of] / self.tier_sizes[self.tier_of]
+
+    def roll(self, rng, level, shops):
+        """Champion indices of `shops` shops, shape (shops, SHOP_SLOTS)"""
+        tiers = np.searchsorted(self.thresholds(level), rng.random((shops, MAX_COPIES)), side="right")
+        # generate_shop's for/else: a roll past the last running sum lands in tier 0
+        tiers[tiers == len(self.tier_sizes)] = 0
+        picks = (rng.random((shops, MAX_COPIES)) * self.tier_sizes[tiers]).astype(np.int64)
+        return self.tier_offsets[tiers] + picks
+
+
+def simulate_job(job):
+    """Roll one job's shops for one level; returns (level, shops, champion counts, copies-per-shop histogram)"""
+    level, shops, seed, index, hugo_choice = job
+    model = ShopModel(hugo_choice)
+    rng = np.random.default_rng(derive_seed(seed, "shops", level, index))
+    units = len(model.names)
+    counts = np.zeros(units, dtype=np.int64)
+    copies_hist = np.zeros(units * (MAX_COPIES + 1), dtype=np.int64)
+    hist_offsets = np.arange(units) * (MAX_COPIES + 1)
+    done = 0
+    while done < shops:
+        batch = min(BATCH_SHOPS, shops - done)
+        picks = model.roll(rng, level, batch)
+        # Copies of every champion in every shop of the batch
+        per_shop = np.bincount((picks + (np.arange(batch) * units)[:, None]).ravel(),
+                               minlength=batch * units).reshape(batch, units)
+        counts += per_shop.sum(axis=0)
+        copies_hist += np.bincount((per_shop + hist_offsets).ravel(), minlength=units * (MAX_COPIES + 1))
+        done += batch
+    return level, shops, counts, copies_hist.reshape(units, MAX_COPIES + 1)
+
+
+def expected_shops(copies_distribution, needed):
+    """Expected shops until `needed` copies have shown up, given P(k copies in one shop)"""
+    p0 = copies_distribution[0]
+    if p0 >= 1.0:
+        return math.inf
+    expected = [0.0] * (needed + 1)
+    for n in range(1, needed + 1):
+        total = 1.0
+        for k in range(1, len(copies_distribution)):
+            total += copies_distribution[k] * expected[max(0, n - k)]
+        expected[n] = total / (1.0 - p0)
+    return expected[needed]
+
+
+def run_simulation(shops, seed, workers, hugo_choice=None):
+    """Per level: (shops, counts, copies histogram), summed over every job as results stream in"""
+    jobs = []
+    for level in SHOP_ODDS:
+        for index in range(math.ceil(shops / SHOPS_PER_JOB)):
+            jobs.append((level, min(SHOPS_PER_JOB, shops - index * SHOPS_PER_JOB), seed, index, hugo_choice))
+
+    totals = {}
+
+    def add(result):
+        level, job_shops, counts, hist = result
+        if level in totals:
+            total_shops, total_counts, total_hist = totals[level]
+            totals[level] = (total_shops + job_shops, total_counts + counts, total_hist + hist)
+        else:
+            totals[level] = (job_shops, counts, hist)
+
+    if workers <= 1:
+        for job in jobs:
+            add(simulate_job(job))
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            for result in pool.imap_unordered(simulate_job, jobs):
+                add(result)
+    return totals
+
+
+def build_report(model, totals):
+    report = {}
+    for level in sorted(totals):
+        shops, counts, hist = totals[level]
+        slots = shops * MAX_COPIES
+        expected = model.expected_rates(level)
+        observed_tiers = np.bincount(model.tier_of, weights=counts, minlength=len(model.tier_sizes)) / slots
+        tiers = []
+        for tier, chance in enumerate(SHOP_ODDS[level]):
+            tiers.append({"cost": tier + 1, "configured": chance, "observed": round(float(observed_tiers[tier]), 6),
+                          "deviation": round(float(observed_tiers[tier] - chance), 6)})
+        units = []
+        for i, name in enumerate(model.names):
+            rate = counts[i] / slots
+            p = expected[i]
+            z = (rate - p) / math.sqrt(p * (1 - p) / slots) if 0 < p < 1 else 0.0
+            distribution = hist[i] / shops
+            row = {
+                "name": name,
+                "cost": model.costs[i],
+                "rate": round(float(rate), 7),
+                "expected_rate": round(float(p), 7),
+                "deviation_pct": round(float((rate - p) / p * 100), 3) if p > 0 else None,
+                "z": round(float(z), 2),
+                "rolls_to_find": None,
+            }
+            for stars, copies in COPIES_FOR_STARS.items():
+                row[f"gold_to_{stars}_star"] = None
+            if distribution[0] < 1.0:
+                row["rolls_to_find"] = round(expected_shops(distribution, 1), 2)
+                for stars, copies in COPIES_FOR_STARS.items():
+                    rolls = expected_shops(distribution, copies)
+                    row[f"gold_to_{stars}_star"] = round(rolls * REFRESH_COST + copies * model.costs[i], 1)
+            units.append(row)
+        report[level] = {"shops": shops, "tiers": tiers, "units": units,
+                         "max_abs_z": max(abs(u["z"]) for u in units)}
+    return report
+
+
+def format_report(report):
+    def number(value, spec):
+        return format(value, spec) if value is not None else "-".rjust(len(format(0, spec)))
+
+    lines = []
+    for level, data in report.items():
+        lines.append(f"Level {level}: {data['shops']:,} shops, largest |z| {data['max_abs_z']:.2f}")
+        lines.append("  cost  configured  observed  deviation")
+        for tier in data["tiers"]:
+            lines.append(f"  {tier['cost']:>4}  {tier['configured'] * 100:>9.2f}%  {tier['observed'] * 100:>7.3f}%"
+                         f"  {tier['deviation'] * 100:>+8.3f}%")
+        lines.append(f"  {'champion':<22}{'cost':>5}{'rate':>9}{'odds':>9}{'z':>7}{'rolls':>9}"
+                     f"{'gold 2*':>10}{'gold 3*':>10}")
+        for unit in data["units"]:
+            if unit["expected_rate"] == 0 and unit["rate"] == 0:
+                continue
+            lines.append(f"  {unit['name']:<22}{unit['cost']:>5}{unit['rate'] * 100:>8.3f}%"
+                         f"{unit['expected_rate'] * 100:>8.3f}%{unit['z']:>7.2f}"
+                         f"{number(unit['rolls_to_find'], '9.1f')}{number(unit['gold_to_2_star'], '10.0f')}"
+                         f"{number(unit['gold_to_3_star'], '10.0f')}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Roll-odds balance report over simulated shops")
+    parser.add_argument("--shops", type=int, default=1_000_000, help="shops to simulate per level")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--hugo-choice", choices=list(HUGO_REPLACEMENTS), help="simulate the 3-cost pool after Hugo Strange was replaced by this")
+    parser.add_argument("--json", default="roll_odds.json", help="where to write the JSON report")
+    parser.add_argument("--text", help="also write the text report here (it is printed either way)")
+    args = parser.parse_args()
+
+    model = ShopModel(args.hugo_choice)
+    start = time.perf_counter()
+    totals = run_simulation(args.shops, args.seed, args.workers, args.hugo_choice)
+    elapsed = time.perf_counter() - start
+    report = build_report(model, totals)
+
+    text = format_report(report)
+    print(text)
+    total_shops = sum(data["shops"] for data in report.values())
+    print(f"{total_shops:,} shops in {elapsed:.1f} s ({total_shops / elapsed:,.0f} shops/s, {args.workers} worker(s))")
+    with open(args.json, 'w') as f:
+        json.dump({"seed": args.seed, "shops_per_level": args.shops, "hugo_choice": args.hugo_choice,
+                   "levels": report}, f, indent=4)
+    print(f"Wrote {args.json}")
+    if args.text:
+        with open(args.text, 'w') as f:
+            f.write(text + "\n")
+        print(f"Wrote {args.text}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+# rolldown.py - exact odds of hitting a champion when rolling down
+#
+#   rolldown_odds("Batman", level=7, gold=30)                        # solo shop
+#   rolldown_odds("Batman", level=7, gold=30, owned=3, pool=pool)    # lobby shop, finite UnitPool
+#
+# The roll-down is a Markov chain over (gold, copies owned[, copies left in the pool]): pay
+# the reroll, see k copies in the new shop with the exact per-shop probability, buy all you
+# can afford, repeat until out of gold or at 3 stars. Results are memoized per (level,
+# champion tier, cost, rest of the tier), so every query at a level reuses the states
+# earlier queries solved - hovering shop cards costs a dictionary lookup after the first.
+import sys
+from math import comb
+
+from game_constants import GameConstants
+from lobby import COPIES_PER_STAR
+from player import SHOP_ODDS, shop_tier_pools
+
+GOAL = COPIES_PER_STAR[3]
+REFRESH_COST = 2
+
+# Models solved most recently last; pool models are keyed by the rest of the tier, which
+# changes with every purchase in the lobby, so the oldest are dropped past MODEL_CACHE_SIZE
+MODEL_CACHE_SIZE = 64
+_MODELS = {}
+
+
+def tier_chances(level):
+    """Chance a shop slot rolls each tier; rolls past the last running sum land in tier 0, as in generate_shop"""
+    cumulative = 0.0
+    chances = []
+    for chance in SHOP_ODDS[max(1, min(level, 10))]:
+        chances.append(chance)
+        cumulative += chance
+    chances[0] += max(0.0, 1.0 - cumulative)
+    return chances
+
+
+def binomial(n, p):
+    return [comb(n, k) * p ** k * (1 - p) ** (n - k) for k in range(n + 1)]
+
+
+class RolldownModel:
+    """One (level, tier, cost, rest of tier) chain; solve() is memoized across queries"""
+
+    def __init__(self, tier_chance, cost, refresh_cost, others, solo_size=None):
+        if refresh_cost < 1:
+            raise ValueError(f"refresh cost must be at least 1, got {refresh_cost}")
+        self.tier_chance = tier_chance
+        self.cost = cost
+        self.refresh_cost = refresh_cost
+        # Copies of the other champions in the tier (pool) - constant while rolling for this one
+        self.others = others
+        # Champions in the tier, when the shop picks uniformly instead of from a pool
+        self.solo_size = solo_size
+        self.shop_cache = {}
+        self.memo = {}
+
+    def shop_copies(self, remaining):
+        """P(k copies of the champion in one shop), k = 0..SHOP_SLOTS"""
+        if remaining in self.shop_cache:
+            return self.shop_cache[remaining]
+        slots = GameConstants.SHOP_SLOTS
+        if self.solo_size is not None:
+            result = binomial(slots, self.tier_chance / self.solo_size)
+        else:
+            # m slots land in the tier, then m draws without replacement from the tier's copies
+            total = remaining + self.others
+            result = [0.0] * (slots + 1)
+            for m, p_m in enumerate(binomial(slots, self.tier_chance)):
+                draws = min(m, total)
+                if p_m == 0.0:
+                    continue
+                if draws == 0:
+                    result[0] += p_m
+                    continue
+                for k in range(min(draws, remaining) + 1):
+                    result[k] += p_m * comb(remaining, k) * comb(self.others, draws - k) / comb(total, draws)
+        self.shop_cache[remaining] = result
+        return result
+
+    def solve(self, gold, owned, remaining=None):
+        """Distribution of copies owned when the roll-down ends: index c = P(ending with c copies), c <= GOAL"""
+        key = (gold, owned, remaining)
+        if key in self.memo:
+            return self.memo[key]
+        # Every roll pays the refresh, so a state only depends on states with less gold: fill
+        # the memo gold ascending for each copy count reachable from here instead of recursing
+        # one frame per reroll
+        for g in range(gold + 1):
+            for have in range(owned, GOAL + 1):
+                left = None if remaining is None else remaining - (have - owned)
+                if left is not None and left < 0:
+                    break
+                if (g, have, left) not in self.memo:
+                    self.memo[g, have, left] = self._step(g, have, left)
+        return self.memo[key]
+
+    def _step(self, gold, owned, remaining):
+        """One state from the memoized states it can move to"""
+        result = [0.0] * (GOAL + 1)
+        if owned >= GOAL or gold < self.refresh_cost:
+            result[min(owned, GOAL)] = 1.0
+            return result
+        after_roll = gold - self.refresh_cost
+        for k, p in enumerate(self.shop_copies(remaining)):
+            if p == 0.0:
+                continue
+            bought = min(k, after_roll // self.cost, GOAL - owned)
+            next_remaining = None if remaining is None else remaining - bought
+            for c, q in enumerate(self.memo[after_roll - bought * self.cost, owned + bought, next_remaining]):
+                result[c] += p * q
+        return result
+
+
+def _model(level, tier, cost, refresh_cost, others, solo_size):
+    key = (level, tier, cost, refresh_cost, others, solo_size)
+    model = _MODELS.pop(key, None)
+    if model is None:
+        model = RolldownModel(tier_chances(level)[tier], cost, refresh_cost, others, solo_size)
+        if len(_MODELS) >= MODEL_CACHE_SIZE:
+            del _MODELS[next(iter(_MODELS))]
+    _MODELS[key] = model
+    return model
+
+
+def rolldown_odds(name, level, gold, owned=0, pool=None, hugo_choice=None, refresh_cost=REFRESH_COST):
+    """Odds of reaching 2 and 3 stars by rolling all of `gold` at `level`.
+
+    owned counts 1-star copies already held (a 2-star unit is 3). With a lobby UnitPool the
+    shop draws from the copies left in it; otherwise every champion in a tier is equally likely.
+    Returns {"two_star", "three_star", "distribution"}, or None if the champion never shows up.
+    """
+    for tier, entries in enumerate(shop_tier_pools(hugo_choice)):
+        names = [entry[0] for entry in entries]
+        if name in names:
+            cost = entries[names.index(name)][1]
+            break
+    else:
+        return None
+
+    if pool is None:
+        model = _model(level, tier, cost, refresh_cost, 0, len(names))
+        distribution = model.solve(gold, owned)
+    else:
+        key = pool.key(name)
+        remaining = pool.counts.get(key, 0)
+        others = sum(pool.counts[n] for n in pool.tiers[tier]) - remaining
+        model = _model(level, tier, cost, refresh_cost, others, None)
+        distribution = model.solve(gold, owned, remaining)
+    return {
+        "two_star": sum(distribution[COPIES_PER_STAR[2]:]),
+        "three_star": distribution[GOAL],
+        "distribution": distribution,
+    }
+
+
+def copies_owned(player, name):
+    """1-star copies of a champion on the player's bench and board"""
+    units = player.bench + [unit for row in player.board for unit in row]
+    return sum(COPIES_PER_STAR.get(unit.stars, 1) for unit in units if unit is not None and unit.name == name)
+
+
+def shop_card_odds(player, unit):
+    """Roll-down odds for a shop card: buy it, then roll the rest of the player's gold"""
+    if player.gold < unit.cost:
+        return None
+    return rolldown_odds(unit.name, player.level, player.gold - unit.cost, copies_owned(player, unit.name) + 1,
+                         player.pool, player.hugo_replacement_choice, player.refresh_cost)
+
+
+def main():
+    if len(sys.argv) < 4:
+        print("Usage: python rolldown.py <champion> <level> <gold> [copies owned]")
+        return 1
+    name, level, gold = sys.argv[1], int(sys.argv[2]), int(sys.argv[3])
+    owned = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+    odds = rolldown_odds(name, level, gold, owned)
+    if odds is None:
+        print(f"{name} is not in any shop pool")
+        return 1
+    print(f"{name}, level {level}, {gold} gold, {owned} copies owned: "
+          f"2* {odds['two_star'] * 100:.1f}%, 3* {odds['three_star'] * 100:.2f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+# roster.py - champion and trait data, compiled from data/roster.json to a binary cache
+#
+# Usage:
+#   python roster.py            # validate data/roster.json and rebuild the cache
+#
+# data/roster.json is the one place champions (the shop roster, Hugo Strange and his
+# replacements) and traits are defined. compile_roster() validates it and packs it into flat
+# tables: trait names interned to ids, per-champion cost / health / damage arrays, trait ids
+# by offset, the roster ids of every cost tier, each trait's thresholds and the stat effects
+# of each threshold (see trait_effects.py). The tables are
+# marshalled to data/roster.cache under a key hashed from the JSON, so a game start reads
+# the cache and rebuilds only after roster.json changes.
+#
+# Champion ids are positions in CHAMPIONS: the shop roster in file order, then Hugo Strange,
+# then his replacements - the order save files and state sync store units by.
+import hashlib
+import json
+import marshal
+import os
+import sys
+from array import array
+
+from config_service import atomic_write
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+ROSTER_SOURCE = os.path.join(DATA_DIR, "roster.json")
+ROSTER_CACHE = os.path.join(DATA_DIR, "roster.cache")
+CACHE_VERSION = 2
+TIERS = 5
+# Stats a trait effect can change; an effect applies to the trait's own units or the whole team
+EFFECT_STATS = ("health", "health_pct", "damage", "damage_pct", "damage_reduction", "damage_amp")
+EFFECT_TARGETS = ("trait", "team")
+
+KIND_SHOP, KIND_HUGO, KIND_REPLACEMENT = 0, 1, 2
+
+
+def _check_champion(entry, traits, where, problems):
+    if not isinstance(entry, dict):
+        problems.append(f"{where}: not an object")
+        return
+    name = entry.get("name")
+    if not isinstance(name, str) or not name:
+        problems.append(f"{where}: missing name")
+    cost = entry.get("cost")
+    if not isinstance(cost, int) or not 1 <= cost <= TIERS:
+        problems.append(f"{where} {name}: cost must be 1 to {TIERS}, got {cost!r}")
+    for stat in ("health", "damage"):
+        value = entry.get(stat)
+        if not isinstance(value, int) or value <= 0:
+            problems.append(f"{where} {name}: {stat} must be a positive integer, got {value!r}")
+    unit_traits = entry.get("traits")
+    if not isinstance(unit_traits, list) or not unit_traits:
+        problems.append(f"{where} {name}: traits must be a non-empty list")
+        return
+    for trait in unit_traits:
+        if trait not in traits:
+            problems.append(f"{where} {name}: unknown trait {trait!r}")
+    if len(set(unit_traits)) != len(unit_traits):
+        problems.append(f"{where} {name}: a trait is listed twice")
+
+
+def validate(data):
+    """Every problem with a parsed roster.json, as readable strings; empty if it is valid"""
+    if not isinstance(data, dict):
+        return ["top level is not an object"]
+    problems = []
+    traits = data.get("traits")
+    if not isinstance(traits, dict):
+        return ["traits must be an object of trait name -> info"]
+    for name, info in traits.items():
+        if not isinstance(info, dict):
+            problems.append(f"trait {name}: not an object")
+            continue
+        thresholds = info.get("thresholds")
+        if (not isinstance(thresholds, list) or not all(isinstance(t, int) and 0 < t < 256 for t in thresholds)
+                or thresholds != sorted(set(thresholds))):
+            problems.append(f"trait {name}: thresholds must be increasing positive integers")
+        if not isinstance(info.get("description"), str):
+            problems.append(f"trait {name}: description must be a string")
+        bonuses = info.get("bonuses")
+        if not isinstance(bonuses, list) or not all(isinstance(b, str) for b in bonuses):
+            problems.append(f"trait {name}: bonuses must be a list of strings")
+        effects = info.get("effects", [])
+        if not isinstance(effects, list) or (effects and len(effects) != len(thresholds or [])):
+            problems.append(f"trait {name}: effects must be a list with one entry per threshold")
+            continue
+        for tier in effects:
+            for effect in tier if isinstance(tier, list) else [None]:
+                if (not isinstance(effect, dict) or effect.get("stat") not in EFFECT_STATS
+                        or effect.get("target", "trait") not in EFFECT_TARGETS
+                        or not isinstance(effect.get("value"), (int, float))):
+                    problems.append(f"trait {name}: bad effect {effect!r}; stat is one of {', '.join(EFFECT_STATS)}, "
+                                    f"target one of {', '.join(EFFECT_TARGETS)}, value a number")
+
+    champions = data.get("champions")
+    if not isinstance(champions, list) or not champions:
+        return problems + ["champions must be a non-empty list"]
+    replacements = data.get("hugo_replacements")
+    if not isinstance(replacements, list):
+        return problems + ["hugo_replacements must be a list"]
+    entries = [("champion", entry) for entry in champions] + [("hugo_strange", data.get("hugo_strange"))]
+    entries += [("hugo_replacement", entry) for entry in replacements]
+    seen = set()
+    for where, entry in entries:
+        _check_champion(entry, traits, where, problems)
+        if isinstance(entry, dict):
+            if entry.get("name") in seen:
+                problems.append(f"{where} {entry.get('name')}: duplicate name")
+            seen.add(entry.get("name"))
+    if len(seen) > 255:
+        problems.append("more than 255 champions: save files store roster ids in one byte")
+    for tier in range(1, TIERS + 1):
+        if not any(isinstance(e, dict) and e.get("cost") == tier for e in champions):
+            problems.append(f"no {tier}-cost champions: every shop tier needs at least one")
+    return problems
+
+
+def compile_roster(data):
+    """Flat tables for a validated roster (see load_tables for the layout); raises ValueError if invalid"""
+    problems = validate(data)
+    if problems:
+        raise ValueError("invalid roster:\n  " + "\n  ".join(problems))
+    trait_names = tuple(data["traits"])
+    trait_ids = {name: i for i, name in enumerate(trait_names)}
+    entries = ([(KIND_SHOP, e) for e in data["champions"]] + [(KIND_HUGO, data["hugo_strange"])] +
+               [(KIND_REPLACEMENT, e) for e in data["hugo_replacements"]])
+    costs, kinds = bytearray(), bytearray()
+    health, damage = array('I'), array('I')
+    trait_offsets, unit_traits = array('H', [0]), bytearray()
+    tiers = [bytearray() for _ in range(TIERS)]
+    for champion_id, (kind, entry) in enumerate(entries):
+        kinds.append(kind)
+        costs.append(entry["cost"])
+        health.append(entry["health"])
+        damage.append(entry["damage"])
+        unit_traits.extend(trait_ids[trait] for trait in entry["traits"])
+        trait_offsets.append(len(unit_traits))
+        if kind == KIND_SHOP:
+            tiers[entry["cost"] - 1].append(champion_id)
+    infos = [data["traits"][name] for name in trait_names]
+    return (tuple(entry["name"] for _, entry in entries), bytes(kinds), bytes(costs), health.tobytes(),
+            damage.tobytes(), trait_offsets.tobytes(), bytes(unit_traits), tuple(bytes(tier) for tier in tiers),
+            trait_names, tuple(bytes(info["thresholds"]) for info in infos),
+            tuple(info["description"] for info in infos), tuple(tuple(info["bonuses"]) for info in infos),
+            tuple(tuple(tuple((EFFECT_STATS.index(e["stat"]), EFFECT_TARGETS.index(e.get("target", "trait")),
+                               float(e["value"])) for e in tier) for tier in info.get("effects", []))
+                  for info in infos))
+
+
+def cache_key(source):
+    return hashlib.blake2b(source, digest_size=16, person=b"dc-roster-%d" % CACHE_VERSION).digest()
+
+
+def build_cache(source_path=ROSTER_SOURCE, cache_path=ROSTER_CACHE):
+    """Validate and compile roster.json and write the cache; returns the tables"""
+    with open(source_path, 'rb') as f:
+        source = f.read()
+    tables = compile_roster(json.loads(source))
+    try:
+        atomic_write(cache_path, marshal.dumps((CACHE_VERSION, cache_key(source), tables)))
+    except OSError as e:
+        # Read-only installs (the web build) just compile at every start
+        print(f"Could not write roster cache {cache_path}: {e}")
+    return tables
+
+
+def load_tables(source_path=ROSTER_SOURCE, cache_path=ROSTER_CACHE):
+    """The compiled tables, from the cache when it was built from the current roster.json.
+
+    (names, kinds, costs, health, damage, trait offsets, trait ids, tier ids, trait names,
+    thresholds, descriptions, bonuses, effects) - per-champion fields are bytes / packed arrays,
+    effects are (stat id, target id, value) per threshold per trait.
+    """
+    with open(source_path, 'rb') as f:
+        key = cache_key(f.read())
+    try:
+        with open(cache_path, 'rb') as f:
+            version, cached_key, tables = marshal.loads(f.read())
+        if version == CACHE_VERSION and cached_key == key:
+            return tables
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+    return build_cache(source_path, cache_path)
+
+
+def _unpack(tables):
+    (names, kinds, costs, health_bytes, damage_bytes, offset_bytes, unit_traits, tiers,
+     trait_names, thresholds, descriptions, bonuses, effects) = tables
+    health, damage, offsets = array('I'), array('I'), array('H')
+    health.frombytes(health_bytes)
+    damage.frombytes(damage_bytes)
+    offsets.frombytes(offset_bytes)
+    champions = [(names[i], costs[i], [trait_names[t] for t in unit_traits[offsets[i]:offsets[i + 1]]],
+                  health[i], damage[i]) for i in range(len(names))]
+    trait_info = {name: {"thresholds": list(thresholds[i]), "description": descriptions[i],
+                         "bonuses": list(bonuses[i])} for i, name in enumerate(trait_names)}
+    trait_effects = {name: effects[i] for i, name in enumerate(trait_names) if effects[i]}
+    return champions, kinds, [list(tier) for tier in tiers], trait_names, trait_info, trait_effects
+
+
+CHAMPIONS, _KINDS, TIER_IDS, TRAIT_NAMES, TRAIT_INFO, TRAIT_EFFECTS = _unpack(load_tables())
+CHAMPION_IDS = {entry[0]: i for i, entry in enumerate(CHAMPIONS)}
+TRAIT_IDS = {name: i for i, name in enumerate(TRAIT_NAMES)}
+# The views the game logic uses: shop roster, Hugo Strange, and his replacements as name -> (cost, traits, health, damage)
+UNIT_ROSTER = [entry for entry, kind in zip(CHAMPIONS, _KINDS) if kind == KIND_SHOP]
+HUGO_STRANGE = next(entry for entry, kind in zip(CHAMPIONS, _KINDS) if kind == KIND_HUGO)
+HUGO_REPLACEMENTS = {entry[0]: entry[1:] for entry, kind in zip(CHAMPIONS, _KINDS) if kind == KIND_REPLACEMENT}
+
+
+def main():
+    # Importing this module already validated roster.json; rebuild the cache regardless
+    tables = build_cache()
+    print(f"{ROSTER_SOURCE}: {len(tables[0])} champions, {len(tables[8])} traits -> {ROSTER_CACHE} "
+          f"({os.path.getsize(ROSTER_CACHE):,} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+# save_state.py - compact, versioned binary save/load of a run
+#
+# Layout (little endian):
+#   header   "DCAB", version (B), roster checksum (I)
+#   player   gold (H), level (B), xp (H), round (H), refresh cost (B), hugo choice (B), flags (B),
+#            occupied-slot mask (Q), then one unit record per set bit
+#   opponent same as player
+# Slots are the 9 bench slots, the board row by row, then the shop. A unit record is
+# roster id (B), stars (B), unit id (H), health (I), damage (I): 12 bytes.
+import struct
+import threading
+import zlib
+
+from config_service import atomic_write
+from game_constants import GameConstants
+from player import Player, get_asset_files
+from roster import CHAMPIONS, CHAMPION_IDS, HUGO_REPLACEMENTS
+from unit_hooks import refresh_hugo_choice
+
+SAVE_MAGIC = b"DCAB"
+SAVE_VERSION = 1
+AUTOSAVE_FILE = "autosave.dcab"
+
+# Every unit a save can reference; units are stored as their index in this list
+SAVE_ROSTER = CHAMPIONS
+ROSTER_IDS = CHAMPION_IDS
+HUGO_CHOICES = list(HUGO_REPLACEMENTS)
+# Saves written against a different roster are rejected rather than loading the wrong champions
+ROSTER_CHECKSUM = zlib.crc32("|".join(entry[0] for entry in SAVE_ROSTER).encode("utf-8"))
+
+NO_HUGO_CHOICE = 0xFF
+FLAG_HUGO_ACTIVATED = 0x01
+
+BOARD_SLOTS = GameConstants.BOARD_WIDTH * GameConstants.BOARD_HEIGHT
+SLOT_COUNT = GameConstants.BENCH_SLOTS + BOARD_SLOTS + GameConstants.SHOP_SLOTS
+
+_HEADER = struct.Struct("<4sBI")
+_PLAYER = struct.Struct("<HBHHBBBQ")
+_UNIT = struct.Struct("<BBHII")
+
+
+def _player_slots(player):
+    shop = list(player.shop[:GameConstants.SHOP_SLOTS])
+    shop += [None] * (GameConstants.SHOP_SLOTS - len(shop))
+    return player.bench + [unit for row in player.board for unit in row] + shop
+
+
+def encode_player(player):
+    mask = 0
+    records = []
+    for i, unit in enumerate(_player_slots(player)):
+        if unit is None:
+            continue
+        roster_id = ROSTER_IDS.get(unit.name)
+        if roster_id is None:
+            raise ValueError(f"Cannot save unit {unit.name!r}: not in the roster")
+        mask |= 1 << i
+        records.append(_UNIT.pack(roster_id, unit.stars, unit.id, unit.health, unit.damage))
+
+    hugo_choice = NO_HUGO_CHOICE
+    if player.hugo_replacement_choice is not None:
+        hugo_choice = HUGO_CHOICES.index(player.hugo_replacement_choice)
+    flags = FLAG_HUGO_ACTIVATED if player.hugo_strange_activated else 0
+
+    header = _PLAYER.pack(player.gold, player.level, player.xp, player.round, player.refresh_cost,
+                          hugo_choice, flags, mask)
+    return header + b"".join(records)
+
+
+def decode_player(data, offset=0):
+    """Rebuild a Player from encode_player() output; returns (player, next offset).
+
+    Traits are not stored: they are derived from the board, so they are recalculated.
+    Raises ValueError for ids or slots the save can't hold.
+    """
+    gold, level, xp, round_number, refresh_cost, hugo_choice, flags, mask = _PLAYER.unpack_from(data, offset)
+    offset += _PLAYER.size
+    if hugo_choice != NO_HUGO_CHOICE and hugo_choice >= len(HUGO_CHOICES):
+        raise ValueError(f"corrupt save: Hugo Strange choice {hugo_choice}")
+    if mask >> SLOT_COUNT:
+        raise ValueError(f"corrupt save: slot mask {mask:#x} past slot {SLOT_COUNT - 1}")
+
+    player = Player(fill_shop=False)
+    player.gold = gold
+    player.level = level
+    player.xp = xp
+    player.round = round_number
+    player.refresh_cost = refresh_cost
+    if hugo_choice != NO_HUGO_CHOICE:
+        player.hugo_replacement_choice = HUGO_CHOICES[hugo_choice]
+    if flags & FLAG_HUGO_ACTIVATED:
+        player.hugo_strange_activated = True
+
+    png_files = get_asset_files()
+    slots = [None] * SLOT_COUNT
+    while mask:
+        slot = (mask & -mask).bit_length() - 1
+        mask &= mask - 1
+        roster_id, stars, unit_id, health, damage = _UNIT.unpack_from(data, offset)
+        offset += _UNIT.size
+        if roster_id >= len(SAVE_ROSTER):
+            raise ValueError(f"corrupt save: roster id {roster_id}")
+        name, cost, traits, _, _ = SAVE_ROSTER[roster_id]
+        unit = player.create_unit(name, cost, list(traits), health, damage, png_files)
+        unit.stars = stars
+        unit.id = unit_id
+        slots[slot] = unit
+
+    bench_end = GameConstants.BENCH_SLOTS
+    board_end = bench_end + BOARD_SLOTS
+    player.bench = slots[:bench_end]
+    player.board = [slots[bench_end + y * GameConstants.BOARD_WIDTH:bench_end + (y + 1) * GameConstants.BOARD_WIDTH]
+                    for y in range(GameConstants.BOARD_HEIGHT)]
+    player.shop = slots[board_end:]
+    player.calculate_traits()
+    refresh_hugo_choice(player)
+    return player, offset
+
+
+def encode_game(player, opponent):
+    return (_HEADER.pack(SAVE_MAGIC, SAVE_VERSION, ROSTER_CHECKSUM) +
+            encode_player(player) + encode_player(opponent))
+
+
+def decode_game(data):
+    """Returns (player, opponent); raises ValueError for foreign, outdated or truncated data"""
+    try:
+        magic, version, checksum = _HEADER.unpack_from(data, 0)
+        if magic != SAVE_MAGIC:
+            raise ValueError("not a DC Auto Battler save")
+        if version != SAVE_VERSION:
+            raise ValueError(f"unsupported save version {version}")
+        if checksum != ROSTER_CHECKSUM:
+            raise ValueError("save was made with a different unit roster")
+        player, offset = decode_player(data, _HEADER.size)
+        opponent, offset = decode_player(data, offset)
+    except struct.error as e:
+        raise ValueError(f"truncated save: {e}")
+    opponent.name = "Opponent"
+    return player, opponent
+
+
+def save_game(path, player, opponent):
+    atomic_write(path, encode_game(player, opponent))
+
+
+def save_game_async(path, player, opponent):
+    """Encode on the caller's thread (fast, and consistent with the current state), write in the background"""
+    data = encode_game(player, opponent)
+
+    def write():
+        try:
+            atomic_write(path, data)
+        except OSError as e:
+            print(f"Autosave to {path} failed: {e}")
+
+    thread = threading.Thread(target=write, name="autosave", daemon=True)
+    thread.start()
+    return thread
+
+
+def load_game(path):
+    with open(path, 'rb') as f:
+        return decode_game(f.read())
@@ -0,0 +1,361 @@
+# server.py - authoritative asyncio multiplayer server
+#
+# Usage:
+#   python server.py --port 8765 --lobby-size 8 --planning 30 --combat 5
+#
+# One process hosts any number of lobbies. Clients only send intents (action_log opcodes);
+# the server applies them to its own headless Player objects, so a client can never put
+# the game into a state the rules don't allow. Phase changes are call_later timers on the
+# event loop, so idle lobbies cost nothing but memory.
+import argparse
+import asyncio
+import sys
+import time
+
+from action_log import ACTIONS, HUGO_CHOICE, check_intent
+from lobby import Lobby, LOBBY_SIZE
+from net_protocol import (PROTOCOL_VERSION, DEFAULT_HOST, DEFAULT_PORT, ProtocolError, encode_frame, decode_json,
+                          read_frame, MSG_HELLO, MSG_JOIN, MSG_ACTION, MSG_READY, MSG_PING, MSG_STATE_ACK,
+                          MSG_WELCOME, MSG_JOINED, MSG_ACK, MSG_STATE, MSG_PHASE, MSG_COMBAT, MSG_GAME_OVER,
+                          MSG_ERROR, MSG_PONG)
+from rng import derive_seed, new_master_seed
+from state_sync import StateSender, ACK
+
+# A client that lets this much output pile up is dropped instead of buffering forever
+MAX_WRITE_BUFFER = 1024 * 1024
+
+PHASE_WAITING = "waiting"
+PHASE_PLANNING = "planning"
+PHASE_COMBAT = "combat"
+PHASE_FINISHED = "finished"
+
+
+class ClientSession:
+    def __init__(self, client_id, writer):
+        self.client_id = client_id
+        self.writer = writer
+        self.name = f"Player {client_id}"
+        self.lobby = None
+        self.seat = None
+        self.state_sender = None
+        self.closed = False
+
+    def send(self, msg_type, body=b""):
+        self.send_frame(encode_frame(msg_type, body))
+
+    def send_frame(self, frame):
+        if self.closed:
+            return
+        transport = self.writer.transport
+        if transport.is_closing():
+            self.closed = True
+            return
+        if transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            print(f"Dropping {self.name}: not reading its messages")
+            self.close()
+            return
+        self.writer.write(frame)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.writer.close()
+
+
+class ServerLobby:
+    """One lobby's game plus the sessions sitting in its seats"""
+
+    def __init__(self, server, lobby_id, seed):
+        self.server = server
+        self.lobby_id = lobby_id
+        self.game = Lobby(seed, size=server.lobby_size, bot_class=None)
+        self.sessions = [None] * server.lobby_size
+        self.joined = 0
+        self.phase = PHASE_WAITING
+        self.ready = set()
+        self.timer = None
+        self.actions_applied = 0
+
+    @property
+    def full(self):
+        return self.joined >= len(self.sessions)
+
+    def add(self, session):
+        # The first free seat: one given up while waiting is handed to the next client
+        seat = self.sessions.index(None)
+        self.joined += 1
+        self.sessions[seat] = session
+        session.lobby = self
+        session.seat = seat
+        session.state_sender = StateSender()
+        session.send(MSG_JOINED, {"lobby": self.lobby_id, "seat": seat, "size": len(self.sessions)})
+        if self.full:
+            self.begin_planning()
+
+    def broadcast(self, msg_type, body):
+        frame = encode_frame(msg_type, body)
+        for session in self.sessions:
+            if session is not None:
+                session.send_frame(frame)
+
+    def send_state(self, seat):
+        session = self.sessions[seat]
+        if session is not None:
+            data = session.state_sender.update(self.game.players[seat])
+            if data is not None:
+                session.send(MSG_STATE, data)
+
+    def set_timer(self, seconds, callback):
+        if self.timer is not None:
+            self.timer.cancel()
+        self.timer = asyncio.get_running_loop().call_later(seconds, callback)
+
+    def begin_planning(self):
+        self.phase = PHASE_PLANNING
+        self.ready.clear()
+        seconds = self.server.planning_seconds
+        self.broadcast(MSG_PHASE, {"phase": PHASE_PLANNING, "round": self.game.round, "seconds": seconds})
+        for seat in self.game.alive:
+            self.send_state(seat)
+        self.set_timer(seconds, self.begin_combat)
+        self.check_all_ready()
+
+    def begin_combat(self):
+        if self.phase != PHASE_PLANNING:
+            return
+        self.phase = PHASE_COMBAT
+        outcomes = self.game.resolve_combats()
+        seconds = self.server.combat_seconds
+        self.broadcast(MSG_PHASE, {"phase": PHASE_COMBAT, "round": self.game.round, "seconds": seconds})
+        self.broadcast(MSG_COMBAT, {"round": self.game.round, "results": [list(o) for o in outcomes],
+                                    "hp": [p.hp for p in self.game.players]})
+        self.set_timer(seconds, self.finish_round)
+
+    def finish_round(self):
+        alive_before = list(self.game.alive)
+        self.game.end_round()
+        for seat in alive_before:
+            if seat not in self.game.alive:
+                self.release(seat)
+        if self.game.finished:
+            self.game.results()
+            for seat in self.game.alive:
+                self.release(seat)
+            self.close()
+        else:
+            self.begin_planning()
+
+    def release(self, seat):
+        """Send a seat its placement and detach its client, which may then join another lobby"""
+        session = self.sessions[seat]
+        if session is None:
+            return
+        session.send(MSG_GAME_OVER, {"placement": self.game.placements[seat]})
+        self.sessions[seat] = None
+        session.lobby = None
+        session.seat = None
+        session.state_sender = None
+
+    def check_all_ready(self):
+        """Start combat early once every connected, alive player is done planning"""
+        if self.phase != PHASE_PLANNING:
+            return
+        waiting = [seat for seat in self.game.alive if self.sessions[seat] is not None and seat not in self.ready]
+        if not waiting:
+            self.begin_combat()
+
+    def handle_action(self, session, body):
+        seq = body.get("seq")
+        # args may be left out for actions that take none; check and apply the same list
+        op, args = body.get("op"), body.get("args", [])
+        error = self.validate_action(session, op, args)
+        if error:
+            session.send(MSG_ACK, {"seq": seq, "ok": False, "error": error})
+            return
+        player = self.game.players[session.seat]
+        result = ACTIONS[op][2](player, *args)
+        self.actions_applied += 1
+        session.send(MSG_ACK, {"seq": seq, "ok": True, "result": bool(result)})
+        self.send_state(session.seat)
+
+    def validate_action(self, session, op, args):
+        """Reason to reject an action, or None. Rule checks (gold, free slots...) are Player's job."""
+        if self.phase != PHASE_PLANNING:
+            return "not in planning phase"
+        if session.seat not in self.game.alive:
+            return "eliminated"
+        error = check_intent(op, args)
+        if error is None and op == HUGO_CHOICE and not self.game.players[session.seat].hugo_choice_pending:
+            return "no Hugo Strange choice pending"
+        return error
+
+    def set_ready(self, session):
+        self.ready.add(session.seat)
+        self.check_all_ready()
+
+    def leave(self, session):
+        if session.seat is not None and self.sessions[session.seat] is session:
+            self.sessions[session.seat] = None
+            if self.phase == PHASE_WAITING:
+                # Free the seat so the lobby only starts once it is really full
+                self.joined -= 1
+        if all(s is None for s in self.sessions):
+            self.close()
+        else:
+            self.check_all_ready()
+
+    def close(self):
+        self.phase = PHASE_FINISHED
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        self.server.remove_lobby(self)
+
+
+class GameServer:
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, lobby_size=LOBBY_SIZE, planning_seconds=30.0,
+                 combat_seconds=5.0, seed=None):
+        self.host = host
+        self.port = port
+        self.lobby_size = lobby_size
+        self.planning_seconds = planning_seconds
+        self.combat_seconds = combat_seconds
+        self.seed = new_master_seed() if seed is None else seed
+        self.lobbies = {}
+        self.open_lobby = None
+        self.next_lobby_id = 1
+        self.next_client_id = 1
+        self.sessions = set()
+        self.lobbies_finished = 0
+        self.server = None
+
+    async def start(self):
+        import unit
+        unit.LOAD_IMAGES = False
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        # Port 0 asks the OS for a free port; report the real one
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        async with self.server:
+            await self.server.serve_forever()
+
+    def close(self):
+        for lobby in list(self.lobbies.values()):
+            lobby.close()
+        for session in list(self.sessions):
+            session.close()
+        if self.server is not None:
+            self.server.close()
+
+    def join_lobby(self, session):
+        if self.open_lobby is None or self.open_lobby.full:
+            lobby_id = self.next_lobby_id
+            self.next_lobby_id += 1
+            self.open_lobby = ServerLobby(self, lobby_id, derive_seed(self.seed, "lobby", lobby_id))
+            self.lobbies[lobby_id] = self.open_lobby
+        self.open_lobby.add(session)
+
+    def remove_lobby(self, lobby):
+        # A lobby everyone left while it was waiting was never played
+        if self.lobbies.pop(lobby.lobby_id, None) is not None and lobby.joined:
+            self.lobbies_finished += 1
+        if self.open_lobby is lobby:
+            self.open_lobby = None
+
+    async def handle_client(self, reader, writer):
+        session = ClientSession(self.next_client_id, writer)
+        self.next_client_id += 1
+        self.sessions.add(session)
+        try:
+            while not session.closed:
+                msg_type, body = await read_frame(reader)
+                self.dispatch(session, msg_type, body)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except ProtocolError as e:
+            session.send(MSG_ERROR, {"error": str(e)})
+        finally:
+            self.sessions.discard(session)
+            if session.lobby is not None:
+                session.lobby.leave(session)
+            session.close()
+
+    def dispatch(self, session, msg_type, body):
+        if msg_type == MSG_STATE_ACK:
+            if len(body) != ACK.size:
+                raise ProtocolError("bad state ack")
+            version = ACK.unpack(body)[0]
+            if session.state_sender is not None:
+                session.state_sender.ack(version)
+                if version == 0:
+                    session.lobby.send_state(session.seat)
+            return
+        body = decode_json(body)
+        if msg_type == MSG_ACTION:
+            if session.lobby is None:
+                session.send(MSG_ACK, {"seq": body.get("seq"), "ok": False, "error": "not in a lobby"})
+            else:
+                session.lobby.handle_action(session, body)
+        elif msg_type == MSG_READY:
+            if session.lobby is not None:
+                session.lobby.set_ready(session)
+        elif msg_type == MSG_PING:
+            session.send(MSG_PONG, {"t": body.get("t")})
+        elif msg_type == MSG_HELLO:
+            if body.get("version") != PROTOCOL_VERSION:
+                raise ProtocolError(f"protocol version {body.get('version')} not supported")
+            session.name = str(body.get("name", session.name))[:32]
+            session.send(MSG_WELCOME, {"client_id": session.client_id})
+        elif msg_type == MSG_JOIN:
+            if session.lobby is None:
+                self.join_lobby(session)
+        else:
+            raise ProtocolError(f"unknown message type {msg_type}")
+
+    def stats(self):
+        playing = sum(1 for lobby in self.lobbies.values() if lobby.phase != PHASE_WAITING)
+        return {"clients": len(self.sessions), "lobbies": len(self.lobbies), "playing": playing,
+                "finished": self.lobbies_finished}
+
+
+async def run_server(args):
+    server = await GameServer(args.host, args.port, args.lobby_size, args.planning, args.combat, args.seed).start()
+    print(f"DC Auto Battler server on {server.host}:{server.port} (lobbies of {server.lobby_size})")
+
+    async def report():
+        while True:
+            await asyncio.sleep(args.stats_interval)
+            s = server.stats()
+            print(f"[{time.strftime('%H:%M:%S')}] {s['clients']} clients, {s['lobbies']} lobbies "
+                  f"({s['playing']} playing), {s['finished']} finished")
+
+    reporter = asyncio.create_task(report()) if args.stats_interval > 0 else None
+    try:
+        await server.serve_forever()
+    finally:
+        if reporter is not None:
+            reporter.cancel()
+        server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Authoritative multiplayer server for DC Auto Battler")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--lobby-size", type=int, default=LOBBY_SIZE)
+    parser.add_argument("--planning", type=float, default=30.0, help="planning phase length in seconds")
+    parser.add_argument("--combat", type=float, default=5.0, help="combat phase length in seconds")
+    parser.add_argument("--seed", type=int, help="master seed; lobby seeds derive from it")
+    parser.add_argument("--stats-interval", type=float, default=10.0, help="seconds between status lines, 0 = off")
+    args = parser.parse_args()
+    try:
+        asyncio.run(run_server(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
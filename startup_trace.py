@@ -0,0 +1,84 @@
+# startup_trace.py - timeline from process start to the first frame on screen
+#
+# Enable with DC_TRACE_STARTUP=1 or `python dc_auto_battler.py --trace-startup`.
+# Import this module before anything heavy so the import timings are meaningful.
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+TRACE_FILE = "startup_trace.json"
+
+
+def _seconds_since_process_start():
+    """How long this process has been alive, or None if the platform doesn't tell us"""
+    try:
+        with open("/proc/self/stat", 'r') as f:
+            # Field 22 (starttime) comes after the parenthesised command name, which may contain spaces
+            fields = f.read().rsplit(")", 1)[1].split()
+        start_ticks = int(fields[19])
+        with open("/proc/uptime", 'r') as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class StartupTrace:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.finished = False
+        now = time.perf_counter()
+        alive = _seconds_since_process_start()
+        # Time zero is process start when we can find it, otherwise the moment this module was imported
+        self.origin = now - alive if alive is not None else now
+        self.events = [("interpreter start + site imports", self.origin, now)]
+        self.last_mark = now
+
+    def mark(self, label):
+        """Record the time since the previous mark under `label`"""
+        if not self.enabled or self.finished:
+            return
+        now = time.perf_counter()
+        self.events.append((label, self.last_mark, now))
+        self.last_mark = now
+
+    @contextmanager
+    def span(self, label):
+        """Time a block under `label`"""
+        if not self.enabled or self.finished:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.events.append((label, start, end))
+            self.last_mark = end
+
+    def finish(self, label="first display.flip"):
+        """Close the timeline, print it and save it to TRACE_FILE (only the first call counts)"""
+        if not self.enabled or self.finished:
+            return
+        self.mark(label)
+        self.finished = True
+
+        total_ms = (self.last_mark - self.origin) * 1000.0
+        print(f"=== Startup trace: {total_ms:.1f} ms to first frame ===")
+        rows = []
+        for label, start, end in self.events:
+            start_ms = (start - self.origin) * 1000.0
+            duration_ms = (end - start) * 1000.0
+            rows.append({"label": label, "start_ms": round(start_ms, 3), "duration_ms": round(duration_ms, 3)})
+            print(f"{start_ms:9.1f} ms  +{duration_ms:8.1f} ms  {label}")
+
+        try:
+            with open(TRACE_FILE, 'w') as f:
+                json.dump({"total_ms": round(total_ms, 3), "events": rows}, f, indent=4)
+        except OSError as e:
+            print(f"Could not write {TRACE_FILE}: {e}")
+
+
+TRACE = StartupTrace(enabled=os.environ.get("DC_TRACE_STARTUP") == "1" or "--trace-startup" in sys.argv)
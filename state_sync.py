@@ -0,0 +1,202 @@
+# state_sync.py - delta-compressed binary sync of one player's state, server to client
+#
+# A player's state is a fixed list of slots: a few scalars (gold, level...) then every bench,
+# board and shop square in save_state order. The server remembers the snapshots it sent
+# under increasing version numbers and diffs the current state against the newest one the
+# client acknowledged, so a message carries only the slots that changed since then:
+#   "gold = 17", "bench[3] = Robin 2* #4120"...
+# Every KEYFRAME_INTERVAL versions, and whenever the client has nothing usable to diff
+# against, the server sends a keyframe holding the whole state instead.
+#
+# Message (big endian): kind (B), version (I), base version (I), change count (B), changes.
+# A change is a slot number (B) and its value: scalars use the struct in SCALARS, a unit
+# slot is a roster id (B, EMPTY_SLOT when empty) followed for a unit by stars (B),
+# unit id (H), health (I) and damage (I). Traits are not sent; they follow from the board.
+import struct
+
+from game_constants import GameConstants
+from save_state import SAVE_ROSTER, ROSTER_IDS, HUGO_CHOICES, SLOT_COUNT, NO_HUGO_CHOICE, _player_slots
+
+KEYFRAME = 0
+DELTA = 1
+KEYFRAME_INTERVAL = 50
+# Snapshots kept for diffing; an ack older than this gets a keyframe
+HISTORY_SIZE = 32
+EMPTY_SLOT = 0xFF
+
+# Scalar slots: (name, struct, read from a Player)
+SCALARS = [
+    ("gold", struct.Struct(">H"), lambda p: p.gold),
+    ("level", struct.Struct(">B"), lambda p: p.level),
+    ("xp", struct.Struct(">H"), lambda p: p.xp),
+    ("round", struct.Struct(">H"), lambda p: p.round),
+    ("hp", struct.Struct(">h"), lambda p: getattr(p, "hp", 0)),
+    ("refresh_cost", struct.Struct(">B"), lambda p: p.refresh_cost),
+    ("hugo_choice", struct.Struct(">B"),
+     lambda p: NO_HUGO_CHOICE if p.hugo_replacement_choice is None else HUGO_CHOICES.index(p.hugo_replacement_choice)),
+]
+FIRST_UNIT_SLOT = len(SCALARS)
+TOTAL_SLOTS = FIRST_UNIT_SLOT + SLOT_COUNT
+BENCH_END = FIRST_UNIT_SLOT + GameConstants.BENCH_SLOTS
+BOARD_END = BENCH_END + GameConstants.BOARD_WIDTH * GameConstants.BOARD_HEIGHT
+
+_HEADER = struct.Struct(">BIIB")
+_SLOT = struct.Struct(">B")
+_UNIT = struct.Struct(">BBHII")
+ACK = struct.Struct(">I")
+
+
+def snapshot(player):
+    """The player's state as a tuple of TOTAL_SLOTS slot values"""
+    values = [read(player) for _, _, read in SCALARS]
+    for unit in _player_slots(player):
+        if unit is None:
+            values.append(None)
+        else:
+            values.append((ROSTER_IDS[unit.name], unit.stars, unit.id, unit.health, unit.damage))
+    return tuple(values)
+
+
+def encode_changes(kind, version, base, changes):
+    parts = [_HEADER.pack(kind, version, base, len(changes))]
+    for slot, value in changes:
+        parts.append(_SLOT.pack(slot))
+        if slot < FIRST_UNIT_SLOT:
+            parts.append(SCALARS[slot][1].pack(value))
+        elif value is None:
+            parts.append(_SLOT.pack(EMPTY_SLOT))
+        else:
+            parts.append(_UNIT.pack(*value))
+    return b"".join(parts)
+
+
+def decode_changes(data):
+    """(kind, version, base, [(slot, value)]); raises ValueError on malformed data"""
+    try:
+        kind, version, base, count = _HEADER.unpack_from(data, 0)
+        offset = _HEADER.size
+        changes = []
+        for _ in range(count):
+            slot = data[offset]
+            offset += 1
+            if slot < FIRST_UNIT_SLOT:
+                fmt = SCALARS[slot][1]
+                value = fmt.unpack_from(data, offset)[0]
+                offset += fmt.size
+            elif slot >= TOTAL_SLOTS:
+                raise ValueError(f"slot {slot} out of range")
+            elif data[offset] == EMPTY_SLOT:
+                value = None
+                offset += 1
+            else:
+                value = _UNIT.unpack_from(data, offset)
+                offset += _UNIT.size
+            changes.append((slot, value))
+    except (struct.error, IndexError) as e:
+        raise ValueError(f"truncated state message: {e}")
+    return kind, version, base, changes
+
+
+class StateSender:
+    """Server side, one per client: turns the current Player into keyframes and deltas"""
+
+    def __init__(self):
+        self.version = 0
+        self.acked = 0
+        self.last_keyframe = 0
+        self.history = {}   # version -> snapshot, for versions the client may still ack
+
+    def update(self, player):
+        """Message bytes bringing the client up to date, or None if nothing changed"""
+        current = snapshot(player)
+        if self.history.get(self.version) == current:
+            return None
+        self.version += 1
+        base = self.history.get(self.acked)
+        if base is None or self.version - self.last_keyframe >= KEYFRAME_INTERVAL:
+            self.last_keyframe = self.version
+            changes = [(slot, value) for slot, value in enumerate(current)
+                       if slot < FIRST_UNIT_SLOT or value is not None]
+            data = encode_changes(KEYFRAME, self.version, 0, changes)
+        else:
+            changes = [(slot, value) for slot, (old, value) in enumerate(zip(base, current)) if old != value]
+            data = encode_changes(DELTA, self.version, self.acked, changes)
+        self.history[self.version] = current
+        if len(self.history) > HISTORY_SIZE:
+            del self.history[min(self.history)]
+        return data
+
+    def ack(self, version):
+        """The client holds this version; older snapshots will never be diffed against again.
+
+        Version 0 means the client lost track: the next update is a keyframe.
+        """
+        if version == 0:
+            self.acked = 0
+            self.history.clear()
+            return
+        if version <= self.acked or version not in self.history:
+            return
+        self.acked = version
+        for old in [v for v in self.history if v < version]:
+            del self.history[old]
+
+
+class StateMirror:
+    """Client side: applies keyframes and deltas and keeps recent versions to diff from"""
+
+    def __init__(self):
+        self.version = 0
+        self.slots = None
+        self.history = {}
+
+    def apply(self, data):
+        """Apply one message; returns the version to acknowledge, or None if it couldn't be applied"""
+        kind, version, base, changes = decode_changes(data)
+        if kind == KEYFRAME:
+            slots = [None] * TOTAL_SLOTS
+        else:
+            base_slots = self.history.get(base)
+            if base_slots is None:
+                # Ack 0 tells the server to fall back to a keyframe
+                return None
+            slots = list(base_slots)
+        for slot, value in changes:
+            slots[slot] = value
+        self.slots = tuple(slots)
+        self.version = version
+        self.history[version] = self.slots
+        # The server's acked version only moves forward, so nothing older than base is needed again
+        for old in [v for v in self.history if v < base]:
+            del self.history[old]
+        while len(self.history) > HISTORY_SIZE:
+            del self.history[min(self.history)]
+        return version
+
+    def view(self):
+        """The mirrored state in plain Python types: scalars by name, units as [name, stars, id, health, damage]"""
+        if self.slots is None:
+            return None
+        state = {name: self.slots[i] for i, (name, _, _) in enumerate(SCALARS)}
+        if state["hugo_choice"] == NO_HUGO_CHOICE:
+            state["hugo_choice"] = None
+        else:
+            state["hugo_choice"] = HUGO_CHOICES[state["hugo_choice"]]
+
+        units = [None if value is None else [SAVE_ROSTER[value[0]][0]] + list(value[1:])
+                 for value in self.slots[FIRST_UNIT_SLOT:]]
+        width = GameConstants.BOARD_WIDTH
+        board_start = BENCH_END - FIRST_UNIT_SLOT
+        board = units[board_start:BOARD_END - FIRST_UNIT_SLOT]
+        state["bench"] = units[:board_start]
+        state["board"] = [board[y * width:(y + 1) * width] for y in range(GameConstants.BOARD_HEIGHT)]
+        state["shop"] = units[BOARD_END - FIRST_UNIT_SLOT:]
+
+        traits = {}
+        for value in self.slots[BENCH_END:BOARD_END]:
+            if value is not None:
+                for trait in SAVE_ROSTER[value[0]][2]:
+                    if trait != "N/A":
+                        traits[trait] = traits.get(trait, 0) + 1
+        state["traits"] = traits
+        return state
@@ -0,0 +1,107 @@
+# trait_effects.py - trait bonuses as stat modifiers, compiled once per board change
+#
+# Every trait threshold in data/roster.json lists structured effects: (stat, target, value),
+# where the target is the trait's own units or the whole team. Only the highest threshold a
+# trait has reached applies. Player.calculate_traits() runs compile_modifiers() whenever the
+# board changes, turning the active effects into four per-slot vectors over the board, so a
+# unit's combat stats are a multiply-add and no trait logic runs during combat:
+#
+#   health = (base + flat health) * (1 + health %) / (1 - damage reduction)
+#          = base * health_mult + health_add
+#   damage = (base + flat damage) * (1 + damage %) * (1 + damage amp)
+#          = base * damage_mult + damage_add
+from roster import TRAIT_INFO, TRAIT_EFFECTS, EFFECT_STATS, EFFECT_TARGETS
+
+HEALTH, HEALTH_PCT, DAMAGE, DAMAGE_PCT, DAMAGE_REDUCTION, DAMAGE_AMP = (EFFECT_STATS.index(stat) for stat in (
+    "health", "health_pct", "damage", "damage_pct", "damage_reduction", "damage_amp"))
+TEAM = EFFECT_TARGETS.index("team")
+MAX_DAMAGE_REDUCTION = 0.75
+
+IDENTITY = (1.0, 0.0, 1.0, 0.0)
+
+# active tiers -> {unit traits: (health_mult, health_add, damage_mult, damage_add)}
+_UNIT_CACHE = {}
+
+
+def _tier_lookup(thresholds):
+    """Active tier index for every unit count up to the last threshold (-1 = none), past it the last tier"""
+    return [sum(1 for threshold in thresholds if count >= threshold) - 1 for count in range(thresholds[-1] + 1)]
+
+
+# trait -> tier index by unit count, for the traits that change stats
+_TIERS = {trait: _tier_lookup(TRAIT_INFO[trait]["thresholds"]) for trait in TRAIT_EFFECTS}
+
+
+def active_tiers(trait_counts):
+    """((trait, tier index), ...) for every trait with effects that has reached a threshold"""
+    active = []
+    for trait, count in trait_counts.items():
+        tiers = _TIERS.get(trait)
+        if tiers is not None:
+            tier = tiers[min(count, len(tiers) - 1)]
+            if tier >= 0 and TRAIT_EFFECTS[trait][tier]:
+                active.append((trait, tier))
+    active.sort()
+    return tuple(active)
+
+
+def unit_modifiers(unit_traits, active):
+    """(health_mult, health_add, damage_mult, damage_add) of a unit with these traits"""
+    totals = [0.0] * len(EFFECT_STATS)
+    for trait, tier in active:
+        for stat, target, value in TRAIT_EFFECTS[trait][tier]:
+            if target == TEAM or trait in unit_traits:
+                totals[stat] += value
+    health_mult = (1 + totals[HEALTH_PCT]) / (1 - min(totals[DAMAGE_REDUCTION], MAX_DAMAGE_REDUCTION))
+    damage_mult = (1 + totals[DAMAGE_PCT]) * (1 + totals[DAMAGE_AMP])
+    return health_mult, totals[HEALTH] * health_mult, damage_mult, totals[DAMAGE] * damage_mult
+
+
+class BoardModifiers:
+    """Per-slot multipliers and addends for a board, slots in row-major order"""
+
+    __slots__ = ("health_mult", "health_add", "damage_mult", "damage_add")
+
+    def __init__(self, slots):
+        # slots: one (health_mult, health_add, damage_mult, damage_add) per board slot
+        self.health_mult, self.health_add, self.damage_mult, self.damage_add = zip(*slots)
+
+
+def compile_modifiers(board, trait_counts):
+    """BoardModifiers for the board's active traits, or None when no trait changes any stat"""
+    active = active_tiers(trait_counts)
+    if not active:
+        return None
+    cache = _UNIT_CACHE.get(active)
+    if cache is None:
+        cache = _UNIT_CACHE[active] = {}
+    slots = []
+    for row in board:
+        for unit in row:
+            if unit is None:
+                slots.append(IDENTITY)
+                continue
+            key = tuple(unit.traits)
+            unit_mods = cache.get(key)
+            if unit_mods is None:
+                unit_mods = cache[key] = unit_modifiers(key, active)
+            slots.append(unit_mods)
+    return BoardModifiers(slots)
+
+
+def board_stats(board, modifiers=None):
+    """(health, damage) summed over the board's living units, with trait modifiers applied"""
+    if modifiers is None:
+        units = [unit for row in board for unit in row if unit and unit.health > 0]
+        return sum(unit.health for unit in units), sum(unit.damage for unit in units)
+    health = damage = 0.0
+    slot = 0
+    health_mult, health_add = modifiers.health_mult, modifiers.health_add
+    damage_mult, damage_add = modifiers.damage_mult, modifiers.damage_add
+    for row in board:
+        for unit in row:
+            if unit and unit.health > 0:
+                health += unit.health * health_mult[slot] + health_add[slot]
+                damage += unit.damage * damage_mult[slot] + damage_add[slot]
+            slot += 1
+    return round(health), round(damage)
@@ -1,42 +1,54 @@
 
-import random
 import pygame
 import os
 
+from rng import python_rng
+
 # --- GLOBAL PNG CACHE ---
 UNIT_IMAGE_CACHE = {}
+# Headless tools (replays, simulations) turn this off so units never touch pygame.image
+LOAD_IMAGES = True
+# Ids for units built without a generator (tools, tests); seeded so they never touch global `random`
+_FALLBACK_RNG = python_rng(0, "unit ids")
+
+
+def load_unit_image(png_name, unit_name=None):
+    """Return the 100x100 art for png_name, loading it into UNIT_IMAGE_CACHE on first use."""
+    if not LOAD_IMAGES or not png_name:
+        return None
+    if png_name in UNIT_IMAGE_CACHE:
+        return UNIT_IMAGE_CACHE[png_name]
+    path = f"assets/{png_name}"
+    if os.path.exists(path):
+        try:
+            original_image = pygame.image.load(path).convert_alpha()
+            scaled_png = pygame.transform.smoothscale(original_image, (100, 100))
+            UNIT_IMAGE_CACHE[png_name] = scaled_png
+            return scaled_png
+        except Exception as e:
+            print(f"Failed to load image {path}: {e}")
+    else:
+        print(f"PNG not found for {unit_name or png_name}: {path}")
+    return None
+
 
 class Unit:
-    def __init__(self, name, cost, traits, health, damage, png_name=None):
+    def __init__(self, name, cost, traits, health, damage, png_name=None, rng=None):
         self.name = name
         self.cost = cost
         self.traits = traits
         self.health = health
         self.damage = damage
         self.stars = 1
-        self.id = random.randint(1000, 9999)
+        # Ids come from the owning player's generator so seeded games get the same ids every time
+        self.id = (rng or _FALLBACK_RNG).randint(1000, 9999)
         self.png_name = png_name
         self.png_surface = None
         self.load_png()
 
     def load_png(self):
         """Load PNG image if available, using a global cache for speed."""
-        if self.png_name:
-            path = f"assets/{self.png_name}"
-            if self.png_name in UNIT_IMAGE_CACHE:
-                self.png_surface = UNIT_IMAGE_CACHE[self.png_name]
-                return
-            if os.path.exists(path):
-                try:
-                    original_image = pygame.image.load(path).convert_alpha()
-                    scaled_png = pygame.transform.smoothscale(original_image, (100, 100))
-                    UNIT_IMAGE_CACHE[self.png_name] = scaled_png
-                    self.png_surface = scaled_png
-                except Exception as e:
-                    print(f"Failed to load image {path}: {e}")
-            else:
-                print(f"PNG not found for {self.name}: {path}")
-        # else: do nothing
+        self.png_surface = load_unit_image(self.png_name, self.name)
 
     def __eq__(self, other):
         return self.id == other.id if other else False
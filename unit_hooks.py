@@ -0,0 +1,94 @@
+# unit_hooks.py - champion and trait mechanics that run when a player's units change
+#
+# Player fires an event for each unit it buys, puts on or takes off the board and stars
+# up, and for every unit it owns when a round starts:
+#
+#   on_buy          bought from the shop onto the bench
+#   on_place        moved onto the board
+#   on_remove       taken off the board, sold, or used up in a combination
+#   on_combine      starred up (the copy that stays)
+#   on_round_start  owned when a new round starts
+#
+# Handlers are registered with @hook(event, champion=...) or @hook(event, trait=...) and
+# compiled into one table per event keyed by champion name, with each trait's handlers
+# folded into every champion that has the trait. Firing an event for a unit without
+# special mechanics is a single dictionary miss, and nothing scans the board.
+from roster import CHAMPIONS, CHAMPION_IDS, TRAIT_IDS, HUGO_STRANGE
+
+EVENTS = ("on_buy", "on_place", "on_remove", "on_combine", "on_round_start")
+
+# event -> [(champion, trait, handler)] in registration order
+_REGISTERED = {event: [] for event in EVENTS}
+# event -> {champion name: (handler, ...)}; only champions with handlers have an entry
+HOOKS = {event: {} for event in EVENTS}
+
+
+def _compile(event):
+    table = HOOKS[event]
+    table.clear()
+    for name, _, traits, _, _ in CHAMPIONS:
+        handlers = tuple(handler for champion, trait, handler in _REGISTERED[event]
+                         if champion == name or trait in traits)
+        if handlers:
+            table[name] = handlers
+
+
+def hook(event, champion=None, trait=None):
+    """Decorator registering handler(player, unit) for an event on one champion or on every unit with a trait"""
+    if event not in EVENTS:
+        raise ValueError(f"unknown unit event {event!r}")
+    if (champion is None) == (trait is None):
+        raise ValueError("a hook needs exactly one of champion or trait")
+    if champion is not None and champion not in CHAMPION_IDS:
+        raise ValueError(f"unknown champion {champion!r}")
+    if trait is not None and trait not in TRAIT_IDS:
+        raise ValueError(f"unknown trait {trait!r}")
+
+    def register(handler):
+        _REGISTERED[event].append((champion, trait, handler))
+        _compile(event)
+        return handler
+    return register
+
+
+def dispatch(player, event, unit):
+    """Run the event's handlers for this unit, if its champion or one of its traits has any"""
+    handlers = HOOKS[event].get(unit.name)
+    if handlers:
+        for handler in handlers:
+            handler(player, unit)
+
+
+def dispatch_owned(player, event):
+    """Run the event for every unit on the player's bench and board; free when nothing handles it"""
+    table = HOOKS[event]
+    if not table:
+        return
+    for unit in player.bench + [unit for row in player.board for unit in row]:
+        if unit is not None:
+            dispatch(player, event, unit)
+
+
+def owns(player, name):
+    return (any(unit is not None and unit.name == name for unit in player.bench) or
+            any(unit is not None and unit.name == name for row in player.board for unit in row))
+
+
+# --- Mind Games: owning Hugo Strange asks the player to pick one of his creations ---
+
+def refresh_hugo_choice(player):
+    """Set hugo_choice_pending from the units owned - for players whose units were set without events"""
+    player.hugo_choice_pending = not player.hugo_strange_activated and owns(player, HUGO_STRANGE[0])
+
+
+@hook("on_buy", champion=HUGO_STRANGE[0])
+@hook("on_place", champion=HUGO_STRANGE[0])
+def _hugo_acquired(player, unit):
+    if not player.hugo_strange_activated:
+        player.hugo_choice_pending = True
+
+
+@hook("on_remove", champion=HUGO_STRANGE[0])
+def _hugo_removed(player, unit):
+    # Moved to the bench or merged into another copy keeps the choice; the last one sold drops it
+    refresh_hugo_choice(player)